@@ -0,0 +1,135 @@
+"""
+Micro-benchmark support: a `bench` fixture that times a function and checks it
+against the stored baseline in `baselines.json`.
+
+Timings are divided by the time of a fixed calibration workload measured
+right before each benchmark, so the stored numbers are relative ("calibration units") and
+remain comparable across machines of different speeds.
+
+    pytest benchmarks/                             # fail on regressions
+    pytest benchmarks/ --update-benchmark-baselines  # re-record baselines
+"""
+
+import gc
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+# Allowed slowdown over the baseline before a benchmark fails (0.5 = 50%)
+DEFAULT_TOLERANCE = 0.5
+# Measurements taken before a slow result is reported as a regression
+MAX_ATTEMPTS = 3
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-benchmark-baselines",
+        action="store_true",
+        default=False,
+        help="Record the measured micro-benchmark timings as the new baselines.",
+    )
+
+
+def measure(func, min_round_seconds: float = 0.02, rounds: int = 15) -> float:
+    """
+    Returns the time of one call of `func`, in seconds. The fastest of
+    `rounds` rounds is used, as it is the least affected by other load, and
+    the garbage collector is paused while timing (as `timeit` does).
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(func, min_round_seconds, rounds)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _measure(func, min_round_seconds: float, rounds: int) -> float:
+    # Warm up and size the batch so that each round takes at least `min_round_seconds`
+    batch = 1
+    while True:
+        started_at = time.perf_counter()
+        for _ in range(batch):
+            func()
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= min_round_seconds:
+            break
+        batch *= 2
+
+    timings = []
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        for _ in range(batch):
+            func()
+        timings.append((time.perf_counter() - started_at) / batch)
+    return min(timings)
+
+
+def _calibration_workload():
+    payload = {"items": [{"id": index, "text": "x" * 64, "tags": ["a", "b", "c"]} for index in range(500)]}
+    encoded = json.dumps(payload)
+    json.loads(encoded)
+    hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _BenchSession:
+    def __init__(self, update: bool):
+        self.update = update
+        self.baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+        self.tolerance = float(os.getenv("AGORA_BENCH_TOLERANCE", DEFAULT_TOLERANCE))
+        self.results = {}
+
+
+@pytest.fixture(scope="session")
+def _bench_session(request):
+    # Measure the functions themselves, not the log records they emit
+    app_logger = logging.getLogger("project_agora")
+    previous_level = app_logger.level
+    app_logger.setLevel(logging.WARNING)
+    session = _BenchSession(request.config.getoption("--update-benchmark-baselines"))
+    yield session
+    app_logger.setLevel(previous_level)
+    if session.update and session.results:
+        baselines = {**session.baselines, **session.results}
+        BASELINES_PATH.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
+
+
+@pytest.fixture
+def bench(_bench_session, request):
+    """Times `func` and fails if it is slower than its stored baseline allows."""
+
+    def run(func):
+        name = request.node.name
+        baseline = _bench_session.baselines.get(name)
+        limit = baseline * (1 + _bench_session.tolerance) if baseline is not None else None
+
+        # A run that looks slow is re-measured before it counts as a regression,
+        # since a single noisy neighbour can stall one measurement
+        for _ in range(MAX_ATTEMPTS):
+            # Calibrate next to each measurement so drift in machine speed cancels out
+            calibration = measure(_calibration_workload)
+            seconds = measure(func)
+            relative = seconds / calibration
+            if limit is None or _bench_session.update or relative <= limit:
+                break
+        _bench_session.results[name] = round(relative, 4)
+        print(f"\n{name}: {seconds * 1e6:.1f}us per call ({relative:.3f} calibration units)")
+
+        if _bench_session.update:
+            return seconds
+        if baseline is None:
+            pytest.skip(f"No baseline for '{name}'; run with --update-benchmark-baselines to record one.")
+        assert relative <= limit, (
+            f"{name} regressed: {relative:.3f} calibration units vs baseline {baseline:.3f} "
+            f"(limit {limit:.3f} at {_bench_session.tolerance:.0%} tolerance)"
+        )
+        return seconds
+
+    return run
@@ -0,0 +1,308 @@
+"""
+Concurrent-session load generator for the Project Agora agent tree.
+
+Drives the ADK runner for `root_agent` with many simultaneous synthetic
+sessions. Each session walks a full ticket lifecycle, either the question
+path (analysis, retrieval, confirmation, problem solving) or the
+code-generation path (analysis, retrieval, plan and diagram, code and review).
+Every agent runs on the scripted model with a configurable latency
+distribution, and the cloud tools use the local backends, so the numbers
+measure the agent framework, callbacks and tools rather than Gemini.
+
+Reported: throughput, latency percentiles per state transition, event-loop
+lag and peak RSS. `--output` writes the results as JSON; `--baseline` compares
+against an earlier results file and exits non-zero on a regression.
+
+Usage:
+    python -m benchmarks.load_test --sessions 200 --concurrency 50 \\
+        --latency lognormal:0.8,0.5 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from project_agora.agent import root_agent
+from project_agora.testing import CaseScript, ScriptedStep, local_backends, scripted_models, use_script
+
+APP_NAME = "project_agora_load_test"
+
+QUESTION = "How do I make my agents call each other in a specific, multi-step sequence? My main agent just stops after the first step."
+CODE_REQUEST = "Build me an ADK agent that summarizes GitHub issues and posts the summary to Slack."
+
+_RETRIEVAL_STEPS = [
+    ScriptedStep(tool_name="create_ticket"),
+    ScriptedStep(tool_name="ticket_analysis_agent"),
+    ScriptedStep(tool_name="update_ticket_after_analysis"),
+    ScriptedStep(tool_name="knowledge_retrieval_agent"),
+    ScriptedStep(tool_name="db_retrieval_agent"),
+    ScriptedStep(tool_name="update_ticket_after_retrieval"),
+    ScriptedStep(text="My search is complete. I found relevant information. Shall I proceed?"),
+]
+
+_PLAN = json.dumps({"plan_description": "A two-agent pipeline.", "mermaid_syntax": "graph TD; A-->B"})
+
+# Each lifecycle: the user turns, and the orchestrator's steps across all of them
+LIFECYCLES: Dict[str, dict] = {
+    "question": {
+        "turns": [QUESTION, "Yes, proceed."],
+        "steps": _RETRIEVAL_STEPS + [
+            ScriptedStep(tool_name="problem_solver_agent"),
+            ScriptedStep(text="Here is the solution to your request."),
+        ],
+        "analysis": {"urgency": "Medium", "category": "Technical", "sentiment": "Neutral", "summary": "Sequencing agents."},
+    },
+    "code": {
+        "turns": [CODE_REQUEST, "Yes, proceed.", "Yes, the plan looks good."],
+        "steps": _RETRIEVAL_STEPS + [
+            ScriptedStep(tool_name="code_generator_agent"),
+            ScriptedStep(
+                tool_name="generate_diagram_from_mermaid",
+                tool_input={"mermaid_code": "graph TD\\n  A[GitHub] --> B[Summarizer]\\n  B --> C[Slack]", "file_name": "architecture_plan"},
+            ),
+            ScriptedStep(text="Does this plan and architecture look correct? Shall I proceed with generating the full code?"),
+            ScriptedStep(tool_name="code_generator_agent", tool_input={"request": "user_confirmation: The plan is approved. Generate the full code."}),
+            ScriptedStep(tool_name="code_reviewer_agent", tool_input={"request": _PLAN}),
+            ScriptedStep(tool_name="format_code_reviewer_output"),
+            ScriptedStep(text="Here is your complete, reviewed agent code."),
+        ],
+        "analysis": {"urgency": "High", "category": "Code Generation", "sentiment": "Positive", "summary": "GitHub to Slack agent."},
+    },
+}
+
+_REVIEW = json.dumps({
+    "status": "approved",
+    "code": '==== FILE: agent.py ====\nfrom google.adk.agents import Agent\n\nroot_agent = Agent(name="summarizer")\n',
+})
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[str], float]:
+    """
+    Parses a latency distribution: `fixed:S`, `uniform:LOW,HIGH` or
+    `lognormal:MEDIAN,SIGMA` (all in seconds).
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+    if kind == "fixed":
+        return lambda agent: values[0]
+    if kind == "uniform":
+        return lambda agent: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        mu = math.log(values[0])
+        return lambda agent: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution '{spec}'. Use fixed:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA.")
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))]
+
+
+def _summarize(values: List[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50": _percentile(ordered, 50),
+        "p95": _percentile(ordered, 95),
+        "p99": _percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task that sleeps for `interval` seconds."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started_at - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def _ticket_status(session) -> str:
+    try:
+        return json.loads(session.state["ticket"]).get("status") or "None"
+    except (KeyError, json.JSONDecodeError, TypeError):
+        return "None"
+
+
+async def _run_session(runner: InMemoryRunner, lifecycle: str, sampler, think_seconds: float, transitions, errors) -> bool:
+    spec = LIFECYCLES[lifecycle]
+    script = CaseScript(
+        steps={root_agent.name: spec["steps"]},
+        responses={
+            "ticket_analysis_agent": json.dumps(spec["analysis"]),
+            "code_generator_agent": _PLAN,
+            "code_reviewer_agent": _REVIEW,
+        },
+        latency_sampler=sampler,
+    )
+    user_id = f"load-{lifecycle}"
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id=user_id)
+    status = "None"
+    try:
+        with use_script(script):
+            for turn, text in enumerate(spec["turns"]):
+                if turn and think_seconds:
+                    # The user reads the previous answer before replying
+                    await asyncio.sleep(think_seconds)
+                started_at = time.perf_counter()
+                message = types.Content(role="user", parts=[types.Part(text=text)])
+                async for _ in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+                    pass
+                elapsed = time.perf_counter() - started_at
+                session = await runner.session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session.id)
+                new_status = _ticket_status(session)
+                transitions[f"{lifecycle}: turn {turn + 1} {status} -> {new_status}"].append(elapsed)
+                status = new_status
+        return True
+    except Exception as e:
+        errors[f"{type(e).__name__}: {e}"[:200]] += 1
+        return False
+
+
+async def run_load_test(sessions: int, concurrency: int, code_ratio: float, latency: str, seed: int, think_seconds: float = 0.0) -> dict:
+    rng = random.Random(seed)
+    sampler = parse_latency(latency, rng)
+    runner = InMemoryRunner(agent=root_agent, app_name=APP_NAME)
+    semaphore = asyncio.Semaphore(concurrency)
+    transitions: Dict[str, List[float]] = defaultdict(list)
+    session_latencies: List[float] = []
+    errors: Dict[str, int] = defaultdict(int)
+    lifecycles = ["code" if rng.random() < code_ratio else "question" for _ in range(sessions)]
+
+    async def one(lifecycle: str) -> bool:
+        async with semaphore:
+            started_at = time.perf_counter()
+            ok = await _run_session(runner, lifecycle, sampler, think_seconds, transitions, errors)
+            session_latencies.append(time.perf_counter() - started_at)
+            return ok
+
+    monitor = LoopLagMonitor()
+    with scripted_models(root_agent), local_backends(root_agent):
+        started_at = time.perf_counter()
+        monitor.start()
+        outcomes = await asyncio.gather(*(one(lifecycle) for lifecycle in lifecycles))
+        wall_seconds = time.perf_counter() - started_at
+        await monitor.stop()
+
+    completed = sum(outcomes)
+    turns = sum(len(values) for values in transitions.values())
+    return {
+        "config": {
+            "sessions": sessions,
+            "concurrency": concurrency,
+            "code_ratio": code_ratio,
+            "latency": latency,
+            "seed": seed,
+            "think_seconds": think_seconds,
+        },
+        "commit": _git_commit(),
+        "wall_seconds": wall_seconds,
+        "sessions_completed": completed,
+        "sessions_failed": sessions - completed,
+        "throughput": {
+            "sessions_per_second": completed / wall_seconds if wall_seconds else 0.0,
+            "turns_per_second": turns / wall_seconds if wall_seconds else 0.0,
+        },
+        "session_latency_seconds": _summarize(session_latencies),
+        "transitions": {name: _summarize(values) for name, values in sorted(transitions.items())},
+        "event_loop_lag_seconds": _summarize(monitor.samples),
+        # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+        "errors": dict(errors),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: dict):
+    throughput = results["throughput"]
+    print(f"\nCommit {results['commit']}  config {results['config']}")
+    print(
+        f"{results['sessions_completed']} sessions completed, {results['sessions_failed']} failed in {results['wall_seconds']:.2f}s "
+        f"({throughput['sessions_per_second']:.2f} sessions/s, {throughput['turns_per_second']:.2f} turns/s)"
+    )
+    print(f"\n{'transition':<70} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, stats in results["transitions"].items():
+        print(f"{name:<70} {stats['count']:>6} {stats['p50']:>7.3f}s {stats['p95']:>7.3f}s {stats['p99']:>7.3f}s")
+    lag = results["event_loop_lag_seconds"]
+    print(f"\nEvent-loop lag: p50 {lag['p50'] * 1000:.1f}ms, p99 {lag['p99'] * 1000:.1f}ms, max {lag['max'] * 1000:.1f}ms")
+    print(f"Peak RSS: {results['peak_rss_mb']:.1f} MB")
+    for error, count in results["errors"].items():
+        print(f"ERROR x{count}: {error}")
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Returns the transitions whose p95 grew by more than `tolerance` (e.g. 0.2 = 20%) over the baseline."""
+    regressions = []
+    for name, stats in results["transitions"].items():
+        previous = baseline.get("transitions", {}).get(name)
+        if previous and previous["p95"] > 0 and stats["p95"] > previous["p95"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95']:.3f}s -> {stats['p95']:.3f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run concurrent synthetic sessions against root_agent.")
+    parser.add_argument("--sessions", type=int, default=50, help="Total number of sessions to run.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum number of sessions in flight.")
+    parser.add_argument("--code-ratio", type=float, default=0.3, help="Fraction of sessions that take the code-generation path.")
+    parser.add_argument("--latency", default="lognormal:0.05,0.5", help="Fake model latency distribution (see parse_latency).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the lifecycle mix and latencies.")
+    parser.add_argument("--think", type=float, default=0.0, help="Seconds a simulated user takes before each reply.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare with an earlier results file; exit 1 on a p95 regression.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 growth over the baseline (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load_test(args.sessions, args.concurrency, args.code_ratio, args.latency, args.seed, args.think))
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failed = results["sessions_failed"] > 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark for per-file parallel code generation (`project_agora/parallel_codegen.py`).
+
+Both code generators run on `SizedLlm`: a fake model whose answer takes
+`--overhead` seconds plus one second per `--chars-per-second` characters of
+output, as a decoding model does. Each file of the sample plan's manifest has a
+typical size. `code_generator_agent` writes all of them in one answer;
+`file_generator_agent` writes the one file named in its request. Each run
+generates the full code for the sample plan through `generate_code` with
+AGORA_CODEGEN_MODE=single and =parallel and reports the median wall-clock time.
+
+Usage:
+    python -m benchmarks.parallel_codegen_benchmark [--chars-per-second 2000] [--overhead 0.5] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import time
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+import project_agora.agent  # noqa: F401 (wraps the generators' models as in production)
+from project_agora.parallel_codegen import build_manifest, generate_code
+from project_agora.sub_agents.code_generator.agent import code_generator_agent, file_generator_agent
+
+PLAN = {
+    "project_name": "github_slack_summarizer",
+    "plan_description": "Summarizes new GitHub issues and posts the summary to Slack.",
+    "components": [
+        {"name": "SummaryPipeline", "type": "SequentialAgent", "justification": "Runs the steps in order."},
+        {"name": "IssueFetcher", "type": "LlmAgent", "justification": "Fetches new issues."},
+        {"name": "Summarizer", "type": "LlmAgent", "justification": "Summarizes the issues."},
+        {"name": "SlackPoster", "type": "LlmAgent", "justification": "Posts the summary."},
+        {"name": "fetch_issues", "type": "FunctionTool", "justification": "Calls the GitHub API."},
+        {"name": "post_to_slack", "type": "FunctionTool", "justification": "Calls the Slack API."},
+    ],
+    "dependencies": [{"name": "requests", "justification": "HTTP calls."}],
+}
+
+# Typical size in characters of each generated file, by file name
+FILE_SIZES = {
+    "pyproject.toml": 500,
+    "README.md": 2500,
+    "__init__.py": 30,
+    "agent.py": 3000,
+    "config.py": 600,
+    "prompts.py": 3500,
+    "tools.py": 3000,
+}
+
+_FILE_RE = re.compile(r"Write the file `([^`]+)`")
+
+
+class SizedLlm(BaseLlm):
+    """A fake model whose latency grows with the length of the code it writes."""
+
+    chars_per_second: float
+    overhead: float
+    manifest_paths: list
+
+    def _answer(self, request: str) -> str:
+        match = _FILE_RE.search(request)
+        if match:
+            return "#" * FILE_SIZES[os.path.basename(match.group(1))]
+        return "\n".join(f"==== FILE: {path} ====\n" + "#" * FILE_SIZES[os.path.basename(path)] for path in self.manifest_paths)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        request = "".join(part.text or "" for part in llm_request.contents[-1].parts)
+        text = self._answer(request)
+        await asyncio.sleep(self.overhead + len(text) / self.chars_per_second)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=1000, candidates_token_count=len(text) // 4, total_token_count=1000 + len(text) // 4
+            ),
+        )
+
+
+async def run_benchmark(chars_per_second: float, overhead: float, runs: int) -> dict:
+    manifest = build_manifest(PLAN)
+    model = SizedLlm(
+        model="sized", chars_per_second=chars_per_second, overhead=overhead,
+        manifest_paths=[spec.path for spec in manifest.files],
+    )
+    code_generator_agent.model = model
+    file_generator_agent.model = model
+    plan_text = json.dumps(PLAN)
+    results = {}
+    for mode in ("single", "parallel"):
+        os.environ["AGORA_CODEGEN_MODE"] = mode
+        timings, length = [], 0
+        for _ in range(runs):
+            started_at = time.perf_counter()
+            code = await generate_code(plan_text, {}, code_generator_agent)
+            timings.append(time.perf_counter() - started_at)
+            length = len(code)
+        results[mode] = {"seconds": statistics.median(timings), "files": code.count("==== FILE:"), "chars": length}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-call and per-file parallel code generation.")
+    parser.add_argument("--chars-per-second", type=float, default=2000, help="Output characters the fake model writes per second.")
+    parser.add_argument("--overhead", type=float, default=0.5, help="Seconds before the fake model's first character.")
+    parser.add_argument("--runs", type=int, default=3, help="Generations per mode; medians are reported.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.chars_per_second, args.overhead, args.runs))
+    print(f"\n{'mode':<10} {'time':>8} {'files':>6} {'chars':>7}")
+    for mode, row in results.items():
+        print(f"{mode:<10} {row['seconds']:>7.2f}s {row['files']:>6} {row['chars']:>7}")
+
+
+if __name__ == "__main__":
+    main()
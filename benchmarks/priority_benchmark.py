@@ -0,0 +1,89 @@
+"""
+Benchmark for the urgency-aware scheduler (`project_agora/scheduler.py`) under a
+burst of load.
+
+A burst of Low and Medium urgency calls arrives at once, while High urgency
+calls keep arriving at a steady rate. Every call holds a scheduler slot for a
+fixed service time, as a model call would. The same workload runs through a
+FIFO scheduler, where every call has the same priority, and then through the
+priority scheduler. For each priority the benchmark reports the p50/p95/max
+time spent queued and how long the last call of that priority took to finish.
+
+Usage:
+    python -m benchmarks.priority_benchmark [--slots 8] [--burst 240] [--high 30] [--service 0.1]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from project_agora.scheduler import PRIORITIES, PriorityScheduler
+
+
+async def _workload(scheduler: PriorityScheduler, fifo: bool, burst: int, high: int, service: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    waits = defaultdict(list)
+    started_at = time.monotonic()
+    finished = defaultdict(float)
+
+    async def call(priority: str, delay: float):
+        await asyncio.sleep(delay)
+        enqueued_at = time.monotonic()
+        async with scheduler.slot("medium" if fifo else priority):
+            waits[priority].append(time.monotonic() - enqueued_at)
+            await asyncio.sleep(service * rng.uniform(0.5, 1.5))
+        finished[priority] = max(finished[priority], time.monotonic() - started_at)
+
+    burst_calls = [call(rng.choice(("medium", "low")), 0.0) for _ in range(burst)]
+    # High urgency calls arrive steadily while the burst drains
+    drain_seconds = burst * service / scheduler.slots
+    high_calls = [call("high", drain_seconds * index / high) for index in range(high)]
+    await asyncio.gather(*burst_calls, *high_calls)
+    return {"waits": waits, "finished": finished}
+
+
+def run_scenario(name: str, fifo: bool, slots: int, burst: int, high: int, service: float, aging: float, seed: int) -> list:
+    scheduler = PriorityScheduler(slots=slots, aging_seconds=aging)
+    result = asyncio.run(_workload(scheduler, fifo, burst, high, service, seed))
+    rows = []
+    for priority in PRIORITIES:
+        waits = sorted(result["waits"][priority])
+        if not waits:
+            continue
+        rows.append({
+            "scenario": name,
+            "priority": priority,
+            "calls": len(waits),
+            "p50_wait": statistics.median(waits),
+            "p95_wait": waits[int(len(waits) * 0.95)],
+            "max_wait": waits[-1],
+            "last_finished": result["finished"][priority],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the priority scheduler against FIFO under a burst.")
+    parser.add_argument("--slots", type=int, default=8, help="Scheduler slots.")
+    parser.add_argument("--burst", type=int, default=240, help="Low and Medium calls arriving at once.")
+    parser.add_argument("--high", type=int, default=30, help="High calls arriving while the burst drains.")
+    parser.add_argument("--service", type=float, default=0.1, help="Mean seconds each call holds its slot.")
+    parser.add_argument("--aging", type=float, default=1.0, help="Seconds of waiting that raise a call one priority level.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = run_scenario("fifo", True, args.slots, args.burst, args.high, args.service, args.aging, args.seed)
+    rows += run_scenario("priority", False, args.slots, args.burst, args.high, args.service, args.aging, args.seed)
+    print(f"\n{'scheduler':<10} {'priority':<8} {'calls':>6} {'p50 wait':>9} {'p95 wait':>9} {'max wait':>9} {'last done':>10}")
+    for row in rows:
+        print(
+            f"{row['scenario']:<10} {row['priority']:<8} {row['calls']:>6} {row['p50_wait']:>9.2f} "
+            f"{row['p95_wait']:>9.2f} {row['max_wait']:>9.2f} {row['last_finished']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
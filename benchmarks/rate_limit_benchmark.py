@@ -0,0 +1,133 @@
+"""
+Benchmark for the LLM rate limiter (`project_agora/rate_limiter.py`) against a
+simulated model quota.
+
+`QuotaLlm` enforces a requests-per-minute quota over a sliding one-minute
+window, as the Gemini API does, and answers calls over the quota with a 429
+RESOURCE_EXHAUSTED error. A pool of concurrent callers sends requests for a
+fixed duration, first straight to the model with a naive fixed-delay retry
+and then through `RateLimitedLlm`. For each run the benchmark reports the
+throughput, the 429s received, the calls that failed for good and the
+queue wait per call.
+
+The quota is scaled down (a "minute" lasts `--window` seconds) so a run takes
+seconds instead of minutes.
+
+Usage:
+    python -m benchmarks.rate_limit_benchmark [--rpm 60] [--window 5] [--callers 16] [--duration 15]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors, types
+
+from project_agora import rate_limiter
+
+MODEL = "quota-model"
+
+
+class QuotaLlm(BaseLlm):
+    """A fake model that serves at most `rpm` calls per sliding `window` seconds."""
+
+    rpm: int
+    window: float
+    latency: float = 0.05
+    rejected: int = 0
+    sent_at: deque = deque()
+    served_at: list = []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        now = time.monotonic()
+        while self.sent_at and now - self.sent_at[0] > self.window:
+            self.sent_at.popleft()
+        if len(self.sent_at) >= self.rpm:
+            self.rejected += 1
+            raise errors.ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "Quota exceeded."}})
+        self.sent_at.append(now)
+        await asyncio.sleep(self.latency)
+        self.served_at.append(time.monotonic())
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="ok")]))
+
+
+async def _run_callers(model: BaseLlm, callers: int, duration: float, naive_retry_delay: float) -> dict:
+    deadline = time.monotonic() + duration
+    latencies, failures = [], 0
+
+    async def caller():
+        nonlocal failures
+        while time.monotonic() < deadline:
+            request = LlmRequest(model=MODEL, contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+            started_at = time.monotonic()
+            try:
+                async for _ in model.generate_content_async(request):
+                    pass
+                latencies.append(time.monotonic() - started_at)
+            except errors.ClientError:
+                failures += 1
+                if naive_retry_delay:
+                    await asyncio.sleep(naive_retry_delay)
+
+    await asyncio.gather(*(caller() for _ in range(callers)))
+    return {"latencies": latencies, "failures": failures}
+
+
+def run_scenario(name: str, limited: bool, rpm: int, window: float, callers: int, duration: float) -> dict:
+    quota = QuotaLlm(model=MODEL, rpm=rpm, window=window, sent_at=deque(), served_at=[])
+    if limited:
+        # The limiter thinks in minutes; scale the quota to the simulated window
+        model = rate_limiter.RateLimitedLlm(model=MODEL, inner=quota, max_retries=5)
+        rate_limiter.reset_limiters()
+        limiter = rate_limiter.ModelRateLimiter(MODEL, rpm * 60 / window, 0, burst_seconds=rate_limiter.BURST_SECONDS * window / 60)
+        limiter.backoff_base, limiter.backoff_max = window / 10, window
+        rate_limiter._limiters[MODEL] = limiter
+    else:
+        model = quota
+    started_at = time.monotonic()
+    result = asyncio.run(_run_callers(model, callers, duration, naive_retry_delay=0.0 if limited else 0.05))
+    # Calls still queued at the deadline finish afterwards; count only those served within it
+    served = sum(1 for served_at in quota.served_at if served_at - started_at <= duration)
+    latencies = sorted(result["latencies"])
+    return {
+        "scenario": name,
+        "served": served,
+        "per_window": served / duration * window,
+        "quota_per_window": rpm,
+        "rejected_429": quota.rejected,
+        "failed_calls": result["failures"],
+        "p50_seconds": statistics.median(latencies) if latencies else 0.0,
+        "p95_seconds": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LLM rate limiter against a simulated quota.")
+    parser.add_argument("--rpm", type=int, default=60, help="Calls the simulated quota allows per window.")
+    parser.add_argument("--window", type=float, default=5.0, help="Length of the simulated quota 'minute' in seconds.")
+    parser.add_argument("--callers", type=int, default=16, help="Concurrent callers.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds each scenario runs.")
+    args = parser.parse_args()
+
+    rows = [
+        run_scenario("no limiter, naive retry", False, args.rpm, args.window, args.callers, args.duration),
+        run_scenario("rate limiter", True, args.rpm, args.window, args.callers, args.duration),
+    ]
+    print(f"\n{'scenario':<26} {'served':>7} {'per window':>11} {'429s':>7} {'failed':>7} {'p50 s':>7} {'p95 s':>7}")
+    for row in rows:
+        print(
+            f"{row['scenario']:<26} {row['served']:>7} {row['per_window']:>6.1f}/{row['quota_per_window']:<4} "
+            f"{row['rejected_429']:>7} {row['failed_calls']:>7} {row['p50_seconds']:>7.2f} {row['p95_seconds']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
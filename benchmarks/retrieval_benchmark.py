@@ -0,0 +1,349 @@
+"""
+Retrieval quality-vs-latency benchmark.
+
+Builds two held-out query sets and evaluates each configured search backend
+over a parameter sweep:
+
+- tickets: every resolved ticket in `data/resolved_tickets.csv` becomes a
+  query made of a random 30% of its request's words. The source ticket is
+  fully relevant and tickets of the same category are partially relevant.
+- knowledge base: every unique `##`/`###` heading in `data/knowledge_base/`
+  becomes a query. Headings are removed from the indexed text, so the
+  section body must be found from the heading alone. Chunks of that section
+  are fully relevant and other chunks of the same file partially relevant.
+
+For each backend and parameter combination the report gives recall@k, MRR,
+nDCG@k, per-query latency (p50/p95), index build time and index memory.
+
+Usage:
+    python -m benchmarks.retrieval_benchmark [--output retrieval.json] [--baseline old.json] [--live]
+
+`--baseline` compares with an earlier `--output` file and exits 1 if recall@k
+or nDCG@k dropped for any configuration.
+
+`--live` adds the `embedding` backend for tickets, which ranks by the
+precomputed `request_embedding` column (as the BigQuery search does) and
+embeds queries with Vertex AI; it needs credentials.
+"""
+
+import argparse
+import csv
+import json
+import math
+import random
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from project_agora.testing.local_backends import DATA_DIR, TfidfIndex, tokenize
+
+# Ranks documents for a query: returns (document index, distance) pairs, best first
+SearchFn = Callable[[str, int], List[Tuple[int, float]]]
+
+
+@dataclass
+class Corpus:
+    """Documents to index plus held-out queries with graded relevance (2 = exact, 1 = related)."""
+
+    name: str
+    documents: List[str]
+    queries: List[str]
+    relevance: List[Dict[int, int]]
+    # Extra per-document data some backends need (e.g. precomputed embeddings)
+    extras: Dict[str, list] = field(default_factory=dict)
+
+
+def build_ticket_corpus(seed: int = 0, keep_fraction: float = 0.3) -> Corpus:
+    csv.field_size_limit(sys.maxsize)
+    with open(DATA_DIR / "resolved_tickets.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    rng = random.Random(seed)
+    queries, relevance = [], []
+    for index, row in enumerate(rows):
+        words = row["request"].split()
+        kept = sorted(rng.sample(range(len(words)), max(3, int(len(words) * keep_fraction))))
+        queries.append(" ".join(words[position] for position in kept))
+        grades = {other: 1 for other, other_row in enumerate(rows) if other_row["category"] == row["category"]}
+        grades[index] = 2
+        relevance.append(grades)
+    return Corpus(
+        name="tickets",
+        documents=[f"{row['request']} {row['category']}" for row in rows],
+        queries=queries,
+        relevance=relevance,
+        extras={"embeddings": [json.loads(row["request_embedding"]) for row in rows]},
+    )
+
+
+_HEADING_RE = re.compile(r"^(#{2,3})\s+(.*)$")
+_ANCHOR_RE = re.compile(r"\[¶\]\([^)]*\)")
+
+
+def _sections(text: str) -> List[Tuple[Optional[str], str]]:
+    """Splits markdown into (heading, body) sections, ignoring '#' lines inside code fences."""
+    sections: List[Tuple[Optional[str], List[str]]] = [(None, [])]
+    in_code = False
+    for line in text.splitlines():
+        if line.strip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else _HEADING_RE.match(line)
+        if match:
+            sections.append((_ANCHOR_RE.sub("", match.group(2)).strip(), []))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, "\n".join(lines)) for heading, lines in sections]
+
+
+def build_knowledge_base_corpus(chunk_chars: int = 1500) -> Corpus:
+    documents: List[str] = []
+    chunk_file: List[str] = []
+    section_chunks: Dict[Tuple[str, str], List[int]] = {}
+    for path in sorted((DATA_DIR / "knowledge_base").glob("*")):
+        if path.suffix not in (".md", ".txt"):
+            continue
+        for heading, body in _sections(path.read_text(encoding="utf-8", errors="replace")):
+            for start in range(0, len(body), chunk_chars):
+                chunk = body[start:start + chunk_chars].strip()
+                if not chunk:
+                    continue
+                if heading:
+                    section_chunks.setdefault((path.name, heading), []).append(len(documents))
+                documents.append(chunk)
+                chunk_file.append(path.name)
+
+    heading_counts = Counter(heading for _, heading in section_chunks)
+    queries, relevance = [], []
+    for (file_name, heading), chunks in section_chunks.items():
+        # Headings such as "Next steps" appear in many files and have no single answer
+        if heading_counts[heading] > 1 or len(tokenize(heading)) < 2:
+            continue
+        grades = {index: 1 for index, name in enumerate(chunk_file) if name == file_name}
+        grades.update({index: 2 for index in chunks})
+        queries.append(heading)
+        relevance.append(grades)
+    return Corpus(name=f"knowledge_base(chunk={chunk_chars})", documents=documents, queries=queries, relevance=relevance)
+
+
+# --- Backends ---
+
+def tfidf_backend(corpus: Corpus) -> SearchFn:
+    index = TfidfIndex(corpus.documents)
+    return lambda query, k: [(position, 1.0 - similarity) for position, similarity in index.search(query, k)]
+
+
+class Bm25Index:
+    """Okapi BM25 over the same tokenization as the TF-IDF index."""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.term_counts = [Counter(tokenize(document)) for document in documents]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / max(1, len(self.lengths))
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        total = len(documents)
+        self.idf = {term: math.log(1 + (total - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        terms = [term for term in tokenize(query) if term in self.idf]
+        scores = []
+        for index, counts in enumerate(self.term_counts):
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / self.average_length)
+            score = sum(self.idf[term] * counts[term] * (self.k1 + 1) / (counts[term] + norm) for term in terms if term in counts)
+            scores.append((index, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        top = scores[:k]
+        best = top[0][1] if top and top[0][1] > 0 else 1.0
+        # Express scores as distances in [0, 1] relative to the best hit so thresholds apply uniformly
+        return [(index, 1.0 - score / best) for index, score in top]
+
+
+def bm25_backend(corpus: Corpus) -> SearchFn:
+    return Bm25Index(corpus.documents).search
+
+
+def embedding_backend(corpus: Corpus) -> SearchFn:
+    """Cosine distance over precomputed document embeddings; queries are embedded with Vertex AI."""
+    from project_agora.tools._data_tools import _get_embedding_for_query
+
+    embeddings = corpus.extras["embeddings"]
+    norms = [math.sqrt(sum(value * value for value in vector)) or 1.0 for vector in embeddings]
+
+    def search(query: str, k: int) -> List[Tuple[int, float]]:
+        query_vector = _get_embedding_for_query(query)
+        query_norm = math.sqrt(sum(value * value for value in query_vector)) or 1.0
+        distances = [
+            (index, 1.0 - sum(a * b for a, b in zip(query_vector, vector)) / (query_norm * norms[index]))
+            for index, vector in enumerate(embeddings)
+        ]
+        distances.sort(key=lambda item: item[1])
+        return distances[:k]
+
+    return search
+
+
+BACKENDS: Dict[str, Callable[[Corpus], SearchFn]] = {"tfidf": tfidf_backend, "bm25": bm25_backend}
+LIVE_BACKENDS: Dict[str, Callable[[Corpus], SearchFn]] = {"embedding": embedding_backend}
+
+
+# --- Metrics ---
+
+def _ndcg(ranked: List[int], grades: Dict[int, int], k: int) -> float:
+    dcg = sum((2 ** grades.get(doc, 0) - 1) / math.log2(rank + 2) for rank, doc in enumerate(ranked[:k]))
+    ideal = sorted(grades.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))]
+
+
+def evaluate(search: SearchFn, corpus: Corpus, k: int, threshold: Optional[float]) -> dict:
+    recalls, reciprocal_ranks, ndcgs, latencies = [], [], [], []
+    for query, grades in zip(corpus.queries, corpus.relevance):
+        started_at = time.perf_counter()
+        hits = search(query, k)
+        latencies.append(time.perf_counter() - started_at)
+        ranked = [doc for doc, distance in hits if threshold is None or distance <= threshold]
+
+        exact = {doc for doc, grade in grades.items() if grade == 2}
+        recalls.append(len(exact.intersection(ranked)) / len(exact))
+        first_hit = next((rank for rank, doc in enumerate(ranked) if doc in exact), None)
+        reciprocal_ranks.append(1.0 / (first_hit + 1) if first_hit is not None else 0.0)
+        ndcgs.append(_ndcg(ranked, grades, k))
+    count = max(1, len(corpus.queries))
+    return {
+        "recall_at_k": sum(recalls) / count,
+        "mrr": sum(reciprocal_ranks) / count,
+        "ndcg_at_k": sum(ndcgs) / count,
+        "latency_p50_ms": _percentile(latencies, 50) * 1000,
+        "latency_p95_ms": _percentile(latencies, 95) * 1000,
+    }
+
+
+def _build_index(factory: Callable[[Corpus], SearchFn], corpus: Corpus) -> Tuple[SearchFn, float, float]:
+    """Builds a backend's index, returning it with its build time (s) and retained memory (MB)."""
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    search = factory(corpus)
+    build_seconds = time.perf_counter() - started_at
+    retained_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return search, build_seconds, retained_bytes / (1024 * 1024)
+
+
+def run_benchmark(
+    backends: Dict[str, Callable[[Corpus], SearchFn]],
+    ks: Sequence[int],
+    thresholds: Sequence[Optional[float]],
+    chunk_sizes: Sequence[int],
+    seed: int,
+    keep_fraction: float = 0.3,
+) -> List[dict]:
+    corpora = [build_ticket_corpus(seed, keep_fraction)] + [build_knowledge_base_corpus(size) for size in chunk_sizes]
+    rows = []
+    for corpus, (backend_name, factory) in product(corpora, backends.items()):
+        if backend_name == "embedding" and "embeddings" not in corpus.extras:
+            continue
+        search, build_seconds, index_mb = _build_index(factory, corpus)
+        for k, threshold in product(ks, thresholds):
+            rows.append({
+                "corpus": corpus.name,
+                "backend": backend_name,
+                "k": k,
+                "threshold": threshold,
+                "queries": len(corpus.queries),
+                "documents": len(corpus.documents),
+                "index_build_seconds": build_seconds,
+                "index_memory_mb": index_mb,
+                **evaluate(search, corpus, k, threshold),
+            })
+    return rows
+
+
+def print_report(rows: List[dict]):
+    header = f"{'corpus':<26} {'backend':<9} {'k':>3} {'thresh':>6} {'recall':>7} {'MRR':>6} {'nDCG':>6} {'p50 ms':>7} {'p95 ms':>7} {'idx MB':>7}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        threshold = "-" if row["threshold"] is None else f"{row['threshold']:.2f}"
+        print(
+            f"{row['corpus']:<26} {row['backend']:<9} {row['k']:>3} {threshold:>6} {row['recall_at_k']:>7.3f} "
+            f"{row['mrr']:>6.3f} {row['ndcg_at_k']:>6.3f} {row['latency_p50_ms']:>7.2f} {row['latency_p95_ms']:>7.2f} "
+            f"{row['index_memory_mb']:>7.1f}"
+        )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _row_key(row: dict) -> tuple:
+    return row["corpus"], row["backend"], row["k"], row["threshold"]
+
+
+def compare_with_baseline(rows: List[dict], baseline: dict, tolerance: float) -> List[str]:
+    """Returns the configurations whose recall@k or nDCG@k fell by more than `tolerance` (absolute) from the baseline."""
+    previous_rows = {_row_key(row): row for row in baseline.get("rows", [])}
+    regressions = []
+    for row in rows:
+        previous = previous_rows.get(_row_key(row))
+        if not previous:
+            continue
+        for metric in ("recall_at_k", "ndcg_at_k"):
+            if row[metric] < previous[metric] - tolerance:
+                regressions.append(f"{' '.join(map(str, _row_key(row)))}: {metric} {previous[metric]:.3f} -> {row[metric]:.3f}")
+    return regressions
+
+
+def _parse_thresholds(values: List[str]) -> List[Optional[float]]:
+    return [None if value == "none" else float(value) for value in values]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark retrieval quality and latency over the local corpora.")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10], help="Result counts to evaluate.")
+    parser.add_argument(
+        "--thresholds", nargs="+", default=["none", "0.5", "0.8"],
+        help="Maximum distances to keep ('none' disables filtering); 0.5 matches vector_distance_threshold.",
+    )
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[800, 1500, 3000], help="Knowledge-base chunk sizes in characters.")
+    parser.add_argument("--backends", nargs="+", help=f"Backends to run (default: {', '.join(BACKENDS)}).")
+    parser.add_argument("--live", action="store_true", help="Also run backends that call Vertex AI.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the held-out ticket queries.")
+    parser.add_argument("--query-keep", type=float, default=0.3, help="Fraction of a ticket's words kept in its query.")
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare with an earlier report; exit 1 on a quality regression.")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Allowed absolute drop in recall@k or nDCG@k.")
+    args = parser.parse_args()
+
+    available = {**BACKENDS, **(LIVE_BACKENDS if args.live else {})}
+    selected = {name: available[name] for name in (args.backends or available)}
+    rows = run_benchmark(selected, args.k, _parse_thresholds(args.thresholds), args.chunk_sizes, args.seed, args.query_keep)
+    print_report(rows)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"commit": _git_commit(), "config": vars(args), "rows": rows}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(rows, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark for the documentation scraper (`scripts/scrape_adk_docs.py`) against a
+local, synthetic MkDocs-style site.
+
+`DocsSiteServer` serves generated pages with ETag and Last-Modified headers,
+answers conditional requests with 304, and can add a fixed per-request
+latency to mimic a remote site. The benchmark measures a cold crawl
+sequentially and concurrently, a refresh with no changes, and a refresh after
+editing a few pages, reporting the time, the responses served and the files written.
+
+Usage:
+    python -m benchmarks.scraper_benchmark [--pages 300] [--latency 0.05] [--concurrency 8] [--changed 5]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import tempfile
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scripts.scrape_adk_docs import DocsCrawler
+
+SITE_PREFIX = "/adk-docs/"
+
+
+def _page_html(index: int, pages: int, revision: int) -> str:
+    nav = "".join(f'<a class="md-nav__link" href="{SITE_PREFIX}page-{other}/">Page {other}</a>' for other in range(pages))
+    body = "".join(
+        f"<h2>Section {section}</h2><p>Revision {revision} of page {index}, section {section}. "
+        f"Agents, tools and callbacks explained in detail.</p><pre><code>agent = Agent(name='a{index}')</code></pre>"
+        for section in range(5)
+    )
+    return (
+        f"<html><head><title>Page {index} - ADK</title></head><body><nav>{nav}</nav>"
+        f'<div class="md-content"><div class="md-content__inner"><h1>Page {index}</h1>{body}</div></div></body></html>'
+    )
+
+
+class DocsSiteServer:
+    """A threaded local HTTP server for a synthetic docs site that supports conditional GETs."""
+
+    def __init__(self, pages: int, latency: float = 0.0):
+        self.page_count = pages
+        self.latency = latency
+        self.pages = {}
+        self.responses = Counter()
+        self.lock = threading.Lock()
+        for index in range(pages):
+            self.set_page(index, revision=0)
+        self.pages[SITE_PREFIX] = self.pages[f"{SITE_PREFIX}page-0/"]
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                page = server.pages.get(self.path)
+                if page is None:
+                    status = 404
+                    self.send_response(404)
+                    self.end_headers()
+                elif self.headers.get("If-None-Match") == page["etag"]:
+                    status = 304
+                    self.send_response(304)
+                    self.send_header("ETag", page["etag"])
+                    self.end_headers()
+                else:
+                    status = 200
+                    body = page["html"].encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.send_header("ETag", page["etag"])
+                    self.send_header("Last-Modified", page["last_modified"])
+                    self.end_headers()
+                    self.wfile.write(body)
+                with server.lock:
+                    server.responses[status] += 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{SITE_PREFIX}"
+
+    def set_page(self, index: int, revision: int):
+        html = _page_html(index, self.page_count, revision)
+        self.pages[f"{SITE_PREFIX}page-{index}/"] = {
+            "html": html,
+            "etag": f'"{hashlib.sha1(html.encode("utf-8")).hexdigest()}"',
+            "last_modified": formatdate(usegmt=True),
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def run_benchmark(pages: int, latency: float, concurrency: int, changed: int) -> list:
+    rows = []
+    with DocsSiteServer(pages, latency) as site, tempfile.TemporaryDirectory() as output_dir:
+
+        def crawl(name: str, workers: int, full_refresh: bool = False):
+            site.responses.clear()
+            # The crawler prints a line per saved page
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = asyncio.run(DocsCrawler(site.base_url, output_dir, workers, full_refresh).run())
+            rows.append({
+                "scenario": name,
+                "concurrency": workers,
+                "seconds": stats.seconds,
+                "responses_200": site.responses[200],
+                "responses_304": site.responses[304],
+                "files_written": stats.written,
+                "errors": stats.errors,
+            })
+
+        crawl("cold crawl (sequential)", 1, full_refresh=True)
+        crawl("cold crawl", concurrency, full_refresh=True)
+        crawl("refresh, nothing changed", concurrency)
+        for index in range(1, changed + 1):
+            site.set_page(index, revision=1)
+        crawl(f"refresh, {changed} pages changed", concurrency)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the docs scraper against a local synthetic site.")
+    parser.add_argument("--pages", type=int, default=300, help="Number of pages on the synthetic site.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Crawler workers for the concurrent runs.")
+    parser.add_argument("--changed", type=int, default=5, help="Pages edited before the last refresh.")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.pages, args.latency, args.concurrency, args.changed)
+    print(f"\n{'scenario':<28} {'workers':>7} {'seconds':>8} {'200s':>6} {'304s':>6} {'written':>8}")
+    for row in rows:
+        print(
+            f"{row['scenario']:<28} {row['concurrency']:>7} {row['seconds']:>8.2f} {row['responses_200']:>6} "
+            f"{row['responses_304']:>6} {row['files_written']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Cold-start profiler for the `project_agora` package.
+
+Each measurement runs in a fresh interpreter, as a new Cloud Run instance would:
+
+- import breakdown: runs `python -X importtime -c "import project_agora"` and
+  groups the self time of every imported module by package, so the heaviest
+  dependencies on the startup path stand out;
+- time to first response: starts an interpreter that imports the agent,
+  creates a runner and sends one message, and measures from process launch
+  until the first response event arrives. Offline (the default) the models
+  are scripted, so this isolates framework and import cost. With `--live` it
+  includes the real model call.
+
+Usage:
+    python -m benchmarks.startup_profile [--runs 3] [--top 15] [--live] [--output startup.json]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict
+
+_IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+# Run in a child interpreter; prints a marker line as soon as the first response event arrives
+_FIRST_RESPONSE_SCRIPT = """
+import asyncio, contextlib, sys
+from google.genai import types
+from google.adk.runners import InMemoryRunner
+from project_agora.agent import root_agent
+
+async def main(live):
+    runner = InMemoryRunner(agent=root_agent, app_name="startup_profile")
+    session = await runner.session_service.create_session(app_name="startup_profile", user_id="profile")
+    message = types.Content(role="user", parts=[types.Part(text="Hi there!")])
+    with contextlib.ExitStack() as stack:
+        if not live:
+            from project_agora.testing import CaseScript, scripted_models, use_script
+            stack.enter_context(scripted_models(root_agent))
+            stack.enter_context(use_script(CaseScript(steps={root_agent.name: []}, responses={root_agent.name: "Hello!"})))
+        async for event in runner.run_async(user_id="profile", session_id=session.id, new_message=message):
+            if event.content and event.content.parts:
+                print("FIRST_RESPONSE", flush=True)
+                return
+
+asyncio.run(main(sys.argv[1] == "live"))
+"""
+
+
+def _group(module: str) -> str:
+    """Groups a module under its distribution-level package (e.g. google.cloud.bigquery, vertexai)."""
+    parts = module.split(".")
+    if parts[0] == "google" and len(parts) > 1:
+        depth = 3 if parts[1] == "cloud" and len(parts) > 2 else 2
+        return ".".join(parts[:depth])
+    if parts[0] == "project_agora":
+        return ".".join(parts[:2])
+    return parts[0]
+
+
+def import_breakdown() -> dict:
+    """Imports the package in a fresh interpreter and returns the wall time and per-package self times (s)."""
+    started_at = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import project_agora"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_seconds = time.perf_counter() - started_at
+
+    by_package: Dict[str, float] = defaultdict(float)
+    modules: Dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORT_TIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, module = match.groups()
+        by_package[_group(module)] += int(self_us) / 1e6
+        modules[module] = int(cumulative_us) / 1e6
+    return {
+        "wall_seconds": wall_seconds,
+        "import_seconds": modules.get("project_agora", 0.0),
+        "by_package": dict(sorted(by_package.items(), key=lambda item: item[1], reverse=True)),
+        "project_modules": {name: seconds for name, seconds in sorted(modules.items()) if name.startswith("project_agora")},
+    }
+
+
+def time_to_first_response(live: bool) -> float:
+    """Seconds from launching a fresh interpreter until the agent's first response event."""
+    started_at = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", _FIRST_RESPONSE_SCRIPT, "live" if live else "offline"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        for line in process.stdout:
+            if line.startswith("FIRST_RESPONSE"):
+                return time.perf_counter() - started_at
+    finally:
+        process.kill()
+        process.wait()
+    raise RuntimeError("The agent exited without producing a response.")
+
+
+def profile(runs: int, live: bool) -> dict:
+    breakdowns = [import_breakdown() for _ in range(runs)]
+    first_responses = [time_to_first_response(live) for _ in range(runs)]
+    # Report the run with the median import time so the breakdown is internally consistent
+    median_breakdown = sorted(breakdowns, key=lambda item: item["import_seconds"])[len(breakdowns) // 2]
+    return {
+        "runs": runs,
+        "live": live,
+        "import_seconds_median": statistics.median(item["import_seconds"] for item in breakdowns),
+        "time_to_first_response_seconds_median": statistics.median(first_responses),
+        "time_to_first_response_seconds": first_responses,
+        "breakdown": median_breakdown,
+    }
+
+
+def print_profile(results: dict, top: int):
+    breakdown = results["breakdown"]
+    print(f"\n{'package':<40} {'self ms':>9} {'share':>7}")
+    total = sum(breakdown["by_package"].values()) or 1.0
+    for package, seconds in list(breakdown["by_package"].items())[:top]:
+        print(f"{package:<40} {seconds * 1000:>9.1f} {seconds / total:>6.1%}")
+
+    print(f"\n{'project module (cumulative)':<56} {'ms':>9}")
+    for module, seconds in breakdown["project_modules"].items():
+        print(f"{module:<56} {seconds * 1000:>9.1f}")
+
+    mode = "live" if results["live"] else "scripted models"
+    print(
+        f"\nimport project_agora: {results['import_seconds_median']:.2f}s (median of {results['runs']}); "
+        f"time to first response ({mode}): {results['time_to_first_response_seconds_median']:.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the cold start of the project_agora package.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per measurement.")
+    parser.add_argument("--top", type=int, default=15, help="Packages shown in the import breakdown.")
+    parser.add_argument("--live", action="store_true", help="Measure time to first response with the real model.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    results = profile(args.runs, args.live)
+    print_profile(results, args.top)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
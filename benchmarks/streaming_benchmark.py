@@ -0,0 +1,118 @@
+"""
+Benchmark for sub-agent streaming (`project_agora/streaming.py`).
+
+The orchestrator runs on the scripted model and calls `problem_solver_agent`,
+whose model is replaced by `ChunkedLlm`: a fake model that produces a long
+solution as `--chunks` chunks, `--chunk-delay` seconds apart, and streams them
+when asked to. Each run measures, from the start of the turn:
+
+- first token: when the user first sees solution text. Without a listener
+  that is the sub-agent's complete tool response; with one, it is the first
+  chunk published to the stream hub;
+- complete: when the turn's last event arrives.
+
+Usage:
+    python -m benchmarks.streaming_benchmark [--chunks 40] [--chunk-delay 0.05] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import AsyncGenerator
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from project_agora.agent import root_agent
+from project_agora.streaming import hub
+from project_agora.sub_agents.problem_solver.agent import problem_solver_agent
+from project_agora.testing import CaseScript, ScriptedStep, scripted_models, use_script
+
+APP_NAME = "project_agora_streaming_benchmark"
+QUESTION = "How do I make my agents call each other in a specific, multi-step sequence?"
+
+
+class ChunkedLlm(BaseLlm):
+    """A fake model whose answer takes `chunks * chunk_delay` seconds and streams when asked to."""
+
+    chunks: int
+    chunk_delay: float
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        pieces = [f"Step {index + 1} of the solution. " for index in range(self.chunks)]
+        for piece in pieces:
+            await asyncio.sleep(self.chunk_delay)
+            if stream:
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=piece)]), partial=True)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="".join(pieces))]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=100, candidates_token_count=10 * self.chunks, total_token_count=100 + 10 * self.chunks
+            ),
+        )
+
+
+async def _run_turn(runner: InMemoryRunner, listen: bool) -> dict:
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id="bench")
+    queue = hub.subscribe(session.id) if listen else None
+    started_at = time.perf_counter()
+    first_token = None
+
+    async def watch_hub():
+        nonlocal first_token
+        await queue.get()
+        first_token = time.perf_counter() - started_at
+
+    watcher = asyncio.create_task(watch_hub()) if listen else None
+    try:
+        message = types.Content(role="user", parts=[types.Part(text=QUESTION)])
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+        async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message, run_config=run_config):
+            responses = event.get_function_responses()
+            if first_token is None and any(response.name == problem_solver_agent.name for response in responses):
+                first_token = time.perf_counter() - started_at
+        complete = time.perf_counter() - started_at
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+            hub.unsubscribe(session.id, queue)
+    return {"first_token": first_token, "complete": complete}
+
+
+async def run_benchmark(chunks: int, chunk_delay: float, runs: int) -> dict:
+    script = CaseScript(steps={root_agent.name: [ScriptedStep(tool_name=problem_solver_agent.name), ScriptedStep(text="Done.")]})
+    results = {}
+    with scripted_models(root_agent), use_script(script):
+        problem_solver_agent.model = ChunkedLlm(model="chunked", chunks=chunks, chunk_delay=chunk_delay)
+        runner = InMemoryRunner(agent=root_agent, app_name=APP_NAME)
+        for name, listen in (("buffered (AgentTool)", False), ("streamed", True)):
+            turns = [await _run_turn(runner, listen) for _ in range(runs)]
+            results[name] = {
+                "first_token": statistics.median(turn["first_token"] for turn in turns),
+                "complete": statistics.median(turn["complete"] for turn in turns),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first token of sub-agent output, buffered and streamed.")
+    parser.add_argument("--chunks", type=int, default=40, help="Chunks the fake solution is produced in.")
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="Seconds between chunks.")
+    parser.add_argument("--runs", type=int, default=5, help="Turns per scenario; medians are reported.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.chunks, args.chunk_delay, args.runs))
+    print(f"\n{'scenario':<22} {'first token':>12} {'complete':>10}")
+    for name, row in results.items():
+        print(f"{name:<22} {row['first_token']:>11.2f}s {row['complete']:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Micro-benchmarks for the tool functions and callbacks on every ticket's path,
+with realistic and adversarial payloads. See conftest.py for the baselines.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from project_agora.callbacks import _ticket_from_state, after_model_call
+from project_agora.entities.ticket import SupportTicket, TicketAnalysis
+from project_agora.tools.tools import (
+    create_ticket,
+    format_code_reviewer_output,
+    update_ticket_after_analysis,
+    update_ticket_after_retrieval,
+)
+
+
+def _ticket_json(history_entries: int = 5, retrieval_bytes: int = 0) -> str:
+    ticket = SupportTicket(
+        ticket_id="TICK-BENCH001",
+        customer_id="DEV-BENCH001",
+        request="How do I make my agents call each other in a specific, multi-step sequence?",
+        status="Analyzing",
+        analysis=TicketAnalysis(urgency="High", category="Technical", summary="Sequencing agents."),
+        resolution_history=[f"Step {index}: tool call completed with status ok" for index in range(history_entries)],
+        retrieved_kb_docs="k" * retrieval_bytes,
+        retrieved_db_tickets="d" * retrieval_bytes,
+    )
+    return ticket.to_json()
+
+
+def _context(ticket_json: str = None) -> SimpleNamespace:
+    state = {} if ticket_json is None else {"ticket": ticket_json}
+    return SimpleNamespace(state=state, agent_name="orchestrator_agent", invocation_id="e-bench")
+
+
+def _code_bundle(files: int, lines_per_file: int) -> str:
+    """A multi-file bundle full of quotes, backslashes and newlines that need escaping."""
+    parts = []
+    for index in range(files):
+        body = "\n".join(
+            f'    print("line {line}: path=C:\\\\temp\\\\file_{index}.txt, data={{\\"key\\": \\"value\\"}}")'
+            for line in range(lines_per_file)
+        )
+        parts.append(f"==== FILE: module_{index}.py ====\ndef main():\n{body}\n")
+    return "\n".join(parts)
+
+
+SMALL_ANALYSIS = json.dumps({"urgency": "High", "category": "Technical", "sentiment": "Neutral", "summary": "Agents stop early."})
+FENCED_ANALYSIS = f"```json\n{SMALL_ANALYSIS}\n```"
+KB_RESULTS_1MB = "Relevant documentation excerpt about SequentialAgent and state handling.\n" * 14000
+DB_RESULTS_1MB = str([{"ticket_id": f"ADK-{index}", "request": "q" * 500, "suggested_solution": "s" * 1500} for index in range(500)])
+
+
+# --- create_ticket ---
+
+def test_create_ticket(bench):
+    bench(lambda: create_ticket("How do I make my agents call each other in sequence?", _context()))
+
+
+def test_create_ticket_large_request(bench):
+    request = "Stack trace follows:\n" + "  File \"agent.py\", line 42, in run\n" * 5000
+    bench(lambda: create_ticket(request, _context()))
+
+
+# --- update_ticket_after_analysis ---
+
+def test_update_after_analysis(bench):
+    ticket = _ticket_json()
+    bench(lambda: update_ticket_after_analysis(FENCED_ANALYSIS, _context(ticket)))
+
+
+def test_update_after_analysis_long_history(bench):
+    ticket = _ticket_json(history_entries=5000)
+    bench(lambda: update_ticket_after_analysis(SMALL_ANALYSIS, _context(ticket)))
+
+
+def test_update_after_analysis_unparsable_json(bench):
+    ticket = _ticket_json()
+    garbage = "```json\n{'urgency': High, " + "unterminated " * 2000
+    bench(lambda: update_ticket_after_analysis(garbage, _context(ticket)))
+
+
+# --- update_ticket_after_retrieval ---
+
+def test_update_after_retrieval(bench):
+    ticket = _ticket_json()
+    bench(lambda: update_ticket_after_retrieval("A short KB excerpt.", "[]", _context(ticket)))
+
+
+def test_update_after_retrieval_large_blobs(bench):
+    ticket = _ticket_json()
+    bench(lambda: update_ticket_after_retrieval(KB_RESULTS_1MB, DB_RESULTS_1MB, _context(ticket)))
+
+
+# --- format_code_reviewer_output ---
+
+def test_format_reviewer_approved(bench):
+    payload = json.dumps({"status": "approved", "code": _code_bundle(files=3, lines_per_file=20)})
+    bench(lambda: format_code_reviewer_output(payload))
+
+
+def test_format_reviewer_approved_large_escaped_bundle(bench):
+    payload = "```json\n" + json.dumps({"status": "approved", "code": _code_bundle(files=40, lines_per_file=200)}) + "\n```"
+    bench(lambda: format_code_reviewer_output(payload))
+
+
+def test_format_reviewer_rejected(bench):
+    payload = json.dumps({
+        "status": "rejected",
+        "feedback": "- Missing error handling\n" * 50,
+        "corrected_code": _code_bundle(files=10, lines_per_file=100),
+    })
+    bench(lambda: format_code_reviewer_output(payload))
+
+
+def test_format_reviewer_malformed_json_fallback(bench):
+    # Unescaped newlines make this invalid JSON, forcing the manual extraction path
+    payload = '{"status": "approved", "code": "' + _code_bundle(files=20, lines_per_file=100) + '"}'
+    bench(lambda: format_code_reviewer_output(payload))
+
+
+# --- callbacks ---
+
+@pytest.mark.parametrize("history_entries", [5, 5000])
+def test_callback_ticket_parsing(bench, history_entries):
+    state = {"ticket": _ticket_json(history_entries=history_entries)}
+    bench(lambda: _ticket_from_state(state))
+
+
+def test_after_model_call_large_ticket(bench):
+    ticket = _ticket_json(history_entries=500, retrieval_bytes=200_000)
+    response = LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text="done")]),
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=1200, candidates_token_count=300, total_token_count=1500
+        ),
+    )
+    bench(lambda: after_model_call(_context(ticket), response))
@@ -0,0 +1,28 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--live",
+        action="store_true",
+        default=False,
+        help="Run the evaluation against the real Gemini models and cloud backends.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "live: needs real models and credentials (run with --live)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--live"):
+        return
+    skip_live = pytest.mark.skip(reason="needs --live")
+    for item in items:
+        if "live" in item.keywords:
+            item.add_marker(skip_live)
+
+
+@pytest.fixture
+def live(request) -> bool:
+    return request.config.getoption("--live")
@@ -3,8 +3,12 @@
 # By importing the logging_config module, we ensure the logger
 # is configured once when the package is first loaded.
 from . import logging_config
+from . import metrics
 from .agent import root_agent
 
 logging_config.logger.info("Project Agora application starting up. Logging configured.")
 
+# Expose the in-process latency histograms if AGORA_METRICS_PORT / AGORA_METRICS_FILE are set
+metrics.start_exporters_from_env()
+
 __all__ = ["root_agent"]
\ No newline at end of file
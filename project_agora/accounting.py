@@ -0,0 +1,160 @@
+# FILE: project_agora/accounting.py
+
+"""
+Per-ticket accounting of LLM token usage and latency, with optional budgets.
+
+The model callbacks record every LLM call into a process-wide `UsageLedger`,
+attributed to the ticket being worked on and to the agent that made the call.
+At the end of each agent turn the ledger's running totals are mirrored onto
+`SupportTicket.usage`, so they are persisted with the session. The ledger is
+only a cache of those totals for the tickets being worked on: a ticket is
+dropped from it once it is resolved, or after TICKET_USAGE_TTL_SECONDS
+(default 3600) without a model call, and is seeded again from the persisted
+totals if work on it resumes.
+
+Budgets are read from the environment (0 disables a limit):
+
+- TICKET_TOKEN_BUDGET: total tokens a single ticket may consume.
+- TICKET_MAX_LLM_CALLS: number of model calls a single ticket may make.
+- TICKET_BUDGET_DEGRADE_RATIO: fraction of a budget after which calls are
+  switched to BUDGET_FALLBACK_MODEL (default 0.8).
+
+Once a budget is exhausted, further model calls for the ticket are refused.
+"""
+
+import os
+import threading
+import time
+from enum import Enum
+from typing import Dict, Optional
+
+from .entities.ticket import AgentUsage, TicketUsage
+
+
+class BudgetState(str, Enum):
+    """Where a ticket stands against its configured budgets."""
+
+    OK = "ok"
+    DEGRADED = "degraded"
+    EXHAUSTED = "exhausted"
+
+
+DEFAULT_FALLBACK_MODEL = "gemini-2.5-flash"
+DEFAULT_USAGE_TTL_SECONDS = 3600.0
+# Idle tickets are looked for at most this often
+EVICTION_INTERVAL_SECONDS = 60.0
+
+
+def _add_call(usage: AgentUsage, prompt_tokens: int, completion_tokens: int, total_tokens: int, seconds: float):
+    usage.llm_calls += 1
+    usage.prompt_tokens += prompt_tokens
+    usage.completion_tokens += completion_tokens
+    usage.total_tokens += total_tokens
+    usage.llm_seconds += seconds
+
+
+class UsageLedger:
+    """Thread-safe running totals of LLM usage, keyed by ticket ID, for the tickets in progress."""
+
+    def __init__(self):
+        self._usage: Dict[str, TicketUsage] = {}
+        self._last_used: Dict[str, float] = {}
+        self._last_eviction = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _touch(self, ticket_id: str) -> None:
+        # Called with the lock held
+        now = time.monotonic()
+        self._last_used[ticket_id] = now
+        if now - self._last_eviction < EVICTION_INTERVAL_SECONDS:
+            return
+        self._last_eviction = now
+        ttl = float(os.getenv("TICKET_USAGE_TTL_SECONDS", DEFAULT_USAGE_TTL_SECONDS))
+        for idle in [t for t, last_used in self._last_used.items() if now - last_used > ttl]:
+            self._usage.pop(idle, None)
+            self._last_used.pop(idle, None)
+
+    def seed(self, ticket_id: str, usage: Optional[dict]) -> None:
+        """
+        Restores a ticket's totals from a previously persisted `SupportTicket.usage`,
+        e.g. when a session is resumed in a fresh process. The persisted totals
+        replace the tracked ones only if they are further ahead, which happens
+        when another worker process ran the ticket's last turns.
+        """
+        if not usage:
+            return
+        persisted = TicketUsage.model_validate(usage)
+        with self._lock:
+            tracked = self._usage.get(ticket_id)
+            if tracked is None or persisted.llm_calls > tracked.llm_calls:
+                self._usage[ticket_id] = persisted
+                self._touch(ticket_id)
+
+    def record(
+        self,
+        ticket_id: str,
+        agent: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        total_tokens: int,
+        seconds: float,
+    ) -> TicketUsage:
+        """Adds one model call to the ticket's totals and returns a snapshot of them."""
+        with self._lock:
+            usage = self._usage.setdefault(ticket_id, TicketUsage())
+            self._touch(ticket_id)
+            _add_call(usage, prompt_tokens, completion_tokens, total_tokens, seconds)
+            _add_call(usage.by_agent.setdefault(agent, AgentUsage()), prompt_tokens, completion_tokens, total_tokens, seconds)
+            return usage.model_copy(deep=True)
+
+    def get(self, ticket_id: str) -> TicketUsage:
+        """Returns a snapshot of the ticket's totals (zeros if it has none yet)."""
+        with self._lock:
+            usage = self._usage.get(ticket_id)
+            return usage.model_copy(deep=True) if usage else TicketUsage()
+
+    def tracked(self, ticket_id: str) -> Optional[TicketUsage]:
+        """Returns a snapshot of the ticket's totals, or None if the ledger holds none for it."""
+        with self._lock:
+            usage = self._usage.get(ticket_id)
+            return usage.model_copy(deep=True) if usage else None
+
+    def forget(self, ticket_id: str) -> None:
+        """Drops the ticket's totals, e.g. once it is resolved."""
+        with self._lock:
+            self._usage.pop(ticket_id, None)
+            self._last_used.pop(ticket_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._usage)
+
+
+# The process-wide ledger that the model callbacks record into
+ledger = UsageLedger()
+
+
+def _limit(name: str) -> int:
+    return int(os.getenv(name, "0") or 0)
+
+
+def budget_state(usage: TicketUsage) -> BudgetState:
+    """Compares a ticket's usage with the configured budgets."""
+    degrade_ratio = float(os.getenv("TICKET_BUDGET_DEGRADE_RATIO", "0.8"))
+    state = BudgetState.OK
+    for used, limit in (
+        (usage.total_tokens, _limit("TICKET_TOKEN_BUDGET")),
+        (usage.llm_calls, _limit("TICKET_MAX_LLM_CALLS")),
+    ):
+        if limit <= 0:
+            continue
+        if used >= limit:
+            return BudgetState.EXHAUSTED
+        if used >= limit * degrade_ratio:
+            state = BudgetState.DEGRADED
+    return state
+
+
+def fallback_model() -> str:
+    """The cheaper model used once a ticket is close to its budget."""
+    return os.getenv("BUDGET_FALLBACK_MODEL", DEFAULT_FALLBACK_MODEL)
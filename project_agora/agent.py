@@ -14,7 +14,7 @@ from .sub_agents.ticket_analysis.agent import ticket_analysis_agent
 from .sub_agents.knowledge_retrieval.agent import knowledge_retrieval_agent
 from .sub_agents.db_retrieval.agent import db_retrieval_agent
 from .sub_agents.problem_solver.agent import problem_solver_agent
-from .sub_agents.code_generator.agent import code_generator_agent
+from .sub_agents.code_generator.agent import code_generator_agent, file_generator_agent
 from .sub_agents.code_reviewer.agent import code_reviewer_agent
 
 # Import tools that the orchestrator will call directly
@@ -26,12 +26,20 @@ from .tools.tools import (
     format_code_reviewer_output,
 )
 
-from .callbacks import before_agent_call, before_tool_call, after_tool_call
+from .callbacks import agent_callbacks
+from .code_speculation import enable_code_speculation_from_env
+from .llm_cache import enable_llm_cache_from_env
+from .parallel_codegen import CodeGeneratorTool
+from .model_router import router
+from .rate_limiter import enable_rate_limits_from_env
+from .scheduler import enable_scheduler_from_env
+from .speculation import enable_speculation_from_env
+from .streaming import StreamingAgentTool
 
 # The main Orchestrator Agent
 orchestrator_agent = Agent(
     name="orchestrator_agent",
-    model="gemini-2.5-pro",
+    model=router.model_for("orchestrator_agent"),
     global_instruction="""
         You are 'Agora', an expert system and lead orchestrator for a multi-agent system specializing in the **Google Agent Development Kit (ADK)**. You are modeled after the ancient Greek Agora—a central hub for collaboration.
 
@@ -52,13 +60,28 @@ orchestrator_agent = Agent(
         AgentTool(ticket_analysis_agent),
         AgentTool(knowledge_retrieval_agent),
         AgentTool(db_retrieval_agent),
-        AgentTool(problem_solver_agent),
-        AgentTool(code_generator_agent),
+        # Streamed to the user as it generates; a streamed solution is shown as-is instead of being retyped
+        StreamingAgentTool(problem_solver_agent, skip_summarization_when_streamed=True),
+        CodeGeneratorTool(code_generator_agent),
         AgentTool(code_reviewer_agent),
     ],
-    before_agent_callback=before_agent_call,
-    before_tool_callback=before_tool_call,
-    after_tool_callback=after_tool_call,
+    **agent_callbacks(),
 )
 
-root_agent = orchestrator_agent
\ No newline at end of file
+root_agent = orchestrator_agent
+
+# Pace every model call by its model's rate limits, backing off on 429s
+enable_rate_limits_from_env(root_agent)
+# Queue model calls by ticket urgency; a call holds its slot while it waits for the rate limiter too
+enable_scheduler_from_env(root_agent)
+# Record or replay model responses when AGORA_LLM_CACHE is set; cache hits bypass the rate limits
+enable_llm_cache_from_env(root_agent)
+# Start knowledge-base and ticket retrieval on the raw request as soon as a ticket is created
+enable_speculation_from_env(root_agent)
+# Generate the code for a plan while the user reviews it, when AGORA_SPECULATIVE_CODEGEN=1
+enable_code_speculation_from_env(root_agent)
+
+# The per-file generator runs outside the tree (AGORA_CODEGEN_MODE=parallel) but is paced, queued and cached like it
+enable_rate_limits_from_env(file_generator_agent)
+enable_scheduler_from_env(file_generator_agent)
+enable_llm_cache_from_env(file_generator_agent)
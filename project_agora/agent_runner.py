@@ -0,0 +1,49 @@
+# FILE: project_agora/agent_runner.py
+
+"""
+Runs a sub-agent on its own, outside of a tool call.
+
+`AgentTool` runs its agent inside the calling agent's tool call. Work that
+starts before the orchestrator asks for it, or that fans out over several
+agent runs at once, needs the same nested run without a ToolContext: a fresh
+in-memory session seeded with a copy of the caller's state, a single user
+message, and the text of the last event as the result.
+"""
+
+from typing import Optional
+
+from google.adk.agents import BaseAgent
+from google.genai import types
+
+APP_NAME = "project_agora"
+
+
+def copy_state(state) -> dict:
+    """A copy of session state that a nested run may be seeded with (ADK-internal keys removed)."""
+    items = state.to_dict() if hasattr(state, "to_dict") else dict(state)
+    return {key: value for key, value in items.items() if not key.startswith("_adk")}
+
+
+async def run_agent(agent: BaseAgent, request: str, state: Optional[dict] = None, user_id: str = "agora") -> str:
+    """
+    Runs `agent` on `request` in a session seeded with `state` and returns its
+    final text, as `AgentTool` would have returned it.
+    """
+    # Imported on first use, as AgentTool does, to keep it off the startup path
+    from google.adk.runners import InMemoryRunner
+
+    runner = InMemoryRunner(agent=agent, app_name=APP_NAME)
+    try:
+        session = await runner.session_service.create_session(app_name=APP_NAME, user_id=user_id, state=state or {})
+        message = types.Content(role="user", parts=[types.Part(text=request)])
+        last_content, last_error = None, None
+        async for event in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+            if event.error_message:
+                last_error = event.error_message
+            if event.content:
+                last_content = event.content
+    finally:
+        await runner.close()
+    if last_content is None or not last_content.parts:
+        return last_error or ""
+    return "\n".join(part.text for part in last_content.parts if part.text and not part.thought)
@@ -0,0 +1,25 @@
+# FILE: project_agora/agent_tree.py
+
+"""
+Walks the agent tree.
+
+The orchestrator reaches most of its sub-agents through `AgentTool`s rather
+than `sub_agents`, so anything that has to visit every agent (wrapping their
+models, finding the agents to run speculatively, warming up their tools) walks
+both.
+"""
+
+from typing import Iterator
+
+from google.adk.agents import BaseAgent
+from google.adk.tools.agent_tool import AgentTool
+
+
+def walk_agents(root: BaseAgent) -> Iterator[BaseAgent]:
+    """Yields `root` and every agent below it, including the agents wrapped by AgentTools."""
+    yield root
+    for tool in getattr(root, "tools", []):
+        if isinstance(tool, AgentTool):
+            yield from walk_agents(tool.agent)
+    for sub_agent in root.sub_agents:
+        yield from walk_agents(sub_agent)
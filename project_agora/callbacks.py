@@ -1,16 +1,112 @@
 # FILE: project_agora/callbacks.py
 
 import json
+import time
 
 # Corrected imports from previous steps
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.agent_tool import AgentTool
 from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from . import code_speculation, speculation
+from .agent_runner import copy_state
+from .accounting import BudgetState, budget_state, fallback_model, ledger
+from .logging_config import logger, set_log_context # Import our configured logger
+from .metrics import DEFAULT_SIZE_BUCKETS, registry
+from .model_router import router
+from .scheduler import acquire_tool_slot, current_priority, lower_priority, release_tool_slot, ticket_priority
+
+# Framework-internal tools that are not worth logging or timing
+_IGNORED_TOOLS = ["load_artifacts", "code_interpreter"]
+
+tool_duration_seconds = registry.histogram(
+    "agora_tool_duration_seconds", "Wall-clock duration of tool calls, by tool."
+)
+tool_response_bytes = registry.histogram(
+    "agora_tool_response_bytes", "Size of tool responses, by tool.", buckets=DEFAULT_SIZE_BUCKETS
+)
+tool_errors_total = registry.counter(
+    "agora_tool_errors_total", "Tool calls that raised or returned an error, by tool."
+)
+agent_duration_seconds = registry.histogram(
+    "agora_agent_duration_seconds", "Wall-clock duration of an agent's turn, by agent."
+)
+agent_errors_total = registry.counter(
+    "agora_agent_errors_total", "Model call errors raised while an agent was running, by agent."
+)
+llm_call_duration_seconds = registry.histogram(
+    "agora_llm_call_duration_seconds", "Wall-clock duration of model calls, by agent, routing profile, tier and model."
+)
+llm_calls_total = registry.counter(
+    "agora_llm_calls_total", "Model calls made, by agent, routing profile, tier and model."
+)
+llm_tokens_total = registry.counter(
+    "agora_llm_tokens_total", "Tokens consumed by model calls, by agent and kind (prompt/completion)."
+)
+llm_budget_actions_total = registry.counter(
+    "agora_llm_budget_actions_total", "Model calls downgraded or refused because a ticket hit its budget."
+)
+
+# Start times of in-flight agent turns, model calls and tool calls, keyed by invocation, agent and call id
+_agent_start_times: dict[tuple, float] = {}
+_model_start_times: dict[tuple, tuple] = {}
+_tool_start_times: dict[tuple, float] = {}
+
+
+def _agent_key(callback_context: CallbackContext) -> tuple:
+    return (callback_context.invocation_id, callback_context.agent_name)
+
+
+def _tool_key(tool: object, tool_context: ToolContext) -> tuple:
+    return (*_agent_key(tool_context), tool_context.function_call_id or tool.name)
+
+
+def _drop_tool_calls(callback_context: CallbackContext) -> None:
+    """Forgets the agent's tool calls that never finished (cancelled), and gives their scheduler slots back."""
+    agent_key = _agent_key(callback_context)
+    for key in [key for key in _tool_start_times if key[:2] == agent_key]:
+        del _tool_start_times[key]
+        release_tool_slot(key)
+
+
+def _ticket_from_state(state) -> dict | None:
+    """Returns the ticket stored in session state as a dict, or None if absent or unparsable."""
+    if "ticket" not in state:
+        return None
+    try:
+        return json.loads(state["ticket"])
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def _set_log_context_from(context) -> None:
+    """Tags subsequent log records with the ticket, session and invocation being processed."""
+    ticket = _ticket_from_state(context.state) or {}
+    set_log_context(
+        ticket_id=ticket.get("ticket_id"),
+        session_id=context.session.id,
+        invocation_id=context.invocation_id,
+        agent=context.agent_name,
+    )
+
+
+def _is_error_response(tool_response) -> bool:
+    """Tools report some failures as values rather than exceptions (e.g. 'Error: ...')."""
+    if isinstance(tool_response, str):
+        return tool_response.startswith("Error")
+    if isinstance(tool_response, dict):
+        return "error" in tool_response
+    return False
 
-from .logging_config import logger # Import our configured logger
 
 def before_agent_call(callback_context: CallbackContext):
-    """Logs the start of an agent's turn."""
-    logger.info("Orchestrator turn started.")
+    """Logs the start of an agent's turn and starts its latency timer."""
+    _agent_start_times[_agent_key(callback_context)] = time.perf_counter()
+    _set_log_context_from(callback_context)
+    logger.info("Agent '%s' turn started.", callback_context.agent_name)
     # We can still access the state to get ticket info
     if "ticket" in callback_context.state:
         try:
@@ -20,25 +116,221 @@ def before_agent_call(callback_context: CallbackContext):
             logger.warning("Could not parse ticket from state during before_agent_call.")
 
 
-def before_tool_call(tool: object, args: dict, tool_context: ToolContext):
-    """Logs information before a tool is called."""
-    if tool.name in ["load_artifacts", "code_interpreter"]:
+def _persist_usage(callback_context: CallbackContext, ticket: dict) -> None:
+    """Mirrors the ledger's totals onto the ticket, and drops them from the ledger once the ticket is resolved."""
+    ticket_id = ticket.get("ticket_id")
+    usage = ledger.tracked(ticket_id) if ticket_id else None
+    if usage is None:
+        return
+    if ticket.get("usage") != usage.model_dump():
+        ticket["usage"] = usage.model_dump()
+        callback_context.state["ticket"] = json.dumps(ticket, indent=2)
+    if ticket.get("status") == "Resolved":
+        ledger.forget(ticket_id)
+
+
+def after_agent_call(callback_context: CallbackContext):
+    """
+    Records how long the agent's turn took, persists the ticket's LLM usage and
+    drops code speculated for a plan this turn did not approve.
+    """
+    _drop_tool_calls(callback_context)
+    ticket = _ticket_from_state(callback_context.state) or {}
+    _persist_usage(callback_context, ticket)
+    code_speculation.end_of_turn(ticket.get("ticket_id"), callback_context.agent_name, callback_context.invocation_id)
+    started_at = _agent_start_times.pop(_agent_key(callback_context), None)
+    if started_at is None:
+        return
+    duration = time.perf_counter() - started_at
+    agent_duration_seconds.observe(duration, agent=callback_context.agent_name)
+    logger.info("Agent '%s' turn finished in %.2fs.", callback_context.agent_name, duration)
+
+
+def on_model_error_call(callback_context: CallbackContext, llm_request, error: Exception):
+    """Counts model failures against the agent that made the call. The error is re-raised."""
+    _model_start_times.pop(_agent_key(callback_context), None)
+    # The error ends the agent's turn, so after_agent_call will not run for it
+    _agent_start_times.pop(_agent_key(callback_context), None)
+    agent_errors_total.inc(agent=callback_context.agent_name)
+    logger.error("Agent '%s' model call failed: %s", callback_context.agent_name, error)
+
+
+def before_model_call(callback_context: CallbackContext, llm_request: LlmRequest):
+    """
+    Picks the model for this call from the routing table, sets its scheduling
+    priority, starts its latency timer and enforces the ticket's budget: near
+    the limit the call is switched
+    to the fallback model, and once the budget is exhausted the call is refused
+    with a canned response.
+    """
+    agent = callback_context.agent_name
+    ticket = _ticket_from_state(callback_context.state)
+    tier, llm_request.model = router.route(agent, ticket)
+    # ScheduledLlm queues the call at this priority; speculative work yields to the real thing
+    priority = ticket_priority(ticket)
+    current_priority.set(lower_priority(priority) if code_speculation.current.get() else priority)
+
+    if ticket and ticket.get("ticket_id"):
+        ticket_id = ticket["ticket_id"]
+        ledger.seed(ticket_id, ticket.get("usage"))
+        state = budget_state(ledger.get(ticket_id))
+        if state == BudgetState.EXHAUSTED:
+            llm_budget_actions_total.inc(action="stopped", agent=agent)
+            logger.warning("Ticket %s has exhausted its LLM budget; refusing model call from '%s'.", ticket_id, agent)
+            return LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part(text=(
+                        f"Processing of ticket {ticket_id} has stopped because it exhausted its LLM budget. "
+                        "Please review the work done so far or open a new request."
+                    ))],
+                )
+            )
+        if state == BudgetState.DEGRADED and llm_request.model != fallback_model():
+            llm_budget_actions_total.inc(action="degraded", agent=agent)
+            logger.info("Ticket %s is close to its LLM budget; '%s' switched from %s to %s.", ticket_id, agent, llm_request.model, fallback_model())
+            tier, llm_request.model = "fallback", fallback_model()
+
+    llm_calls_total.inc(agent=agent, profile=router.profile_name, tier=tier, model=llm_request.model)
+    _model_start_times[_agent_key(callback_context)] = (time.perf_counter(), tier, llm_request.model)
+
+
+def after_model_call(callback_context: CallbackContext, llm_response: LlmResponse):
+    """Records the call's token usage and latency against the current ticket and agent."""
+    # Streamed responses report usage on the final, non-partial chunk only
+    if llm_response.partial:
         return
-    logger.info("Orchestrator calling tool '%s' with args: %s", tool.name, args)
+    started_at, tier, model = _model_start_times.pop(_agent_key(callback_context), (None, "unknown", None))
+    if llm_response.usage_metadata is None:
+        return
+    duration = time.perf_counter() - started_at if started_at is not None else 0.0
+
+    agent = callback_context.agent_name
+    usage = llm_response.usage_metadata
+    prompt_tokens = usage.prompt_token_count or 0
+    completion_tokens = (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)
+    total_tokens = usage.total_token_count or prompt_tokens + completion_tokens
+
+    llm_call_duration_seconds.observe(duration, agent=agent, profile=router.profile_name, tier=tier, model=model or llm_response.model_version or "unknown")
+    llm_tokens_total.inc(prompt_tokens, agent=agent, kind="prompt")
+    llm_tokens_total.inc(completion_tokens, agent=agent, kind="completion")
+    code_speculation.record_tokens(total_tokens)
+
+    ticket = _ticket_from_state(callback_context.state)
+    if not ticket or not ticket.get("ticket_id"):
+        return
+    # The totals are written to the ticket once per agent turn, in after_agent_call
+    ticket_usage = ledger.record(ticket["ticket_id"], agent, prompt_tokens, completion_tokens, total_tokens, duration)
+    logger.debug(
+        "Model call by '%s': %d prompt + %d completion tokens in %.2fs (ticket total: %d tokens, %d calls).",
+        agent, prompt_tokens, completion_tokens, duration, ticket_usage.total_tokens, ticket_usage.llm_calls,
+    )
+
+
+async def _speculative_result(agent_name: str, ticket_id: str | None, request: str, state) -> str | None:
+    if agent_name == code_speculation.GENERATOR_AGENT:
+        return await code_speculation.claim_code(ticket_id, request, state.get("code_plan"))
+    if agent_name == code_speculation.REVIEWER_AGENT:
+        return await code_speculation.claim_review(ticket_id, request)
+    return await speculation.claim(ticket_id, agent_name, request)
+
+
+async def before_tool_call(tool: object, args: dict, tool_context: ToolContext):
+    """
+    Logs information before a tool is called, waits for a scheduler slot at the
+    ticket's priority and starts its latency timer. Sub-agent calls are not
+    scheduled themselves; their model calls are. A retrieval, code generation
+    or code review sub-agent call is answered with its speculative result when
+    one was started and still applies.
+    """
+    if tool.name in _IGNORED_TOOLS:
+        return
+    _set_log_context_from(tool_context)
+    ticket = _ticket_from_state(tool_context.state)
+    priority = ticket_priority(ticket)
+    current_priority.set(priority)
+    if not isinstance(tool, AgentTool):
+        await acquire_tool_slot(_tool_key(tool, tool_context), priority)
+    _tool_start_times[_tool_key(tool, tool_context)] = time.perf_counter()
+    logger.info("Agent '%s' calling tool '%s' with args: %s", tool_context.agent_name, tool.name, args)
+
+    if isinstance(tool, AgentTool) and ticket:
+        result = await _speculative_result(tool.agent.name, ticket.get("ticket_id"), str(args.get("request", "")), tool_context.state)
+        if result is not None:
+            output_key = speculation.output_key(tool.agent.name)
+            if output_key:
+                tool_context.state[output_key] = result
+            # The sub-agent is skipped; after_tool_call still records the call
+            return {"result": result}
 
 
 def after_tool_call(tool: object, args: dict, tool_context: ToolContext, tool_response: str):
-    """Logs information after a tool has been called."""
-    if tool.name in ["load_artifacts", "code_interpreter"]:
+    """Logs information after a tool has been called and records its latency and size."""
+    if tool.name in _IGNORED_TOOLS:
         return
+    release_tool_slot(_tool_key(tool, tool_context))
+    started_at = _tool_start_times.pop(_tool_key(tool, tool_context), None)
+    if started_at is not None:
+        tool_duration_seconds.observe(time.perf_counter() - started_at, tool=tool.name)
+
+    response_text = tool_response if isinstance(tool_response, str) else str(tool_response)
+    tool_response_bytes.observe(len(response_text.encode("utf-8")), tool=tool.name)
+    if _is_error_response(tool_response):
+        tool_errors_total.inc(tool=tool.name)
+
     # Truncate long tool responses for cleaner logs
-    if isinstance(tool_response, str):
-        truncated_response = (
-            tool_response[:250] + "..." if len(tool_response) > 250 else tool_response
-        )
-    else:
-        truncated_response = str(tool_response)
+    truncated_response = (
+        response_text[:250] + "..." if len(response_text) > 250 else response_text
+    )
 
     logger.info(
         "Tool '%s' finished. Response: %s", tool.name, truncated_response
-    )
\ No newline at end of file
+    )
+
+    if tool.name == "create_ticket" and not _is_error_response(tool_response):
+        # Retrieval on the raw request runs while the ticket is analysed
+        ticket = _ticket_from_state(tool_context.state) or {}
+        if ticket.get("ticket_id"):
+            speculation.start(ticket["ticket_id"], ticket.get("request") or args.get("request", ""), copy_state(tool_context.state))
+
+    if (
+        isinstance(tool, AgentTool)
+        and code_speculation.is_plan_request(tool.agent.name, str(args.get("request", "")))
+        and not _is_error_response(tool_response)
+    ):
+        # Kept for the MODE 2 call, and the code for it is generated while the user reviews the plan
+        tool_context.state["code_plan"] = response_text
+        ticket = _ticket_from_state(tool_context.state) or {}
+        if ticket.get("ticket_id"):
+            code_speculation.start(
+                ticket["ticket_id"], response_text, copy_state(tool_context.state),
+                tool_context.agent_name, tool_context.invocation_id,
+            )
+
+
+def on_tool_error_call(tool: object, args: dict, tool_context: ToolContext, error: Exception):
+    """Records a failed tool call. Returning None lets the exception propagate as before."""
+    # The exception ends the calling agent's turn, so after_agent_call will not run for it
+    _agent_start_times.pop(_agent_key(tool_context), None)
+    if tool.name in _IGNORED_TOOLS:
+        return
+    release_tool_slot(_tool_key(tool, tool_context))
+    started_at = _tool_start_times.pop(_tool_key(tool, tool_context), None)
+    if started_at is not None:
+        tool_duration_seconds.observe(time.perf_counter() - started_at, tool=tool.name)
+    tool_errors_total.inc(tool=tool.name)
+    logger.error("Tool '%s' raised %s: %s", tool.name, type(error).__name__, error)
+
+
+def agent_callbacks() -> dict:
+    """The callbacks above as `LlmAgent` keyword arguments; every Agora agent is built with `**agent_callbacks()`."""
+    return {
+        "before_agent_callback": before_agent_call,
+        "after_agent_callback": after_agent_call,
+        "before_model_callback": before_model_call,
+        "after_model_callback": after_model_call,
+        "before_tool_callback": before_tool_call,
+        "after_tool_callback": after_tool_call,
+        "on_tool_error_callback": on_tool_error_call,
+        "on_model_error_callback": on_model_error_call,
+    }
@@ -0,0 +1,340 @@
+# FILE: project_agora/code_speculation.py
+
+"""
+Speculative code generation while a plan awaits the user's approval.
+
+Once `code_generator_agent` has produced a plan (MODE 1), the ticket waits in
+AwaitingPlanApproval for the user's answer, and only then does MODE 2, the
+slowest step of the workflow, start. With AGORA_SPECULATIVE_CODEGEN=1 the
+full code is generated in the background as soon as the plan exists, and,
+with AGORA_SPECULATIVE_CODE_REVIEW=1, reviewed as well:
+
+- on approval, the orchestrator's MODE 2 call is answered with the
+  speculative code, waiting for it if it is still being generated. The review
+  call is answered likewise when it is given that same code;
+- a new plan for the ticket cancels the speculation and starts one for the
+  new plan. Changes asked for with an approval ("yes, but use Postgres") are
+  planned again before any code is generated (see the orchestrator's
+  AwaitingPlanApproval state), so they take this path too;
+- a MODE 2 call made while the ticket's plan (`code_plan` in state) differs
+  from the speculated one, or that quotes a different plan, cancels the
+  speculation and the code is generated for what was asked;
+- a later orchestrator turn that does not use the code (the user declined or
+  asked something else) cancels it.
+
+Speculation costs tokens that are wasted when the plan is not approved, so it
+is bounded:
+
+- at most AGORA_SPECULATIVE_CODEGEN_MAX_RUNNING speculations run at once per
+  process (default 2);
+- no speculation starts for a ticket that is close to its LLM budget, and
+  speculative model calls count against that budget like any other;
+- speculative model calls are queued one priority level below the ticket's;
+- speculation pauses while more than AGORA_SPECULATIVE_CODEGEN_MAX_WASTE
+  (default 0.5) of the last 20 finished speculations were wasted.
+
+`agora_code_speculation_total` counts outcomes by stage, and
+`agora_code_speculation_tokens_total` counts the tokens of used and of wasted
+speculations.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import re
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from google.adk.agents import BaseAgent
+from pydantic import BaseModel, ConfigDict
+
+from .accounting import BudgetState, budget_state, ledger
+from .agent_runner import run_agent
+from .agent_tree import walk_agents
+from .logging_config import logger
+from .metrics import registry
+
+GENERATOR_AGENT = "code_generator_agent"
+REVIEWER_AGENT = "code_reviewer_agent"
+# The code generator's MODE 2 is requested with this marker (see CODE_GENERATOR_PROMPT)
+CONFIRMATION_MARKER = "user_confirmation"
+DEFAULT_MAX_RUNNING = 2
+DEFAULT_MAX_WASTE = 0.5
+DEFAULT_TTL_SECONDS = 1800.0
+# Finished speculations the waste ratio is computed over, and how many are needed before it applies
+WASTE_WINDOW = 20
+WASTE_MIN_SAMPLES = 5
+
+_FILE_HEADER_RE = re.compile(r"^==== FILE: .+ ====$", re.MULTILINE)
+
+code_speculation_total = registry.counter(
+    "agora_code_speculation_total",
+    "Speculative code generation and review by stage and outcome (used, unused, rejected, replanned, edited, expired, error, skipped).",
+)
+code_speculation_tokens_total = registry.counter(
+    "agora_code_speculation_tokens_total", "Tokens spent on speculative code generation and review, by outcome (used, wasted)."
+)
+code_speculation_running = registry.gauge("agora_code_speculation_running", "Speculative code generations in progress.")
+code_speculation_saved_seconds = registry.histogram(
+    "agora_code_speculation_saved_seconds", "Generation time that had already elapsed in the background when speculative code was used."
+)
+
+
+class CodeSpeculation(BaseModel):
+    """The background generation (and review) started for one ticket's plan."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    ticket_id: str
+    plan: str
+    owner_agent: str
+    invocation_id: str
+    started_at: float
+    finished_at: Optional[float] = None
+    tokens: int = 0
+    code_task: Optional[asyncio.Task] = None
+    review_task: Optional[asyncio.Task] = None
+    code_used: Optional[str] = None
+    review_done: bool = False
+
+
+# Set inside speculative runs, so their model calls can be lowered in priority and their tokens counted
+current: contextvars.ContextVar[Optional[CodeSpeculation]] = contextvars.ContextVar("agora_code_speculation", default=None)
+
+_agents: Dict[str, BaseAgent] = {}
+_speculations: Dict[str, CodeSpeculation] = {}
+_outcomes: deque = deque(maxlen=WASTE_WINDOW)
+
+
+def enabled() -> bool:
+    return os.getenv("AGORA_SPECULATIVE_CODEGEN", "0") == "1" and GENERATOR_AGENT in _agents
+
+
+def review_enabled() -> bool:
+    return os.getenv("AGORA_SPECULATIVE_CODE_REVIEW", "0") == "1" and REVIEWER_AGENT in _agents
+
+
+def waste_ratio() -> float:
+    """Fraction of the recent finished speculations whose code was never used."""
+    return sum(_outcomes) / len(_outcomes) if _outcomes else 0.0
+
+
+def is_plan_request(agent_name: str, request: str) -> bool:
+    return agent_name == GENERATOR_AGENT and CONFIRMATION_MARKER not in request
+
+
+def generation_request(plan: str) -> str:
+    """The MODE 2 request for an approved `plan`."""
+    return f"{CONFIRMATION_MARKER}: The user approved the plan below. Generate the full code for it.\n\n{plan}"
+
+
+def register_agent_tree(root: BaseAgent) -> None:
+    """Finds the code generator and reviewer below `root`."""
+    for agent in walk_agents(root):
+        if agent is not root and agent.name in (GENERATOR_AGENT, REVIEWER_AGENT):
+            _agents[agent.name] = agent
+
+
+def record_tokens(total_tokens: int) -> None:
+    """Adds a model call's tokens to the speculation it belongs to, if any."""
+    speculation = current.get()
+    if speculation is not None:
+        speculation.tokens += total_tokens
+
+
+def _skip_reason(ticket_id: str) -> Optional[str]:
+    max_running = int(os.getenv("AGORA_SPECULATIVE_CODEGEN_MAX_RUNNING", DEFAULT_MAX_RUNNING))
+    running = sum(1 for s in _speculations.values() if s.finished_at is None)
+    if running >= max_running:
+        return f"{running} speculations already running"
+    if budget_state(ledger.get(ticket_id)) != BudgetState.OK:
+        return "the ticket is close to its LLM budget"
+    max_waste = float(os.getenv("AGORA_SPECULATIVE_CODEGEN_MAX_WASTE", DEFAULT_MAX_WASTE))
+    if len(_outcomes) >= WASTE_MIN_SAMPLES and waste_ratio() > max_waste:
+        return f"{waste_ratio():.0%} of recent speculations were wasted"
+    return None
+
+
+def _finish(speculation: CodeSpeculation, outcome: str) -> None:
+    """Cancels what is still running and records whether the speculation paid off."""
+    _speculations.pop(speculation.ticket_id, None)
+    for task in (speculation.code_task, speculation.review_task):
+        if task is not None:
+            task.cancel()
+    wasted = speculation.code_used is None
+    if wasted:
+        code_speculation_total.inc(stage="generate", outcome=outcome)
+    if speculation.review_task is not None and not speculation.review_done:
+        code_speculation_total.inc(stage="review", outcome=outcome if wasted else "unused")
+    _outcomes.append(wasted)
+    code_speculation_tokens_total.inc(speculation.tokens, outcome="wasted" if wasted else "used")
+
+
+def _expire(now: float) -> None:
+    ttl = float(os.getenv("AGORA_SPECULATIVE_CODEGEN_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    for speculation in [s for s in _speculations.values() if now - s.started_at > ttl]:
+        _finish(speculation, "expired")
+
+
+async def _generate(speculation: CodeSpeculation, state: dict) -> str:
+    # Imported here because parallel_codegen builds on this module
+    from .parallel_codegen import generate_code
+
+    current.set(speculation)
+    code_speculation_running.inc()
+    try:
+        return await generate_code(speculation.plan, state, _agents[GENERATOR_AGENT])
+    finally:
+        speculation.finished_at = time.monotonic()
+        code_speculation_running.dec()
+
+
+async def _review(speculation: CodeSpeculation, state: dict) -> str:
+    # Shielded, so cancelling the review alone leaves the generation running
+    code = await asyncio.shield(speculation.code_task)
+    current.set(speculation)
+    return await run_agent(_agents[REVIEWER_AGENT], code, state)
+
+
+def start(ticket_id: str, plan: str, state: dict, owner_agent: str, invocation_id: str) -> None:
+    """Starts generating the code for `plan` in the background (needs a running event loop)."""
+    if not enabled():
+        return
+    now = time.monotonic()
+    _expire(now)
+    previous = _speculations.get(ticket_id)
+    if previous is not None:
+        logger.info(f"Plan for ticket {ticket_id} changed; cancelling its speculative code generation.")
+        _finish(previous, "replanned")
+    reason = _skip_reason(ticket_id)
+    if reason:
+        code_speculation_total.inc(stage="generate", outcome="skipped")
+        logger.info(f"Speculative code generation skipped for ticket {ticket_id}: {reason}.")
+        return
+    speculation = CodeSpeculation(
+        ticket_id=ticket_id, plan=plan, owner_agent=owner_agent, invocation_id=invocation_id, started_at=now
+    )
+    speculation.code_task = asyncio.create_task(_generate(speculation, state), name=f"speculative-code-{ticket_id}")
+    if review_enabled():
+        speculation.review_task = asyncio.create_task(_review(speculation, state), name=f"speculative-review-{ticket_id}")
+    for task in (speculation.code_task, speculation.review_task):
+        if task is not None:
+            task.add_done_callback(_retrieve_exception)
+    _speculations[ticket_id] = speculation
+    logger.info(f"Speculative code generation started for ticket {ticket_id}.")
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Speculative task {task.get_name()} failed: {task.exception()}")
+
+
+def _embedded_plan(request: str) -> Optional[dict]:
+    """The JSON plan quoted in a MODE 2 request, if there is one."""
+    start, end = request.find("{"), request.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        plan = json.loads(request[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return plan if isinstance(plan, dict) else None
+
+
+def plan_edits(plan: str, request: str, current_plan: Optional[str] = None) -> Optional[str]:
+    """
+    How the plan a MODE 2 `request` asks code for departs from the speculated
+    `plan`, or None if it is the same: the ticket's `current_plan` has changed
+    since, or the request quotes a different plan.
+    """
+    # Imported here because parallel_codegen builds on this module
+    from .parallel_codegen import parse_plan
+
+    if current_plan is not None and current_plan != plan:
+        return "the ticket's plan changed"
+    quoted = _embedded_plan(request)
+    if quoted is not None and quoted != parse_plan(plan):
+        return "the request carries a different plan"
+    return None
+
+
+async def claim_code(ticket_id: Optional[str], request: str, plan: Optional[str] = None) -> Optional[str]:
+    """
+    Returns the speculative code for the ticket's approved plan, waiting for
+    it if needed, or None if the code generator should run. `plan` is the
+    ticket's current plan; when it, or the approval in `request`, departs from
+    the speculated plan, the speculation is cancelled.
+    """
+    speculation = _speculations.get(ticket_id) if ticket_id else None
+    if speculation is None or CONFIRMATION_MARKER not in request or speculation.code_used is not None:
+        return None
+    edits = plan_edits(speculation.plan, request, plan)
+    if edits:
+        logger.info(f"Speculative code for ticket {ticket_id} discarded: {edits}.")
+        _finish(speculation, "edited")
+        return None
+    claimed_at = time.monotonic()
+    try:
+        code = await asyncio.shield(speculation.code_task)
+    except Exception as e:
+        logger.warning(f"Speculative code generation failed for ticket {ticket_id}: {e}; generating again.")
+        _finish(speculation, "error")
+        return None
+    speculation.code_used = code
+    code_speculation_total.inc(stage="generate", outcome="used")
+    code_speculation_saved_seconds.observe(min(claimed_at, speculation.finished_at) - speculation.started_at)
+    logger.info(f"Speculative code used for ticket {ticket_id}.")
+    if speculation.review_task is None:
+        _finish(speculation, "used")
+    return code
+
+
+def _same_code(code: str, request: str) -> bool:
+    headers = _FILE_HEADER_RE.findall(code)
+    if headers:
+        return all(header in request for header in headers)
+    return code.strip() in request
+
+
+async def claim_review(ticket_id: Optional[str], request: str) -> Optional[str]:
+    """Returns the speculative review if the reviewer is asked to review the speculative code."""
+    speculation = _speculations.get(ticket_id) if ticket_id else None
+    if speculation is None or speculation.review_task is None or speculation.code_used is None:
+        return None
+    if not _same_code(speculation.code_used, request):
+        # The reviewer was given other code; the speculative review is counted as unused
+        _finish(speculation, "used")
+        return None
+    speculation.review_done = True
+    try:
+        review = await speculation.review_task
+    except Exception as e:
+        code_speculation_total.inc(stage="review", outcome="error")
+        logger.warning(f"Speculative code review failed for ticket {ticket_id}: {e}; reviewing again.")
+        _finish(speculation, "used")
+        return None
+    code_speculation_total.inc(stage="review", outcome="used")
+    logger.info(f"Speculative code review used for ticket {ticket_id}.")
+    _finish(speculation, "used")
+    return review
+
+
+def end_of_turn(ticket_id: Optional[str], agent_name: str, invocation_id: str) -> None:
+    """
+    Called when an agent's turn ends. A turn of the orchestrator after the one
+    that produced the plan either used the code or rejected it.
+    """
+    speculation = _speculations.get(ticket_id) if ticket_id else None
+    if speculation is None or agent_name != speculation.owner_agent or invocation_id == speculation.invocation_id:
+        return
+    if speculation.code_used is None:
+        logger.info(f"Plan for ticket {ticket_id} was not approved; cancelling its speculative code generation.")
+    _finish(speculation, "rejected")
+
+
+def enable_code_speculation_from_env(root: BaseAgent) -> None:
+    """Registers the code generator and reviewer when AGORA_SPECULATIVE_CODEGEN=1."""
+    if os.getenv("AGORA_SPECULATIVE_CODEGEN", "0") == "1":
+        register_agent_tree(root)
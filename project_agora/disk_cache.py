@@ -0,0 +1,129 @@
+# FILE: project_agora/disk_cache.py
+
+"""
+A small, size-bounded LRU cache stored on local disk.
+
+Entries are arbitrary bytes addressed by a string key. Each entry is a file
+named after the SHA-256 of its key; the file's modification time doubles as the
+"last used" timestamp, so recency survives process restarts. When the total
+size exceeds `max_bytes`, the least recently used entries are deleted.
+
+Several processes may share a directory. Each keeps its own index of the
+entries, and every `put()` rescans the directory before deciding what to
+evict, so entries written or deleted by the other processes are accounted for.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class DiskLRUCache:
+    """Size-bounded LRU cache of byte strings on local disk."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # path -> (size in bytes, last access time); loaded lazily from disk
+        self._index: Optional[Dict[Path, Tuple[int, float]]] = None
+        self._total_bytes = 0
+
+    def _path_for(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def _load_index(self):
+        if self._index is None:
+            self._scan()
+
+    def _scan(self):
+        self._index = {}
+        self._total_bytes = 0
+        if self.directory.exists():
+            for path in self.directory.glob("*/*"):
+                if path.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    # Evicted by another process during the scan
+                    continue
+                self._index[path] = (stat.st_size, stat.st_mtime)
+                self._total_bytes += stat.st_size
+
+    def _record(self, path: Path):
+        """Indexes the entry at `path` with its size on disk, replacing what was known about it."""
+        stat = path.stat()
+        self._forget(path)
+        self._index[path] = (stat.st_size, stat.st_mtime)
+        self._total_bytes += stat.st_size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the cached bytes for `key`, or None on a miss."""
+        path = self._path_for(key)
+        with self._lock:
+            self._load_index()
+            try:
+                data = path.read_bytes()
+                # Touch the entry so it counts as recently used
+                os.utime(path)
+                # The entry may have been written by another process, so it is (re)indexed with its size
+                self._record(path)
+            except FileNotFoundError:
+                # Missing, or evicted by another process since it was read
+                self._forget(path)
+                return None
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Stores `data` under `key`, evicting old entries if the cache is over budget."""
+        if len(data) > self.max_bytes:
+            return
+        path = self._path_for(key)
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename so readers never see partial entries
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+            self._scan()
+            self._evict()
+
+    def _forget(self, path: Path):
+        entry = self._index.pop(path, None)
+        if entry is not None:
+            self._total_bytes -= entry[0]
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for path, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._forget(path)
+
+    def clear(self) -> None:
+        """Deletes every entry in the cache."""
+        with self._lock:
+            self._load_index()
+            for path in list(self._index):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                self._forget(path)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load_index()
+            return self._total_bytes
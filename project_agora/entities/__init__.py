@@ -1 +1 @@
-from .ticket import SupportTicket, TicketAnalysis
+from .ticket import AgentUsage, SupportTicket, TicketAnalysis, TicketUsage
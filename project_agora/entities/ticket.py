@@ -5,7 +5,7 @@ These models, SupportTicket and TicketAnalysis, provide structured data handling
 for managing the application's state throughout the multi-agent workflow.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -29,6 +29,28 @@ class TicketAnalysis(BaseModel):
     )
 
 
+class AgentUsage(BaseModel):
+    """Cumulative LLM usage for one agent (or a whole ticket)."""
+
+    llm_calls: int = Field(default=0, description="Number of model calls made.")
+    prompt_tokens: int = Field(default=0, description="Prompt (input) tokens consumed.")
+    completion_tokens: int = Field(
+        default=0, description="Completion (output and thinking) tokens generated."
+    )
+    total_tokens: int = Field(default=0, description="Total tokens billed for the calls.")
+    llm_seconds: float = Field(
+        default=0.0, description="Wall-clock time spent waiting for the model, in seconds."
+    )
+
+
+class TicketUsage(AgentUsage):
+    """Cumulative LLM usage for a ticket, with a breakdown per agent."""
+
+    by_agent: Dict[str, AgentUsage] = Field(
+        default_factory=dict, description="Usage attributed to each agent that worked on the ticket."
+    )
+
+
 class SupportTicket(BaseModel):
     """The central state object representing a developer request."""
 
@@ -77,6 +99,12 @@ class SupportTicket(BaseModel):
         description="The specialist agent currently assigned to the request.",
     )
 
+    # Cost accounting, kept up to date by the model callbacks
+    usage: TicketUsage = Field(
+        default_factory=TicketUsage,
+        description="Cumulative token usage and model latency for this request.",
+    )
+
     def to_json(self) -> str:
         """Converts the SupportTicket object to a JSON string for state management."""
         return self.model_dump_json(indent=2)
@@ -0,0 +1,163 @@
+# FILE: project_agora/llm_cache.py
+
+"""
+Record/replay cache for LLM responses, applied at the model layer.
+
+`CachingLlm` wraps the model of an agent and keys every request by a hash of
+the model name, system instruction, conversation contents and tool
+declarations. Volatile values that differ between otherwise identical runs
+(ADK function-call IDs, generated ticket and customer IDs) are normalized
+before hashing, so a recorded conversation replays on a fresh session.
+
+Modes, selected with AGORA_LLM_CACHE:
+
+- off (default): agents are not wrapped.
+- passthrough: every call goes to the real model; the cache is not touched.
+- record: every call goes to the real model and its responses are stored.
+- replay: responses are served from the cache only. A miss raises
+  `LlmCacheMissError` instead of reaching the network.
+
+Responses are stored in a `DiskLRUCache` under AGORA_LLM_CACHE_DIR, bounded by
+AGORA_LLM_CACHE_MAX_BYTES.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .disk_cache import DiskLRUCache
+from .logging_config import logger
+from .model_wrapper import DelegatingLlm
+from .metrics import registry
+
+MODES = ("off", "passthrough", "record", "replay")
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "project_agora", "llm_responses")
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Generated identifiers that would otherwise make every run's requests unique
+_VOLATILE_PATTERNS = (
+    (re.compile(r"TICK-[0-9A-F]{8}"), "TICK-00000000"),
+    (re.compile(r"DEV-[0-9A-F]{8}"), "DEV-00000000"),
+)
+
+llm_cache_total = registry.counter(
+    "agora_llm_cache_total", "Model calls served from (hit), missing from (miss) or written to (recorded) the LLM cache."
+)
+
+
+class LlmCacheMissError(LookupError):
+    """Raised in replay mode when a request has no recorded response."""
+    pass
+
+
+def cache_mode() -> str:
+    mode = os.getenv("AGORA_LLM_CACHE", "off").lower()
+    if mode not in MODES:
+        raise ValueError(f"AGORA_LLM_CACHE must be one of {', '.join(MODES)}; got '{mode}'.")
+    return mode
+
+
+def _strip_call_ids(value):
+    """Drops the IDs that ADK assigns to function calls and responses."""
+    if isinstance(value, dict):
+        return {
+            key: _strip_call_ids(item)
+            for key, item in value.items()
+            if not (key == "id" and ("name" in value and ("args" in value or "response" in value)))
+        }
+    if isinstance(value, list):
+        return [_strip_call_ids(item) for item in value]
+    return value
+
+
+def request_cache_key(llm_request: LlmRequest, stream: bool) -> str:
+    """Hashes the parts of a request that determine the model's answer."""
+    config = llm_request.config
+    system_instruction = config.system_instruction if config else None
+    if system_instruction is not None and not isinstance(system_instruction, str):
+        system_instruction = system_instruction.model_dump(mode="json", exclude_none=True)
+    payload = {
+        "model": llm_request.model,
+        "system_instruction": system_instruction,
+        "contents": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+        "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in (config.tools or [])] if config else [],
+        "stream": stream,
+    }
+    serialized = json.dumps(_strip_call_ids(payload), sort_keys=True, ensure_ascii=False)
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        serialized = pattern.sub(replacement, serialized)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+_cache: Optional[DiskLRUCache] = None
+
+
+def _get_cache() -> DiskLRUCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskLRUCache(
+            os.getenv("AGORA_LLM_CACHE_DIR", DEFAULT_CACHE_DIR),
+            int(os.getenv("AGORA_LLM_CACHE_MAX_BYTES", DEFAULT_CACHE_MAX_BYTES)),
+        )
+    return _cache
+
+
+class CachingLlm(DelegatingLlm):
+    """A model that records and replays the responses of another model. Live sessions are not cached."""
+
+    mode: str = "passthrough"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        llm_request.model = llm_request.model or self.model
+        inner = self._inner_for(llm_request.model)
+        if self.mode == "passthrough":
+            async for response in inner.generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        cache = _get_cache()
+        key = request_cache_key(llm_request, stream)
+        if self.mode == "replay":
+            cached = cache.get(key)
+            if cached is None:
+                llm_cache_total.inc(result="miss")
+                raise LlmCacheMissError(
+                    f"No recorded response for this {llm_request.model} request (key {key[:12]}). "
+                    "Re-run with AGORA_LLM_CACHE=record to capture it."
+                )
+            llm_cache_total.inc(result="hit")
+            for recorded in json.loads(cached):
+                response = LlmResponse.model_validate(recorded)
+                response.custom_metadata = {**(response.custom_metadata or {}), "llm_cache": "replay"}
+                yield response
+            return
+
+        recorded = []
+        async for response in inner.generate_content_async(llm_request, stream=stream):
+            recorded.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
+        cache.put(key, json.dumps(recorded).encode("utf-8"))
+        llm_cache_total.inc(result="recorded")
+
+
+def wrap_agent_tree(agent: BaseAgent, mode: str) -> None:
+    """Wraps the model of `agent` and of every sub-agent and AgentTool agent below it."""
+    CachingLlm.wrap_agent_tree(agent, mode=mode)
+
+
+def enable_llm_cache_from_env(agent: BaseAgent) -> None:
+    """Wraps the agent tree according to AGORA_LLM_CACHE (no-op when it is 'off')."""
+    mode = cache_mode()
+    if mode == "off":
+        return
+    wrap_agent_tree(agent, mode)
+    logger.info("LLM response cache enabled in '%s' mode.", mode)
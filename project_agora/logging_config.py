@@ -1,10 +1,77 @@
 # FILE: project_agora/logging_config.py
 
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
+# Request-scoped identifiers attached to every log record emitted in the current context
+_log_context: contextvars.ContextVar[dict] = contextvars.ContextVar("agora_log_context", default={})
+
+# Context fields copied onto each record, in output order
+CONTEXT_FIELDS = ("ticket_id", "session_id", "invocation_id", "agent")
+
+
+def set_log_context(**fields) -> None:
+    """
+    Sets request-scoped fields (ticket_id, session_id, invocation_id, agent) for
+    all subsequent log records in the current async task or thread. Fields
+    passed as None are left unchanged.
+    """
+    context = dict(_log_context.get())
+    context.update({name: value for name, value in fields.items() if value is not None})
+    _log_context.set(context)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current log context onto the record before it leaves the calling thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        for name in CONTEXT_FIELDS:
+            setattr(record, name, context.get(name))
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keeps only a random fraction of DEBUG records so verbose tracing stays cheap."""
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.sample_rate >= 1.0:
+            return True
+        return random.random() < self.sample_rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, using Cloud Logging's field names."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
 def _configure_logger():
     """
     Configures a logger that works both locally and on Google Cloud Run.
@@ -12,13 +79,18 @@ def _configure_logger():
     - When running locally, it logs to both the console and a file (`logs/agora.log`).
     - When deployed on Cloud Run, it detects the environment and logs only to the
       console stream, which is automatically captured by Cloud Logging.
+
+    The logger itself only has a `QueueHandler`, so emitting a record costs a
+    queue enqueue; a background `QueueListener` thread does the actual writes.
+    Records are JSON by default (`AGORA_LOG_FORMAT=text` for the plain format),
+    and DEBUG records are sampled at `AGORA_LOG_DEBUG_SAMPLE_RATE`.
     """
     # --- Detect the Environment ---
     IS_ON_CLOUD_RUN = 'K_SERVICE' in os.environ
 
     # Get a specific, named logger for our application
     log_instance = logging.getLogger("project_agora")
-    log_instance.setLevel(logging.INFO)
+    log_instance.setLevel(os.getenv("AGORA_LOG_LEVEL", "INFO").upper())
 
     # Isolate this logger from the root logger to avoid conflicts
     log_instance.propagate = False
@@ -27,19 +99,24 @@ def _configure_logger():
     if log_instance.hasHandlers():
         return log_instance
 
+    if os.getenv("AGORA_LOG_FORMAT", "json").lower() == "text":
+        formatter = logging.Formatter(
+            # Use a more detailed format for clarity
+            "%(asctime)s - [%(levelname)s] - %(name)s - %(message)s"
+        )
+    else:
+        formatter = JsonFormatter()
+
     # --- Configure Console (Stream) Handler ---
     # This is used in BOTH local and cloud environments.
     console_handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        # Use a more detailed format for clarity
-        "%(asctime)s - [%(levelname)s] - %(name)s - %(message)s"
-    )
     console_handler.setFormatter(formatter)
-    log_instance.addHandler(console_handler)
+    handlers = [console_handler]
 
+    startup_messages = []
     if IS_ON_CLOUD_RUN:
         # We are in the cloud. Cloud Logging handles persistence.
-        log_instance.info("Cloud Run environment detected. Logging to standard output only.")
+        startup_messages.append((logging.INFO, "Cloud Run environment detected. Logging to standard output only."))
     else:
         # We are running locally. Add the FileHandler for local development.
         try:
@@ -52,12 +129,27 @@ def _configure_logger():
             # --- Configure File Handler ---
             file_handler = logging.FileHandler(log_file_path, mode='a')
             file_handler.setFormatter(formatter)
-            log_instance.addHandler(file_handler)
-            log_instance.info(f"Local environment detected. Logging to console and '{log_file_path}'.")
+            handlers.append(file_handler)
+            startup_messages.append((logging.INFO, f"Local environment detected. Logging to console and '{log_file_path}'."))
         except Exception as e:
-            log_instance.error(f"Failed to configure file logging: {e}")
+            startup_messages.append((logging.ERROR, f"Failed to configure file logging: {e}"))
+
+    # --- Route everything through a queue drained by a background thread ---
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    log_instance.addHandler(queue_handler)
+    log_instance.addFilter(DebugSamplingFilter(float(os.getenv("AGORA_LOG_DEBUG_SAMPLE_RATE", "0.1"))))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Flush whatever is still queued when the interpreter exits
+    atexit.register(listener.stop)
+
+    for level, message in startup_messages:
+        log_instance.log(level, message)
 
     return log_instance
 
 # Create the logger instance that the rest of the application will import
-logger = _configure_logger()
\ No newline at end of file
+logger = _configure_logger()
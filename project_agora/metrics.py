@@ -0,0 +1,335 @@
+# FILE: project_agora/metrics.py
+
+"""
+Lightweight in-process metrics for Project Agora.
+
+Counters, gauges and histograms live in a single process-wide registry so that
+tools and callbacks can record measurements without pulling in an external
+metrics library. Every metric supports optional labels passed as keyword
+arguments (e.g. `histogram.observe(0.4, tool="create_ticket")`).
+
+The registry can be exported in the Prometheus text format, either from a
+local `/metrics` HTTP endpoint or to a file (see `start_exporters_from_env`).
+"""
+
+import atexit
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Bucket upper bounds (in seconds) used for latency histograms by default.
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+# Bucket upper bounds (in bytes) used for response-size histograms.
+DEFAULT_SIZE_BUCKETS = (
+    64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: dict) -> LabelKey:
+    """Builds a hashable, order-independent key from a label dictionary."""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class _Metric:
+    """Base class holding the shared name, description and lock."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+
+
+class Counter(_Metric):
+    """A monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def items(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+class Gauge(_Metric):
+    """A value that can go up and down, such as a queue depth."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def items(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+class _HistogramSeries:
+    """Bucket counts, sum and count for one label combination."""
+
+    __slots__ = ("bucket_counts", "sum", "count")
+
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed, cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    series.bucket_counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return series.count if series else 0
+
+    def total(self, **labels) -> float:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return series.sum if series else 0.0
+
+    def items(self) -> List[Tuple[LabelKey, Tuple[List[int], float, int]]]:
+        """Returns `(labels, (cumulative_bucket_counts, sum, count))` per series."""
+        with self._lock:
+            return [
+                (key, (list(series.bucket_counts), series.sum, series.count))
+                for key, series in self._series.items()
+            ]
+
+
+class MetricsRegistry:
+    """Holds every metric created in this process, keyed by name."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric_class, name: str, description: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, description, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}.")
+            return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(
+        self, name: str, description: str, buckets: Optional[Tuple[float, ...]] = None
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, description, buckets=buckets or DEFAULT_LATENCY_BUCKETS)
+
+    def metrics(self) -> List[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+
+# The process-wide registry that the rest of the application records into
+registry = MetricsRegistry()
+
+
+# --- Prometheus text exposition ---
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def render_prometheus(metrics_registry: Optional[MetricsRegistry] = None) -> str:
+    """Renders every metric in the registry in the Prometheus text format (version 0.0.4)."""
+    metrics_registry = metrics_registry or registry
+    lines: List[str] = []
+    for metric in sorted(metrics_registry.metrics(), key=lambda m: m.name):
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Histogram):
+            for labels, (bucket_counts, total, count) in sorted(metric.items()):
+                for bound, bucket_count in zip(metric.buckets, bucket_counts):
+                    lines.append(f"{metric.name}_bucket{_format_labels(labels, (('le', _format_bound(bound)),))} {bucket_count}")
+                lines.append(f"{metric.name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {count}")
+                lines.append(f"{metric.name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{metric.name}_count{_format_labels(labels)} {count}")
+        else:
+            for labels, value in sorted(metric.items()):
+                lines.append(f"{metric.name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path: str) -> None:
+    """Atomically writes the current metrics to `path` in Prometheus text format."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(target.name + ".tmp")
+    tmp_path.write_text(render_prometheus(), encoding="utf-8")
+    os.replace(tmp_path, target)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the application log
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves `/metrics` on a local port from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def _write_metrics_periodically(path: str, interval: float, stop: threading.Event):
+    while not stop.wait(interval):
+        try:
+            write_metrics_file(path)
+        except OSError:
+            pass
+
+
+def worker_metrics_path(path: str, pid: Optional[int] = None) -> str:
+    """The metrics file of one of several worker processes: `logs/metrics.prom` becomes `logs/metrics.<pid>.prom`."""
+    target = Path(path)
+    return str(target.with_name(f"{target.stem}.{pid or os.getpid()}{target.suffix}"))
+
+
+_exporters_started = False
+_metrics_server: Optional[ThreadingHTTPServer] = None
+_metrics_file: Optional[str] = None
+_stop_file_writer = threading.Event()
+
+
+def start_exporters_from_env() -> None:
+    """
+    Starts the metrics exporters requested by the environment (idempotent).
+
+    - AGORA_METRICS_PORT: serve `/metrics` on this local port.
+    - AGORA_METRICS_FILE: write the metrics to this file every
+      AGORA_METRICS_FILE_INTERVAL_SECONDS (default 15) and at exit.
+
+    Metrics are per process. With AGORA_WORKERS > 1, each worker serves its
+    own on the first free port of AGORA_METRICS_PORT .. AGORA_METRICS_PORT +
+    AGORA_WORKERS - 1, and writes its own file (see `worker_metrics_path`).
+    """
+    global _exporters_started, _metrics_server, _metrics_file
+    if _exporters_started:
+        return
+    _exporters_started = True
+    workers = max(1, int(os.getenv("AGORA_WORKERS") or 1))
+
+    port = os.getenv("AGORA_METRICS_PORT")
+    if port:
+        host = os.getenv("AGORA_METRICS_HOST", "127.0.0.1")
+        for worker_port in range(int(port), int(port) + workers):
+            try:
+                _metrics_server = start_metrics_server(worker_port, host=host)
+                break
+            except OSError as e:
+                error = e
+        else:
+            from .logging_config import logger
+
+            logger.warning(f"Metrics server not started on ports {port}-{int(port) + workers - 1}: {error}")
+
+    file_path = os.getenv("AGORA_METRICS_FILE")
+    if file_path:
+        _metrics_file = worker_metrics_path(file_path) if workers > 1 else file_path
+        interval = float(os.getenv("AGORA_METRICS_FILE_INTERVAL_SECONDS", "15"))
+        threading.Thread(
+            target=_write_metrics_periodically,
+            args=(_metrics_file, interval, _stop_file_writer),
+            name="metrics-file-writer",
+            daemon=True,
+        ).start()
+        atexit.register(write_metrics_file, _metrics_file)
+
+
+def stop_exporters() -> None:
+    """Stops the exporters of this process, e.g. in the supervisor of several serving workers, which serves nothing."""
+    global _metrics_server
+    if _metrics_server is not None:
+        _metrics_server.shutdown()
+        _metrics_server.server_close()
+        _metrics_server = None
+    if _metrics_file is not None:
+        _stop_file_writer.set()
+        atexit.unregister(write_metrics_file)
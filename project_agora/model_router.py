@@ -0,0 +1,136 @@
+# FILE: project_agora/model_router.py
+
+"""
+Central routing table that picks the model tier for each agent and ticket.
+
+A routing profile maps tiers (e.g. "flash", "pro") to model names and lists
+rules that are evaluated in order; the first rule whose conditions all match
+the calling agent and the current ticket decides the tier. Conditions are
+optional lists: `agents`, `statuses` and `urgencies`.
+
+Example profile (the built-in "balanced" profile):
+
+    {
+      "tiers": {"flash": "gemini-2.5-flash", "pro": "gemini-2.5-pro"},
+      "default_tier": "pro",
+      "rules": [
+        {"urgencies": ["High", "Critical"], "tier": "pro"},
+        {"agents": ["code_generator_agent", "code_reviewer_agent"], "tier": "pro"},
+        {"agents": ["knowledge_retrieval_agent", "db_retrieval_agent"], "tier": "flash"}
+      ]
+    }
+
+Configuration:
+
+- AGORA_MODEL_PROFILE: name of the profile to use (default "default", which
+  reproduces the original per-agent model assignments).
+- AGORA_MODEL_ROUTING_FILE: optional JSON file of additional profiles,
+  `{"profiles": {"<name>": {...}}}`, merged over the built-in ones.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .logging_config import logger
+
+FLASH_MODEL = "gemini-2.5-flash"
+PRO_MODEL = "gemini-2.5-pro"
+
+
+class RoutingRule(BaseModel):
+    """Selects `tier` when every condition that is set matches."""
+
+    tier: str
+    agents: Optional[List[str]] = None
+    statuses: Optional[List[str]] = None
+    urgencies: Optional[List[str]] = None
+
+    def matches(self, agent_name: str, status: Optional[str], urgency: Optional[str]) -> bool:
+        if self.agents is not None and agent_name not in self.agents:
+            return False
+        if self.statuses is not None and status not in self.statuses:
+            return False
+        if self.urgencies is not None and urgency not in self.urgencies:
+            return False
+        return True
+
+
+class RoutingProfile(BaseModel):
+    """A named set of tiers and ordered routing rules."""
+
+    tiers: Dict[str, str] = Field(default_factory=lambda: {"flash": FLASH_MODEL, "pro": PRO_MODEL})
+    default_tier: str = "pro"
+    rules: List[RoutingRule] = Field(default_factory=list)
+
+
+_RETRIEVAL_AGENTS = ["knowledge_retrieval_agent", "db_retrieval_agent"]
+_CODE_AGENTS = ["code_generator_agent", "file_generator_agent", "code_reviewer_agent"]
+
+BUILTIN_PROFILES: Dict[str, RoutingProfile] = {
+    # The original hard-coded assignment: pro everywhere except ticket analysis
+    "default": RoutingProfile(
+        rules=[RoutingRule(agents=["ticket_analysis_agent"], tier="flash")],
+    ),
+    # Flash for analysis, retrieval and orchestration; pro for code and urgent tickets
+    "balanced": RoutingProfile(
+        default_tier="pro",
+        rules=[
+            RoutingRule(urgencies=["High", "Critical"], tier="pro"),
+            RoutingRule(agents=_CODE_AGENTS, tier="pro"),
+            RoutingRule(agents=_RETRIEVAL_AGENTS + ["ticket_analysis_agent", "orchestrator_agent"], tier="flash"),
+        ],
+    ),
+    # Flash everywhere except code generation
+    "cost-saver": RoutingProfile(
+        default_tier="flash",
+        rules=[RoutingRule(agents=["code_generator_agent", "file_generator_agent"], tier="pro")],
+    ),
+    "all-pro": RoutingProfile(default_tier="pro"),
+    "all-flash": RoutingProfile(default_tier="flash"),
+}
+
+
+class ModelRouter:
+    """Resolves the tier and model for an agent's call under the active profile."""
+
+    def __init__(self, profile: RoutingProfile, profile_name: str = "custom"):
+        self.profile = profile
+        self.profile_name = profile_name
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        profiles = dict(BUILTIN_PROFILES)
+        routing_file = os.getenv("AGORA_MODEL_ROUTING_FILE")
+        if routing_file:
+            with open(routing_file, "r", encoding="utf-8") as f:
+                for name, profile in json.load(f).get("profiles", {}).items():
+                    profiles[name] = RoutingProfile.model_validate(profile)
+
+        profile_name = os.getenv("AGORA_MODEL_PROFILE", "default")
+        if profile_name not in profiles:
+            logger.error("Unknown model routing profile '%s'; using 'default'. Available: %s", profile_name, sorted(profiles))
+            profile_name = "default"
+        return cls(profiles[profile_name], profile_name)
+
+    def route(self, agent_name: str, ticket: Optional[dict] = None) -> Tuple[str, str]:
+        """Returns `(tier, model)` for a call by `agent_name` while working on `ticket`."""
+        ticket = ticket or {}
+        status = ticket.get("status")
+        urgency = (ticket.get("analysis") or {}).get("urgency")
+        tier = self.profile.default_tier
+        for rule in self.profile.rules:
+            if rule.matches(agent_name, status, urgency):
+                tier = rule.tier
+                break
+        return tier, self.profile.tiers.get(tier, tier)
+
+    def model_for(self, agent_name: str) -> str:
+        """The model an agent uses before any ticket exists; used as its static `model=`."""
+        return self.route(agent_name)[1]
+
+
+# The process-wide router used by the agent definitions and the model callbacks
+router = ModelRouter.from_env()
@@ -0,0 +1,61 @@
+# FILE: project_agora/model_wrapper.py
+
+"""
+Base class for models that wrap the model of an agent.
+
+The response cache, the rate limiter and the scheduler each wrap every
+agent's model in a `BaseLlm` of their own that does its work around the inner
+model's `generate_content_async`. `DelegatingLlm` holds what they share: the
+inner model, resolved from the request's model name when it was given by name
+so per-call model routing keeps working, and the walk that wraps a whole
+agent tree.
+"""
+
+from typing import Dict, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.registry import LLMRegistry
+from pydantic import Field
+
+from .agent_tree import walk_agents
+
+
+class DelegatingLlm(BaseLlm):
+    """
+    A model that hands its calls to another model.
+
+    If `inner` is not given, the real model is resolved from the request's
+    model name on each call. Live (bidirectional) sessions go straight to the
+    inner model.
+    """
+
+    inner: Optional[BaseLlm] = None
+    resolved: Dict[str, BaseLlm] = Field(default_factory=dict, exclude=True)
+
+    def _inner_for(self, model_name: str) -> BaseLlm:
+        if self.inner is not None:
+            return self.inner
+        if model_name not in self.resolved:
+            self.resolved[model_name] = LLMRegistry.new_llm(model_name)
+        return self.resolved[model_name]
+
+    @property
+    def capabilities(self):
+        return self._inner_for(self.model).capabilities
+
+    def connect(self, llm_request: LlmRequest):
+        return self._inner_for(llm_request.model or self.model).connect(llm_request)
+
+    @classmethod
+    def wrap_agent_tree(cls, root: BaseAgent, **fields) -> None:
+        """Wraps the model of `root` and of every agent below it, unless it is already wrapped by `cls`."""
+        for agent in walk_agents(root):
+            model = getattr(agent, "model", None)
+            if not model or isinstance(model, cls):
+                continue
+            if isinstance(model, BaseLlm):
+                agent.model = cls(model=model.model, inner=model, **fields)
+            else:
+                agent.model = cls(model=model, **fields)
@@ -0,0 +1,248 @@
+# FILE: project_agora/parallel_codegen.py
+
+"""
+Per-file parallel code generation from an approved plan.
+
+MODE 2 of `CODE_GENERATOR_PROMPT` writes every file of the project in one
+long, serial completion. With AGORA_CODEGEN_MODE=parallel, the approved plan
+(kept in session state as `code_plan`) is turned into a `Manifest` instead:
+
+- the files of the style guide's project layout, each with its purpose and
+  the plan components it implements (`tools.py` only if the plan has tools);
+- shared interfaces: the names each file provides to the others (`root_agent`,
+  the tool functions, the prompt constants, `MODEL_NAME`), so files written
+  independently still fit together.
+
+`file_generator_agent` then writes every file at once, at most
+AGORA_CODEGEN_MAX_PARALLEL_FILES at a time (default 8), each seeing the plan,
+the manifest and the interfaces. Files whose content is fixed by the style
+guide (`__init__.py`) are not generated. The results are assembled into the
+usual `==== FILE:` bundle followed by the "Next Steps" section, so the
+reviewer and `format_code_reviewer_output` see the same format as before.
+Generation takes as long as the slowest file instead of the sum of all files.
+
+If the plan cannot be parsed or a file fails, the whole project is generated
+by `code_generator_agent` as before.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, List, Optional
+
+from google.adk.tools.tool_context import ToolContext
+from pydantic import BaseModel, Field
+
+from .agent_runner import copy_state, run_agent
+from .code_speculation import CONFIRMATION_MARKER, generation_request
+from .logging_config import logger
+from .metrics import registry
+from .streaming import StreamingAgentTool
+from .sub_agents.code_generator.agent import file_generator_agent
+
+DEFAULT_MAX_PARALLEL_FILES = 8
+DEFAULT_PROJECT_NAME = "adk_agent"
+
+NEXT_STEPS = """## Next Steps
+
+1. Save the generated files to your local machine, maintaining the directory structure.
+2. In your terminal, navigate to the project root (where pyproject.toml is) and run `poetry install` to set up the dependencies.
+3. Run the agent from your terminal using the ADK CLI:
+   - For a command-line interface: `adk run {project}`
+   - For the web interface: `adk web` (and select `{project}` from the dropdown)
+"""
+
+_FENCE_RE = re.compile(r"^```[\w.+-]*\n(.*?)\n?```$", re.DOTALL)
+_HEADER_RE = re.compile(r"^==== FILE: .+ ====\n")
+
+codegen_runs_total = registry.counter(
+    "agora_codegen_runs_total", "Code generation runs by mode (parallel, single) and outcome (ok, fallback)."
+)
+codegen_seconds = registry.histogram(
+    "agora_codegen_seconds", "Wall-clock time to generate a project's code, by mode."
+)
+codegen_file_seconds = registry.histogram(
+    "agora_codegen_file_seconds", "Time to generate one file in parallel mode, by file name."
+)
+
+
+class FileSpec(BaseModel):
+    """One file of the project to generate."""
+
+    path: str
+    purpose: str
+    components: List[str] = Field(default_factory=list)
+    # Set for files whose content is fixed and need no model call
+    content: Optional[str] = None
+
+
+class Manifest(BaseModel):
+    """The files of a project and the names they share."""
+
+    project: str
+    files: List[FileSpec]
+    interfaces: str
+
+
+def parallel_enabled() -> bool:
+    return os.getenv("AGORA_CODEGEN_MODE", "single").lower() == "parallel"
+
+
+def _snake(name: str) -> str:
+    name = re.sub(r"[^0-9A-Za-z]+", "_", name)
+    name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name)
+    return name.strip("_").lower() or "component"
+
+
+def parse_plan(plan_text: str) -> Optional[dict]:
+    """The plan JSON from the code generator's MODE 1 output (Markdown fences allowed), or None."""
+    cleaned = (plan_text or "").strip()
+    match = _FENCE_RE.match(cleaned)
+    if match:
+        cleaned = match.group(1).strip()
+    try:
+        plan = json.loads(cleaned)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return plan if isinstance(plan, dict) else None
+
+
+def build_manifest(plan: dict) -> Manifest:
+    """Derives the files to generate, and the interfaces between them, from an approved plan."""
+    project = _snake(plan["project_name"]) if plan.get("project_name") else DEFAULT_PROJECT_NAME
+    components = [c for c in plan.get("components") or [] if isinstance(c, dict) and c.get("name")]
+    agents = [c for c in components if "agent" in str(c.get("type", "")).lower()]
+    tools = [c for c in components if "tool" in str(c.get("type", "")).lower() and c not in agents]
+    dependencies = ["google-adk"] + [
+        str(d.get("name")) for d in plan.get("dependencies") or [] if isinstance(d, dict) and d.get("name")
+    ]
+
+    interfaces = [f"{project}/config.py", '    MODEL_NAME: str  # model for every agent, from os.getenv("MODEL_NAME")']
+    interfaces.append(f"{project}/prompts.py")
+    for agent in agents:
+        interfaces.append(f"    {_snake(agent['name']).upper()}_PROMPT: str  # instruction of {agent['name']}")
+    if tools:
+        interfaces.append(f"{project}/tools.py")
+        for tool in tools:
+            interfaces.append(f"    def {_snake(tool['name'])}(...) -> dict  # {tool['name']}: {tool.get('justification', '')}")
+    interfaces.append(f"{project}/agent.py")
+    for index, agent in enumerate(agents):
+        variable = "root_agent" if index == 0 else _snake(agent["name"])
+        interfaces.append(f"    {variable}: Agent  # {agent['name']} ({agent.get('type', 'Agent')}): {agent.get('justification', '')}")
+    if not agents:
+        interfaces.append("    root_agent: Agent")
+    interfaces.append(f"pyproject.toml\n    project name \"{project}\"; dependencies: {', '.join(dependencies)}")
+
+    agent_names = [agent["name"] for agent in agents]
+    files = [
+        FileSpec(path="pyproject.toml", purpose=f"Project metadata and the dependencies {', '.join(dependencies)}."),
+        FileSpec(path="README.md", purpose="What the agent does, how it is structured, its configuration and how to run it."),
+        FileSpec(path=f"{project}/__init__.py", purpose="Package entry point.", content="from .agent import root_agent\n"),
+        FileSpec(path=f"{project}/agent.py", purpose="Defines every agent and `root_agent`.", components=agent_names),
+        FileSpec(path=f"{project}/config.py", purpose="Configuration loaded from environment variables."),
+        FileSpec(path=f"{project}/prompts.py", purpose="The instruction of every agent.", components=agent_names),
+    ]
+    if tools:
+        files.append(FileSpec(path=f"{project}/tools.py", purpose="The custom tool functions.", components=[tool["name"] for tool in tools]))
+    return Manifest(project=project, files=files, interfaces="\n".join(interfaces))
+
+
+def file_request(plan: dict, manifest: Manifest, spec: FileSpec) -> str:
+    """The request that asks `file_generator_agent` for one file."""
+    file_list = "\n".join(f"- {f.path}: {f.purpose}" for f in manifest.files)
+    components = f"\nIt implements: {', '.join(spec.components)}." if spec.components else ""
+    return (
+        f"Approved plan:\n{json.dumps(plan, indent=2)}\n\n"
+        f"Project files:\n{file_list}\n\n"
+        f"Shared interfaces (use exactly these names):\n{manifest.interfaces}\n\n"
+        f"Write the file `{spec.path}`: {spec.purpose}{components}"
+    )
+
+
+def _clean_file(text: str) -> str:
+    """Removes a code fence or a file header the model added despite being told not to."""
+    text = _HEADER_RE.sub("", text.strip())
+    match = _FENCE_RE.match(text)
+    return (match.group(1) if match else text).rstrip() + "\n"
+
+
+def assemble(manifest: Manifest, contents: List[str]) -> str:
+    """The standard `==== FILE:` bundle for the generated files, followed by the Next Steps."""
+    blocks = [f"==== FILE: {spec.path} ====\n{content}" for spec, content in zip(manifest.files, contents)]
+    return "\n".join(blocks) + "\n" + NEXT_STEPS.format(project=manifest.project)
+
+
+async def generate_in_parallel(plan_text: str, state: dict) -> Optional[str]:
+    """Generates the project for `plan_text` one file per call, all at once. None if that is not possible."""
+    plan = parse_plan(plan_text)
+    if plan is None:
+        logger.warning("The approved plan is not valid JSON; generating the code in a single call.")
+        return None
+    manifest = build_manifest(plan)
+    semaphore = asyncio.Semaphore(int(os.getenv("AGORA_CODEGEN_MAX_PARALLEL_FILES", DEFAULT_MAX_PARALLEL_FILES)))
+
+    async def generate(spec: FileSpec) -> str:
+        if spec.content is not None:
+            return spec.content
+        async with semaphore:
+            started_at = time.perf_counter()
+            content = await run_agent(file_generator_agent, file_request(plan, manifest, spec), state)
+            codegen_file_seconds.observe(time.perf_counter() - started_at, file=os.path.basename(spec.path))
+        if not content.strip():
+            raise ValueError(f"No content was generated for {spec.path}.")
+        return _clean_file(content)
+
+    tasks = [asyncio.create_task(generate(spec), name=f"codegen-{spec.path}") for spec in manifest.files]
+    try:
+        contents = await asyncio.gather(*tasks)
+    except Exception as e:
+        for task in tasks:
+            task.cancel()
+        logger.warning(f"Parallel code generation failed ({e}); generating the code in a single call.")
+        return None
+    logger.info(f"Generated {len(manifest.files)} files of '{manifest.project}' in parallel.")
+    return assemble(manifest, contents)
+
+
+async def _try_parallel(plan_text: str, state: dict) -> Optional[str]:
+    started_at = time.perf_counter()
+    code = await generate_in_parallel(plan_text, state)
+    if code is None:
+        codegen_runs_total.inc(mode="parallel", outcome="fallback")
+        return None
+    codegen_runs_total.inc(mode="parallel", outcome="ok")
+    codegen_seconds.observe(time.perf_counter() - started_at, mode="parallel")
+    return code
+
+
+async def generate_code(plan_text: str, state: dict, generator) -> str:
+    """
+    The full code for an approved plan: per file in parallel when
+    AGORA_CODEGEN_MODE=parallel, otherwise (or on failure) by `generator` in one call.
+    """
+    if parallel_enabled():
+        code = await _try_parallel(plan_text, state)
+        if code is not None:
+            return code
+    started_at = time.perf_counter()
+    code = await run_agent(generator, generation_request(plan_text), state)
+    codegen_runs_total.inc(mode="single", outcome="ok")
+    codegen_seconds.observe(time.perf_counter() - started_at, mode="single")
+    return code
+
+
+class CodeGeneratorTool(StreamingAgentTool):
+    """
+    The code generator's tool. MODE 2 calls are generated per file in
+    parallel when AGORA_CODEGEN_MODE=parallel; everything else is unchanged.
+    """
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        plan_text = tool_context.state.get("code_plan")
+        if parallel_enabled() and plan_text and CONFIRMATION_MARKER in str(args.get("request", "")):
+            code = await _try_parallel(plan_text, copy_state(tool_context.state))
+            if code is not None:
+                return code
+        return await super().run_async(args=args, tool_context=tool_context)
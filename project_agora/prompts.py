@@ -45,7 +45,7 @@ Look in session state for "ticket". If no ticket exists:
 **State: Pending Solution**
 - **Trigger:** This state is active after `code_generator_agent` or `problem_solver_agent` has been called.
 - For NON-Code Generation tickets (where `problem_solver_agent` was called):
-  1. Present the complete output from the `problem_solver_agent` to the user.
+  1. Present the complete output from the `problem_solver_agent` to the user. (When it is streamed to the user as it is generated, your turn ends with it and there is nothing to add.)
   2. This is the end of the workflow for this path.
 - For Code Generation tickets (where `code_generator_agent` was called for the first time):
   1. Parse the JSON plan from the `code_generator_agent` output.
@@ -67,6 +67,10 @@ Look in session state for "ticket". If no ticket exists:
   5. Call `format_code_reviewer_output` with reviewer response
   6. Present final formatted code to user
   7. END WORKFLOW
+- If the user asks for changes to the plan (even while approving it, e.g. "yes, but use Postgres"):
+  1. Tell user: "Updating the plan with your changes..."
+  2. Call `code_generator_agent` with the current plan and the requested changes, WITHOUT the confirmation message, to get a revised plan
+  3. Continue as in "Pending Solution" for Code Generation tickets: diagram, present the revised plan and ask for approval again
 
 **PROGRESS INDICATOR RULES:**
 - Before ANY agent call that takes >5 seconds: Show progress message
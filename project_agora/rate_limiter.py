@@ -0,0 +1,315 @@
+# FILE: project_agora/rate_limiter.py
+
+"""
+Process-wide, per-model rate limiting of LLM calls with 429-aware backoff.
+
+`RateLimitedLlm` wraps the model of every agent (like `CachingLlm`) so that
+each model call first takes a slot from its model's `ModelRateLimiter`:
+
+- two token buckets, one for requests per minute and one for (estimated)
+  prompt tokens per minute. A call that would exceed either waits its turn
+  instead of being sent and rejected. Reservations are first come, first
+  served, and the token estimate is corrected with the real usage once the
+  response arrives;
+- on a 429 / RESOURCE_EXHAUSTED the model enters a cooldown that every
+  caller waits out, so one rejection does not turn into a storm of retries.
+  The cooldown grows exponentially with consecutive rejections, with jitter,
+  and honours the server's `retryDelay` when it sends one. The request rate
+  is also cut by a quarter, then recovers step by step with each successful
+  call, so throughput settles just under the real quota.
+
+Calls are retried after a 429 up to AGORA_LLM_MAX_RETRIES times, as long as
+no part of the response has been streamed yet.
+
+Configuration (limits are per process; 0 means unlimited):
+
+- AGORA_LLM_RATE_LIMIT: set to 0 to leave the models unwrapped (default 1).
+- AGORA_LLM_RPM / AGORA_LLM_TPM: default limits for every model.
+- AGORA_LLM_RATE_LIMITS: per-model overrides as JSON, e.g.
+  `{"gemini-2.5-pro": {"rpm": 60, "tpm": 1000000}}`.
+- AGORA_WORKERS: when serving with several workers, the limits above are the
+  project-wide quota and each worker gets an equal share.
+- AGORA_LLM_BACKOFF_BASE_SECONDS (default 2) and
+  AGORA_LLM_BACKOFF_MAX_SECONDS (default 60): the 429 cooldown range.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import AsyncGenerator, Dict, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import Field
+
+from .logging_config import logger
+from .metrics import registry
+from .model_wrapper import DelegatingLlm
+
+# A 429 multiplies the request rate by this factor; it never drops below MIN_RATE_FRACTION of the limit
+RATE_DECREASE_FACTOR = 0.75
+MIN_RATE_FRACTION = 0.1
+# Each successful call gives back this fraction of the configured rate
+RATE_RECOVERY_FRACTION = 0.05
+CHARS_PER_TOKEN = 4
+# Seconds of quota a bucket may spend at once. Quotas are enforced over a sliding
+# minute, so every token of burst can push a minute over the quota.
+BURST_SECONDS = 1.0
+
+_RETRY_DELAY_RE = re.compile(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s")
+
+llm_rate_limit_wait_seconds = registry.histogram(
+    "agora_llm_rate_limit_wait_seconds", "Time model calls spent queued by the rate limiter before being sent."
+)
+llm_rate_limit_waiting = registry.gauge("agora_llm_rate_limit_waiting", "Model calls currently queued by the rate limiter.")
+llm_rate_limited_total = registry.counter(
+    "agora_llm_rate_limited_total", "Model calls rejected with 429 / RESOURCE_EXHAUSTED, by whether they were retried."
+)
+llm_rate_limit_rpm = registry.gauge("agora_llm_rate_limit_rpm", "Current adaptive requests-per-minute limit of each model.")
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that hands out reservations.
+
+    `reserve()` always succeeds and returns how long the caller must wait
+    before its reservation is covered, so callers are served in order and
+    never spin. The balance may go negative; later callers then wait longer.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.limit = per_minute / 60.0
+        self.rate = self.limit
+        self.capacity = max(1.0, self.limit * burst_seconds) if per_minute else 0.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.limit <= 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        if self.unlimited:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """Returns (negative) or charges (positive) tokens after the fact."""
+        if self.unlimited:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+    def scale_rate(self, factor: float) -> None:
+        """Multiplies the current rate, keeping it between the floor and the configured limit."""
+        if self.unlimited:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.limit * MIN_RATE_FRACTION, min(self.limit, self.rate * factor))
+
+    def recover(self) -> None:
+        if self.unlimited or self.rate >= self.limit:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.limit, self.rate + self.limit * RATE_RECOVERY_FRACTION)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    return getattr(error, "code", None) == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def _server_retry_delay(error: BaseException) -> Optional[float]:
+    match = _RETRY_DELAY_RE.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+class ModelRateLimiter:
+    """Request and token buckets plus the shared 429 cooldown of one model."""
+
+    def __init__(self, model: str, rpm: float, tpm: float, burst_seconds: float = BURST_SECONDS):
+        self.model = model
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.tokens = TokenBucket(tpm, burst_seconds)
+        self.blocked_until = 0.0
+        self.consecutive_rejections = 0
+        self.last_rejection_at = float("-inf")
+        self.backoff_base = float(os.getenv("AGORA_LLM_BACKOFF_BASE_SECONDS", "2"))
+        self.backoff_max = float(os.getenv("AGORA_LLM_BACKOFF_MAX_SECONDS", "60"))
+        self._lock = threading.Lock()
+        llm_rate_limit_rpm.set(rpm, model=model)
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """Waits until the call may be sent and returns the time waited."""
+        started_at = time.monotonic()
+        llm_rate_limit_waiting.inc(model=self.model)
+        try:
+            # Reserve in both buckets at once so the waits overlap instead of adding up
+            delay = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+            while True:
+                delay = max(delay, self.blocked_until - time.monotonic())
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+                delay = 0.0
+        finally:
+            llm_rate_limit_waiting.dec(model=self.model)
+        waited = time.monotonic() - started_at
+        llm_rate_limit_wait_seconds.observe(waited, model=self.model)
+        return waited
+
+    def record_success(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        if actual_tokens:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+        with self._lock:
+            self.consecutive_rejections = 0
+        self.requests.recover()
+        if not self.requests.unlimited:
+            llm_rate_limit_rpm.set(self.requests.rate * 60, model=self.model)
+
+    def record_rejection(self, error: BaseException, sent_at: float) -> float:
+        """
+        Starts (or extends) the model's cooldown after a 429 and returns the
+        time left in it. Calls that were already in flight when an earlier
+        rejection arrived are part of the same burst and do not escalate it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            escalate = sent_at >= self.last_rejection_at
+            self.last_rejection_at = now
+            if escalate:
+                self.consecutive_rejections += 1
+                ceiling = min(self.backoff_max, self.backoff_base * 2 ** (self.consecutive_rejections - 1))
+                # Half fixed, half jitter: callers that were rejected together do not retry together
+                delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+                delay = max(delay, _server_retry_delay(error) or 0.0)
+                self.blocked_until = max(self.blocked_until, now + delay)
+            remaining = max(0.0, self.blocked_until - now)
+        if escalate:
+            self.requests.scale_rate(RATE_DECREASE_FACTOR)
+            if not self.requests.unlimited:
+                llm_rate_limit_rpm.set(self.requests.rate * 60, model=self.model)
+        return remaining
+
+
+def _configured_limits() -> Dict[str, Dict[str, float]]:
+    configured = os.getenv("AGORA_LLM_RATE_LIMITS")
+    if not configured:
+        return {}
+    try:
+        return json.loads(configured)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"AGORA_LLM_RATE_LIMITS is not valid JSON: {e}") from e
+
+
+def limits_for(model: str) -> Tuple[float, float]:
+    """The (rpm, tpm) share of this process for `model`."""
+    override = _configured_limits().get(model, {})
+    rpm = float(override.get("rpm", os.getenv("AGORA_LLM_RPM", "0")) or 0)
+    tpm = float(override.get("tpm", os.getenv("AGORA_LLM_TPM", "0")) or 0)
+    workers = max(1, int(os.getenv("AGORA_WORKERS") or 1))
+    return rpm / workers, tpm / workers
+
+
+_limiters: Dict[str, ModelRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(model: str) -> ModelRateLimiter:
+    """Returns the process-wide limiter for `model`."""
+    with _limiters_lock:
+        if model not in _limiters:
+            _limiters[model] = ModelRateLimiter(model, *limits_for(model))
+        return _limiters[model]
+
+
+def reset_limiters() -> None:
+    """Drops the limiters, e.g. after the limits in the environment changed."""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def estimate_prompt_tokens(llm_request: LlmRequest) -> int:
+    """A rough prompt size (about four characters per token) used until the real count is known."""
+    chars = 0
+    config = llm_request.config
+    if config and config.system_instruction:
+        chars += len(str(config.system_instruction))
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call or part.function_response:
+                chars += len(str(part.function_call or part.function_response))
+    return max(1, chars // CHARS_PER_TOKEN)
+
+
+class RateLimitedLlm(DelegatingLlm):
+    """A model whose calls are paced by the limiter of the requested model. Live sessions are not paced."""
+
+    max_retries: int = Field(default_factory=lambda: int(os.getenv("AGORA_LLM_MAX_RETRIES", "5")))
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        llm_request.model = llm_request.model or self.model
+        inner = self._inner_for(llm_request.model)
+        limiter = get_limiter(llm_request.model)
+        estimated_tokens = estimate_prompt_tokens(llm_request)
+
+        attempt = 0
+        while True:
+            await limiter.acquire(estimated_tokens)
+            sent_at = time.monotonic()
+            yielded = False
+            actual_tokens = None
+            try:
+                async for response in inner.generate_content_async(llm_request, stream=stream):
+                    if response.usage_metadata and response.usage_metadata.prompt_token_count:
+                        actual_tokens = response.usage_metadata.prompt_token_count
+                    yielded = True
+                    yield response
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                delay = limiter.record_rejection(e, sent_at)
+                # A rejected call used none of the token quota
+                limiter.tokens.adjust(-estimated_tokens)
+                retry = not yielded and attempt < self.max_retries
+                llm_rate_limited_total.inc(model=llm_request.model, retried=str(retry).lower())
+                if not retry:
+                    raise
+                attempt += 1
+                logger.warning(
+                    f"{llm_request.model} is rate limited; retry {attempt}/{self.max_retries} after a {delay:.1f}s cooldown."
+                )
+                continue
+            limiter.record_success(estimated_tokens, actual_tokens)
+            return
+
+
+def wrap_agent_tree(agent: BaseAgent) -> None:
+    """Wraps the model of `agent` and of every sub-agent and AgentTool agent below it."""
+    RateLimitedLlm.wrap_agent_tree(agent)
+
+
+def enable_rate_limits_from_env(agent: BaseAgent) -> None:
+    """Wraps the agent tree unless AGORA_LLM_RATE_LIMIT=0."""
+    if os.getenv("AGORA_LLM_RATE_LIMIT", "1") == "0":
+        return
+    wrap_agent_tree(agent)
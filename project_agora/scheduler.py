@@ -0,0 +1,275 @@
+# FILE: project_agora/scheduler.py
+
+"""
+Urgency-aware priority scheduling of model and tool work.
+
+Every model call (through `ScheduledLlm`) and every function-tool call
+(through the tool callbacks) takes one of AGORA_SCHEDULER_SLOTS slots of a
+process-wide `PriorityScheduler` for its duration. The priority comes from the
+ticket being worked on, via `ticket_priority()`:
+
+- the urgency from the ticket analysis: High -> high, Medium -> medium,
+  Low -> low;
+- a ticket that has not been analysed yet is medium;
+- a Resolved ticket drops one level, since follow-ups after a resolution are
+  less pressing than open work.
+
+When a slot frees up it goes to the waiter with the best effective priority.
+Waiting raises a call's effective priority by one level every
+AGORA_SCHEDULER_AGING_SECONDS, so Low tickets still progress during a burst of
+High ones. Each priority may also use only its share of the slots
+(AGORA_SCHEDULER_SHARES, default high=1.0,medium=0.75,low=0.5). Lower
+priorities can therefore never fill every slot, and a High ticket that
+arrives finds free capacity without waiting for earlier work to drain.
+
+The priority of the current work is carried in a context variable that
+`before_model_call` and `before_tool_call` set from session state.
+AGORA_SCHEDULER_SLOTS=0 disables scheduling.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .metrics import registry
+from .model_wrapper import DelegatingLlm
+
+PRIORITIES = ("high", "medium", "low")
+DEFAULT_PRIORITY = "medium"
+DEFAULT_SLOTS = 8
+DEFAULT_SHARES = {"high": 1.0, "medium": 0.75, "low": 0.5}
+DEFAULT_AGING_SECONDS = 30.0
+# A tool slot whose release was never seen (e.g. the call was cancelled) is reclaimed after this long
+DEFAULT_LEASE_SECONDS = 600.0
+
+_URGENCY_PRIORITIES = {"high": "high", "critical": "high", "medium": "medium", "low": "low"}
+
+current_priority: contextvars.ContextVar[str] = contextvars.ContextVar("agora_priority", default=DEFAULT_PRIORITY)
+
+scheduler_queue_seconds = registry.histogram(
+    "agora_scheduler_queue_seconds", "Time model and tool calls waited for a scheduler slot, by priority and kind."
+)
+scheduler_waiting = registry.gauge("agora_scheduler_waiting", "Calls waiting for a scheduler slot, by priority.")
+scheduler_running = registry.gauge("agora_scheduler_running", "Calls holding a scheduler slot, by priority.")
+scheduler_aged_total = registry.counter(
+    "agora_scheduler_aged_total", "Calls admitted ahead of their base priority because they had waited long enough."
+)
+
+
+def ticket_priority(ticket: Optional[dict]) -> str:
+    """The scheduling priority of work on `ticket` (a SupportTicket as a dict)."""
+    if not ticket:
+        return DEFAULT_PRIORITY
+    urgency = str((ticket.get("analysis") or {}).get("urgency") or "").lower()
+    priority = _URGENCY_PRIORITIES.get(urgency, DEFAULT_PRIORITY)
+    if ticket.get("status") == "Resolved":
+        priority = lower_priority(priority)
+    return priority
+
+
+def lower_priority(priority: str) -> str:
+    """The priority one level below `priority` (low stays low)."""
+    return PRIORITIES[min(PRIORITIES.index(priority) + 1, len(PRIORITIES) - 1)]
+
+
+def _parse_shares(configured: Optional[str]) -> Dict[str, float]:
+    shares = dict(DEFAULT_SHARES)
+    for item in (configured or "").split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        name = name.strip().lower()
+        if name not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{name}' in AGORA_SCHEDULER_SHARES; choose from {list(PRIORITIES)}.")
+        shares[name] = float(value)
+    return shares
+
+
+class _Waiter:
+    def __init__(self, priority: str, loop: asyncio.AbstractEventLoop):
+        self.priority = priority
+        self.level = PRIORITIES.index(priority)
+        self.enqueued_at = time.monotonic()
+        self.future = loop.create_future()
+        self.loop = loop
+
+
+class PriorityScheduler:
+    """
+    Hands out a fixed number of slots by priority, with aging and per-priority shares.
+
+    Thread-safe; waiters on different event loops are woken on their own loop.
+
+    Args:
+        slots: Calls that may run at once.
+        shares: Fraction of the slots each priority may hold at once.
+        aging_seconds: Waiting this long raises a call's effective priority by one level.
+    """
+
+    def __init__(
+        self,
+        slots: int = DEFAULT_SLOTS,
+        shares: Optional[Dict[str, float]] = None,
+        aging_seconds: float = DEFAULT_AGING_SECONDS,
+    ):
+        self.slots = slots
+        shares = shares or DEFAULT_SHARES
+        # Every priority keeps at least one slot, or it could starve
+        self.limits = {priority: max(1, int(slots * shares.get(priority, 1.0))) for priority in PRIORITIES}
+        self.aging_seconds = aging_seconds
+        self.running = {priority: 0 for priority in PRIORITIES}
+        self._waiters: List[_Waiter] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "PriorityScheduler":
+        return cls(
+            slots=int(os.getenv("AGORA_SCHEDULER_SLOTS", DEFAULT_SLOTS)),
+            shares=_parse_shares(os.getenv("AGORA_SCHEDULER_SHARES")),
+            aging_seconds=float(os.getenv("AGORA_SCHEDULER_AGING_SECONDS", DEFAULT_AGING_SECONDS)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.slots > 0
+
+    def _effective_level(self, waiter: _Waiter, now: float) -> float:
+        if self.aging_seconds <= 0:
+            return waiter.level
+        return waiter.level - (now - waiter.enqueued_at) / self.aging_seconds
+
+    def _can_run(self, priority: str) -> bool:
+        return sum(self.running.values()) < self.slots and self.running[priority] < self.limits[priority]
+
+    def _dispatch(self) -> None:
+        """Admits waiters while slots are free, best effective priority first, FIFO among equals."""
+        now = time.monotonic()
+        order = itertools.count()
+        candidates = [(self._effective_level(w, now), w.enqueued_at, next(order), w) for w in self._waiters]
+        heapq.heapify(candidates)
+        while candidates and sum(self.running.values()) < self.slots:
+            effective_level, _, _, waiter = heapq.heappop(candidates)
+            if waiter.future.done() or not self._can_run(waiter.priority):
+                continue
+            self._waiters.remove(waiter)
+            self.running[waiter.priority] += 1
+            if effective_level <= waiter.level - 1:
+                scheduler_aged_total.inc(priority=waiter.priority)
+            waiter.loop.call_soon_threadsafe(_admit, waiter.future)
+
+    async def wait_for_slot(self, priority: Optional[str] = None, kind: str = "model") -> str:
+        """Waits until a slot is free for `priority` (default: the current one) and takes it."""
+        priority = priority or current_priority.get()
+        waiter = _Waiter(priority, asyncio.get_running_loop())
+        with self._lock:
+            self._waiters.append(waiter)
+            self._dispatch()
+        scheduler_waiting.inc(priority=priority)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # Admitted just as the wait was cancelled: hand the slot back
+            self._hand_back(priority)
+            raise
+        finally:
+            scheduler_waiting.dec(priority=priority)
+        scheduler_queue_seconds.observe(time.monotonic() - waiter.enqueued_at, priority=priority, kind=kind)
+        scheduler_running.inc(priority=priority)
+        return priority
+
+    def _hand_back(self, priority: str) -> None:
+        with self._lock:
+            self.running[priority] -= 1
+            self._dispatch()
+
+    def release(self, priority: str) -> None:
+        """Returns a slot taken with `wait_for_slot()`."""
+        scheduler_running.dec(priority=priority)
+        self._hand_back(priority)
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None, kind: str = "model"):
+        """Holds a slot for the duration of the block."""
+        if not self.enabled:
+            yield
+            return
+        priority = await self.wait_for_slot(priority, kind)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+
+def _admit(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+# The process-wide scheduler shared by all agents
+scheduler = PriorityScheduler.from_env()
+
+# Tool slots held from before_tool_call until after_tool_call / on_tool_error_call: key -> (priority, expires_at)
+_tool_leases: Dict[tuple, Tuple[str, float]] = {}
+_tool_leases_lock = threading.Lock()
+
+
+async def acquire_tool_slot(key: tuple, priority: str) -> None:
+    """Takes a slot for a tool call; `release_tool_slot(key)` gives it back."""
+    if not scheduler.enabled:
+        return
+    now = time.monotonic()
+    with _tool_leases_lock:
+        stale = [(k, lease) for k, lease in _tool_leases.items() if lease[1] < now]
+        for stale_key, _ in stale:
+            del _tool_leases[stale_key]
+    for _, (stale_priority, _) in stale:
+        scheduler.release(stale_priority)
+    await scheduler.wait_for_slot(priority, kind="tool")
+    lease_seconds = float(os.getenv("AGORA_SCHEDULER_LEASE_SECONDS", DEFAULT_LEASE_SECONDS))
+    with _tool_leases_lock:
+        _tool_leases[key] = (priority, time.monotonic() + lease_seconds)
+
+
+def release_tool_slot(key: tuple) -> None:
+    with _tool_leases_lock:
+        lease = _tool_leases.pop(key, None)
+    if lease is not None:
+        scheduler.release(lease[0])
+
+
+class ScheduledLlm(DelegatingLlm):
+    """A model whose calls each hold a scheduler slot at the current priority. Live sessions are not scheduled."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        llm_request.model = llm_request.model or self.model
+        inner = self._inner_for(llm_request.model)
+        async with scheduler.slot(kind="model"):
+            async for response in inner.generate_content_async(llm_request, stream=stream):
+                yield response
+
+
+def wrap_agent_tree(agent: BaseAgent) -> None:
+    """Wraps the model of `agent` and of every sub-agent and AgentTool agent below it."""
+    ScheduledLlm.wrap_agent_tree(agent)
+
+
+def enable_scheduler_from_env(agent: BaseAgent) -> None:
+    """Wraps the agent tree unless AGORA_SCHEDULER_SLOTS=0."""
+    if scheduler.enabled:
+        wrap_agent_tree(agent)
@@ -0,0 +1,304 @@
+# FILE: project_agora/serving.py
+
+"""
+HTTP serving entry point with an explicit warm-up phase and a readiness probe.
+
+A fresh container otherwise makes its first users pay for creating the cloud
+clients, loading the embedding model, launching Chromium and the first TLS
+handshakes. `warm_up()` does all of that up front, concurrently:
+
+- clients: creates the shared BigQuery and Cloud Storage clients and builds
+  the lazily constructed tools (e.g. the RAG retrieval tool);
+- embeddings: loads the embedding model and embeds a short text;
+- local_indexes: builds the local ticket and knowledge-base indexes when the
+  local backends are in use;
+- render_pool: starts the diagram render workers and launches Chromium;
+- model_ping: sends a tiny request to every distinct model the agents use.
+
+`create_app()` wraps ADK's FastAPI app. Warm-up starts with the server
+(unless AGORA_WARMUP_ON_START=0) and can be re-run with `POST /warmup`.
+`GET /readyz` returns 503 until warm-up has finished, so a startup or
+readiness probe keeps traffic away from a cold instance. A failed step is
+logged but does not block readiness unless AGORA_WARMUP_STRICT=1.
+AGORA_WARMUP_STEPS limits warm-up to a comma-separated subset of the steps.
+
+`main()` runs AGORA_WORKERS worker processes (default: one per CPU) behind
+one port. Sessions live in the shared store from `session_store` (SQLite in
+WAL mode by default), so requests need no sticky routing: any worker can run
+the next turn of any session, and a restarted worker loses nothing. Each
+worker runs its own warm-up.
+
+Usage:
+    python -m project_agora.serving  # serves on $PORT (default 8080)
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.tools.agent_tool import AgentTool
+from pydantic import BaseModel, Field
+
+from .agent_tree import walk_agents
+from .logging_config import logger
+from .metrics import registry, stop_exporters
+from .session_store import is_shared, prepare_session_store, register_session_stores, session_store_uri
+from .streaming import SubAgentStreamMiddleware
+
+AGENTS_DIR = str(Path(__file__).resolve().parents[1])
+WARMUP_STEPS = ["clients", "embeddings", "local_indexes", "render_pool", "model_ping"]
+LOCAL_BACKENDS_MODULE = "project_agora.testing.local_backends"
+
+ready_gauge = registry.gauge("agora_ready", "1 once warm-up has finished and the instance accepts traffic.")
+warmup_step_seconds = registry.histogram("agora_warmup_step_seconds", "Duration of each warm-up step.")
+
+
+class WarmupStep(BaseModel):
+    """Outcome of one warm-up step."""
+
+    ok: bool
+    seconds: float
+    detail: Optional[str] = None
+
+
+class WarmupStatus(BaseModel):
+    """Progress of the warm-up phase, as reported by `/readyz` and `/warmup`."""
+
+    state: str = "pending"  # pending | running | ready | failed
+    started_at: Optional[float] = None
+    seconds: Optional[float] = None
+    steps: Dict[str, WarmupStep] = Field(default_factory=dict)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+
+status = WarmupStatus()
+_warmup_task: Optional[asyncio.Task] = None
+
+
+def _iter_tools(root: BaseAgent):
+    for agent in walk_agents(root):
+        yield from (tool for tool in getattr(agent, "tools", []) if not isinstance(tool, AgentTool))
+
+
+# --- Steps ---
+
+def _warm_clients(root: BaseAgent) -> str:
+    from .tools._clients import bigquery_client, storage_client
+    from .tools._lazy_tools import LazyTool
+
+    bigquery_client(os.getenv("BQ_PROJECT_ID"))
+    storage_client()
+    lazy_tools = [tool for tool in _iter_tools(root) if isinstance(tool, LazyTool)]
+    for tool in lazy_tools:
+        tool.tool
+    return f"BigQuery and Storage clients created, {len(lazy_tools)} lazy tools built"
+
+
+def _warm_embeddings(root: BaseAgent) -> str:
+    from .tools._data_tools import _get_embedding_for_query
+
+    # Also opens the connection, so the first real query skips the TLS handshake
+    _get_embedding_for_query("warm-up")
+    return "embedding model loaded"
+
+
+def _warm_local_indexes(root: BaseAgent) -> str:
+    in_use = any(getattr(getattr(tool, "func", tool), "__module__", None) == LOCAL_BACKENDS_MODULE for tool in _iter_tools(root))
+    if not in_use:
+        return "local backends not in use"
+    from .testing.local_backends import get_knowledge_base, get_ticket_store
+
+    get_ticket_store()
+    get_knowledge_base()
+    return "ticket and knowledge-base indexes built"
+
+
+async def _warm_render_pool(root: BaseAgent) -> str:
+    from .tools._render_scheduler import get_render_scheduler
+
+    await get_render_scheduler().warm_up()
+    return "render workers started and Chromium launched"
+
+
+async def _ping_models(root: BaseAgent) -> str:
+    from google.adk.models.llm_request import LlmRequest
+    from google.adk.models.registry import LLMRegistry
+    from google.genai import types
+
+    from .llm_cache import cache_mode
+
+    if cache_mode() == "replay":
+        return "skipped in LLM cache replay mode"
+    model_names = sorted({
+        agent.model.model if isinstance(agent.model, BaseLlm) else agent.model
+        for agent in walk_agents(root)
+        if getattr(agent, "model", None)
+    })
+
+    async def ping(model_name: str):
+        request = LlmRequest(
+            model=model_name,
+            contents=[types.Content(role="user", parts=[types.Part(text="ping")])],
+            config=types.GenerateContentConfig(max_output_tokens=8),
+        )
+        async for _ in LLMRegistry.new_llm(model_name).generate_content_async(request):
+            pass
+
+    await asyncio.gather(*(ping(name) for name in model_names))
+    return f"pinged {', '.join(model_names)}"
+
+
+_STEP_FUNCTIONS: Dict[str, Callable[[BaseAgent], object]] = {
+    "clients": _warm_clients,
+    "embeddings": _warm_embeddings,
+    "local_indexes": _warm_local_indexes,
+    "render_pool": _warm_render_pool,
+    "model_ping": _ping_models,
+}
+
+
+def configured_steps() -> List[str]:
+    configured = os.getenv("AGORA_WARMUP_STEPS")
+    if not configured:
+        return list(WARMUP_STEPS)
+    steps = [step.strip() for step in configured.split(",") if step.strip()]
+    unknown = set(steps) - set(WARMUP_STEPS)
+    if unknown:
+        raise ValueError(f"Unknown AGORA_WARMUP_STEPS {sorted(unknown)}; choose from {WARMUP_STEPS}.")
+    return steps
+
+
+async def _run_step(name: str, root: BaseAgent) -> WarmupStep:
+    started_at = time.perf_counter()
+    function = _STEP_FUNCTIONS[name]
+    try:
+        if asyncio.iscoroutinefunction(function):
+            detail = await function(root)
+        else:
+            # Client creation and model loading block, so they run off the event loop
+            detail = await asyncio.to_thread(function, root)
+        step = WarmupStep(ok=True, seconds=time.perf_counter() - started_at, detail=detail)
+    except Exception as e:
+        step = WarmupStep(ok=False, seconds=time.perf_counter() - started_at, detail=f"{type(e).__name__}: {e}")
+        logger.warning(f"Warm-up step '{name}' failed: {step.detail}")
+    warmup_step_seconds.observe(step.seconds, step=name)
+    return step
+
+
+async def warm_up(root: Optional[BaseAgent] = None, steps: Optional[List[str]] = None) -> WarmupStatus:
+    """Runs the warm-up steps concurrently and marks the instance ready when they finish."""
+    if root is None:
+        from .agent import root_agent as root
+    steps = steps or configured_steps()
+
+    # A re-run on a serving instance keeps it ready; only a cold instance reports "running"
+    if not status.ready:
+        status.state = "running"
+        ready_gauge.set(0)
+    status.started_at = time.time()
+    logger.info(f"Warm-up started: {', '.join(steps)}")
+    started_at = time.perf_counter()
+    results = await asyncio.gather(*(_run_step(name, root) for name in steps))
+    status.steps = dict(zip(steps, results))
+    status.seconds = time.perf_counter() - started_at
+
+    failed = [name for name, step in status.steps.items() if not step.ok]
+    strict = os.getenv("AGORA_WARMUP_STRICT", "0") == "1"
+    status.state = "failed" if failed and strict else "ready"
+    ready_gauge.set(1 if status.ready else 0)
+    logger.info(f"Warm-up finished in {status.seconds:.2f}s: {status.state}" + (f" (failed: {', '.join(failed)})" if failed else ""))
+    return status
+
+
+def start_warm_up(root: Optional[BaseAgent] = None) -> asyncio.Task:
+    """Starts warm-up in the background on the running loop, unless it is already running."""
+    global _warmup_task
+    if _warmup_task is None or _warmup_task.done():
+        _warmup_task = asyncio.create_task(warm_up(root), name="agora-warm-up")
+    return _warmup_task
+
+
+def _serve_web_ui() -> bool:
+    return os.getenv("AGORA_SERVE_WEB_UI", "1") != "0"
+
+
+def create_app(agents_dir: str = AGENTS_DIR, web: Optional[bool] = None, **kwargs):
+    """
+    ADK's FastAPI app on the shared session store, plus the warm-up hook,
+    `/readyz`, `/warmup` and sub-agent streaming. Called without arguments in
+    every worker process.
+    """
+    from fastapi import Response
+    from google.adk.cli.fast_api import get_fast_api_app
+
+    register_session_stores()
+    kwargs.setdefault("session_service_uri", session_store_uri())
+    if web is None:
+        web = _serve_web_ui()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        if os.getenv("AGORA_WARMUP_ON_START", "1") != "0":
+            start_warm_up()
+        else:
+            # Without a warm-up phase the instance is ready as soon as it serves
+            status.state = "ready"
+            ready_gauge.set(1)
+        yield
+
+    app = get_fast_api_app(agents_dir=agents_dir, web=web, lifespan=lifespan, **kwargs)
+    # Streaming /run_sse responses also carry the sub-agents' partial output
+    app.add_middleware(SubAgentStreamMiddleware)
+
+    @app.get("/readyz")
+    async def readyz(response: Response):
+        if not status.ready:
+            response.status_code = 503
+        return status.model_dump()
+
+    @app.get("/warmup")
+    async def warmup_status():
+        return status.model_dump()
+
+    @app.post("/warmup")
+    async def trigger_warmup(wait: bool = False):
+        task = start_warm_up()
+        if wait:
+            await asyncio.shield(task)
+        return status.model_dump()
+
+    return app
+
+
+def worker_count() -> int:
+    return int(os.getenv("AGORA_WORKERS") or os.cpu_count() or 1)
+
+
+def main():
+    import uvicorn
+
+    port = int(os.getenv("PORT", "8080"))
+    workers = worker_count()
+    uri = session_store_uri()
+    if workers > 1 and not is_shared(uri):
+        raise ValueError(f"AGORA_WORKERS={workers} needs a shared session store; {uri} keeps sessions in one process.")
+    asyncio.run(prepare_session_store(uri))
+    if workers > 1:
+        # Each worker keeps and exports its own metrics, and needs the worker count for its share of the rate limits
+        stop_exporters()
+        os.environ["AGORA_WORKERS"] = str(workers)
+    logger.info(f"Serving on port {port} with {workers} worker(s)")
+    # Each worker process imports this module and builds its own app
+    uvicorn.run("project_agora.serving:create_app", factory=True, host="0.0.0.0", port=port, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
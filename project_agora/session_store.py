@@ -0,0 +1,119 @@
+# FILE: project_agora/session_store.py
+
+"""
+Shared, persistent session storage for the serving workers.
+
+Sessions, including the ticket kept in session state, are stored outside the
+worker processes, so any worker can run the next turn of any session and a
+restarted worker picks up where the previous one stopped. The backend is
+selected with AGORA_SESSION_STORE_URI:
+
+- sqlite:///path/to/sessions.db (default: data/sessions.db in the repo): a
+  local SQLite file shared by the workers of one host. The database is put in
+  WAL mode so readers never block the writer, and every connection waits up
+  to AGORA_SESSION_STORE_BUSY_TIMEOUT_MS (default 30000) for a lock instead
+  of failing with "database is locked".
+- postgresql+asyncpg://..., mysql+aiomysql://...: any SQLAlchemy async URL,
+  for sessions shared across hosts or Cloud Run instances.
+- agentengine://<resource>: Vertex AI Agent Engine sessions.
+- memory://: sessions live in the process (single worker only).
+
+`register_session_stores()` registers the SQLite factory with ADK's service
+registry, so the URI can be passed anywhere ADK accepts a session service URI.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+from google.adk.sessions.base_session_service import BaseSessionService
+
+from .logging_config import logger
+
+DEFAULT_SESSION_DB = Path(__file__).resolve().parents[1] / "data" / "sessions.db"
+SQLITE_SCHEMES = ("sqlite", "sqlite+aiosqlite")
+# Backends that keep sessions in the process and so cannot be shared by workers
+IN_PROCESS_SCHEMES = ("memory",)
+
+
+def session_store_uri() -> str:
+    """The configured session store URI (AGORA_SESSION_STORE_URI)."""
+    return os.getenv("AGORA_SESSION_STORE_URI") or f"sqlite:///{DEFAULT_SESSION_DB}"
+
+
+def is_shared(uri: str) -> bool:
+    """Whether several worker processes can share the sessions in this store."""
+    parsed = urlparse(uri)
+    if parsed.scheme in SQLITE_SCHEMES:
+        return _sqlite_path(uri) not in ("", ":memory:")
+    return parsed.scheme not in IN_PROCESS_SCHEMES
+
+
+def _sqlite_path(uri: str) -> str:
+    # sqlite:///relative.db and sqlite:////absolute.db, as in SQLAlchemy
+    return uri.split(":///", 1)[1] if ":///" in uri else ""
+
+
+def _enable_wal(dbapi_connection, connection_record):
+    busy_timeout_ms = int(os.getenv("AGORA_SESSION_STORE_BUSY_TIMEOUT_MS", "30000"))
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # WAL makes NORMAL durable across application crashes; only a power loss can drop the last commits
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+    cursor.close()
+
+
+def sqlite_session_service(uri: str, **kwargs: Any) -> BaseSessionService:
+    """A `DatabaseSessionService` on a WAL-mode SQLite file that several processes can share."""
+    from google.adk.sessions.database_session_service import DatabaseSessionService
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    path = _sqlite_path(uri)
+    if path in ("", ":memory:"):
+        from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+        return InMemorySessionService()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    busy_timeout_seconds = int(os.getenv("AGORA_SESSION_STORE_BUSY_TIMEOUT_MS", "30000")) / 1000
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": busy_timeout_seconds})
+    event.listen(engine.sync_engine, "connect", _enable_wal)
+    return DatabaseSessionService(db_engine=engine)
+
+
+def register_session_stores() -> None:
+    """Makes ADK build WAL-mode SQLite session services for `sqlite://` URIs."""
+    from google.adk.cli.service_registry import get_service_registry
+
+    registry = get_service_registry()
+    for scheme in SQLITE_SCHEMES:
+        registry.register_session_service(scheme, sqlite_session_service)
+
+
+def create_session_service(uri: Optional[str] = None) -> BaseSessionService:
+    """Builds the session service for `uri` (default: the configured session store)."""
+    from google.adk.cli.service_registry import get_service_registry
+    from google.adk.sessions.database_session_service import DatabaseSessionService
+
+    uri = uri or session_store_uri()
+    if urlparse(uri).scheme in SQLITE_SCHEMES:
+        return sqlite_session_service(uri)
+    service = get_service_registry().create_session_service(uri)
+    # Like ADK, any other URI is treated as a SQLAlchemy database URL
+    return service or DatabaseSessionService(db_url=uri)
+
+
+async def prepare_session_store(uri: Optional[str] = None) -> None:
+    """
+    Creates the session store's tables once, before the workers start, so
+    they do not race to create them on their first request.
+    """
+    uri = uri or session_store_uri()
+    service = create_session_service(uri)
+    await service.list_sessions(app_name="project_agora")
+    engine = getattr(service, "db_engine", None)
+    if engine is not None:
+        await engine.dispose()
+    logger.info(f"Session store ready: {urlparse(uri).scheme}://...")
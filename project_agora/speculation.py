@@ -0,0 +1,221 @@
+# FILE: project_agora/speculation.py
+
+"""
+Speculative retrieval, run while the ticket is being analysed.
+
+Without speculation, retrieval starts only after `ticket_analysis_agent` has
+returned and `update_ticket_after_analysis` has stored the summary, so the
+latencies of triage and retrieval add up. With AGORA_SPECULATIVE_RETRIEVAL=1,
+`create_ticket` also starts the retrieval sub-agents (knowledge base and
+historical tickets) on the raw request text in the background, each in its
+own session seeded with a copy of the ticket's state. Analysis then runs
+concurrently with retrieval, so the Analyzing state overlaps with New.
+
+When the orchestrator later calls a retrieval sub-agent, `claim()` compares
+the query it was given (usually the analysis summary) with the raw request:
+
+- if they are semantically close, the call is answered with the speculative
+  run's output, waiting for it if it is still running. That is the output the
+  sub-agent would have returned, produced the same way;
+- otherwise the speculative run is discarded and the sub-agent runs as usual
+  on the new query.
+
+Closeness is the cosine similarity of the two texts' embeddings, or of their
+word counts when AGORA_SPECULATION_SIMILARITY=lexical or the embedding model
+is unavailable. It must reach AGORA_SPECULATION_MIN_SIMILARITY (default 0.8
+for embeddings, 0.35 for words). Outcomes are counted in
+`agora_speculation_total` (hit, miss, error, expired), so the hit rate can be
+tracked. A miss costs a second retrieval run, and embedding similarity one
+embedding call per text, which is why speculation is off by default.
+
+Speculative results live in the process for AGORA_SPECULATION_TTL_SECONDS
+(default 600); a turn served by another worker simply runs retrieval as usual.
+"""
+
+import asyncio
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from pydantic import BaseModel, ConfigDict
+
+from .agent_runner import run_agent
+from .agent_tree import walk_agents
+from .logging_config import logger
+from .metrics import registry
+
+# The sub-agents run speculatively
+SPECULATIVE_AGENTS = ("knowledge_retrieval_agent", "db_retrieval_agent")
+DEFAULT_MIN_SIMILARITY = {"embedding": 0.8, "lexical": 0.35}
+DEFAULT_TTL_SECONDS = 600.0
+
+_WORD_RE = re.compile(r"[a-z0-9_]+")
+
+speculation_total = registry.counter(
+    "agora_speculation_total", "Speculative retrievals by outcome (hit, miss, error, expired) and agent."
+)
+speculation_similarity = registry.histogram(
+    "agora_speculation_similarity",
+    "Similarity between the raw request and the query a retrieval agent was called with.",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 1.0),
+)
+speculation_saved_seconds = registry.histogram(
+    "agora_speculation_saved_seconds", "Retrieval time that had already elapsed in the background when a speculative result was used."
+)
+
+
+class Speculation(BaseModel):
+    """The background retrievals started for one ticket."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    request: str
+    started_at: float
+    tasks: Dict[str, asyncio.Task]
+    request_embedding: Optional[asyncio.Task] = None
+
+
+_agents: Dict[str, BaseAgent] = {}
+_speculations: Dict[str, Speculation] = {}
+# Set by offline runs (see testing.local_backends) where the embedding model is unavailable
+method_override: Optional[str] = None
+
+
+def enabled() -> bool:
+    return os.getenv("AGORA_SPECULATIVE_RETRIEVAL", "0") == "1" and bool(_agents)
+
+
+def similarity_method() -> str:
+    method = method_override or os.getenv("AGORA_SPECULATION_SIMILARITY", "embedding").lower()
+    if method not in DEFAULT_MIN_SIMILARITY:
+        raise ValueError(f"AGORA_SPECULATION_SIMILARITY must be one of {sorted(DEFAULT_MIN_SIMILARITY)}; got '{method}'.")
+    return method
+
+
+def min_similarity(method: str) -> float:
+    configured = os.getenv("AGORA_SPECULATION_MIN_SIMILARITY")
+    return float(configured) if configured else DEFAULT_MIN_SIMILARITY[method]
+
+
+def register_agent_tree(root: BaseAgent) -> None:
+    """Finds the retrieval sub-agents below `root` that can be run speculatively."""
+    for agent in walk_agents(root):
+        if agent is not root and agent.name in SPECULATIVE_AGENTS:
+            _agents[agent.name] = agent
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Failures of results nobody claims are only logged, not reported as unretrieved
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug(f"Speculative task {task.get_name()} failed: {task.exception()}")
+
+
+def _embed(text: str) -> List[float]:
+    from .tools._data_tools import _get_embedding_for_query
+
+    return _get_embedding_for_query(text)
+
+
+def _cosine(a, b) -> float:
+    if isinstance(a, Counter):
+        dot = sum(count * b.get(word, 0) for word, count in a.items())
+        norm_a, norm_b = math.sqrt(sum(v * v for v in a.values())), math.sqrt(sum(v * v for v in b.values()))
+    else:
+        dot = sum(x * y for x, y in zip(a, b))
+        norm_a, norm_b = math.sqrt(sum(x * x for x in a)), math.sqrt(sum(y * y for y in b))
+    return dot / (norm_a * norm_b) if norm_a and norm_b else 0.0
+
+
+def _words(text: str) -> Counter:
+    return Counter(_WORD_RE.findall(text.lower()))
+
+
+def _expire(now: float) -> None:
+    ttl = float(os.getenv("AGORA_SPECULATION_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    for ticket_id in [t for t, s in _speculations.items() if now - s.started_at > ttl]:
+        for agent_name, task in _speculations.pop(ticket_id).tasks.items():
+            task.cancel()
+            speculation_total.inc(outcome="expired", agent=agent_name)
+
+
+def start(ticket_id: str, request: str, state: dict) -> None:
+    """
+    Starts the retrieval sub-agents on the raw request in the background, in
+    sessions seeded with `state` (needs a running event loop). Their model and
+    tool calls go through the callbacks, scheduler and budget like any other.
+    """
+    if not enabled():
+        return
+    now = time.monotonic()
+    _expire(now)
+    tasks = {
+        name: asyncio.create_task(run_agent(agent, request, dict(state)), name=f"speculative-{name}-{ticket_id}")
+        for name, agent in _agents.items()
+    }
+    request_embedding = None
+    if similarity_method() == "embedding":
+        request_embedding = asyncio.create_task(asyncio.to_thread(_embed, request), name=f"speculative-embedding-{ticket_id}")
+    for task in [*tasks.values(), request_embedding]:
+        if task is not None:
+            task.add_done_callback(_retrieve_exception)
+    _speculations[ticket_id] = Speculation(request=request, started_at=now, tasks=tasks, request_embedding=request_embedding)
+    logger.info(f"Speculative retrieval started for ticket {ticket_id}: {', '.join(tasks)}")
+
+
+async def _similarity(speculation: Speculation, query: str) -> Tuple[float, str]:
+    if speculation.request_embedding is not None:
+        try:
+            request_vector = await speculation.request_embedding
+            query_vector = await asyncio.to_thread(_embed, query)
+            return _cosine(request_vector, query_vector), "embedding"
+        except Exception as e:
+            logger.warning(f"Embedding similarity unavailable, comparing words instead: {e}")
+    return _cosine(_words(speculation.request), _words(query)), "lexical"
+
+
+async def claim(ticket_id: Optional[str], agent_name: str, query: str) -> Optional[str]:
+    """
+    Returns the speculative result of `agent_name` for the ticket if `query`
+    is close enough to the raw request, or None if the agent should run.
+    """
+    speculation = _speculations.get(ticket_id) if ticket_id else None
+    task = speculation.tasks.pop(agent_name, None) if speculation else None
+    if task is None:
+        return None
+    if not speculation.tasks:
+        _speculations.pop(ticket_id, None)
+
+    similarity, method = await _similarity(speculation, query)
+    speculation_similarity.observe(similarity, agent=agent_name, method=method)
+    if similarity < min_similarity(method):
+        task.cancel()
+        speculation_total.inc(outcome="miss", agent=agent_name)
+        logger.info(f"Speculative {agent_name} result discarded for ticket {ticket_id} (similarity {similarity:.2f}); re-running.")
+        return None
+
+    saved_seconds = time.monotonic() - speculation.started_at
+    try:
+        result = await task
+    except Exception as e:
+        speculation_total.inc(outcome="error", agent=agent_name)
+        logger.warning(f"Speculative {agent_name} failed for ticket {ticket_id}: {e}; re-running.")
+        return None
+    speculation_total.inc(outcome="hit", agent=agent_name)
+    speculation_saved_seconds.observe(saved_seconds, agent=agent_name)
+    logger.info(f"Speculative {agent_name} result used for ticket {ticket_id} (similarity {similarity:.2f}).")
+    return result
+
+
+def output_key(agent_name: str) -> Optional[str]:
+    """The state key the agent would have written its result to."""
+    return getattr(_agents.get(agent_name), "output_key", None)
+
+
+def enable_speculation_from_env(root: BaseAgent) -> None:
+    """Registers the retrieval sub-agents when AGORA_SPECULATIVE_RETRIEVAL=1."""
+    if os.getenv("AGORA_SPECULATIVE_RETRIEVAL", "0") == "1":
+        register_agent_tree(root)
@@ -0,0 +1,310 @@
+# FILE: project_agora/streaming.py
+
+"""
+Streaming of sub-agent output to the user while it is generated.
+
+`problem_solver_agent` and `code_generator_agent` run inside an `AgentTool`,
+which runs them unary and returns their output only once it is complete. The
+user sees nothing but a progress message for the whole generation. Two
+changes shorten the wait:
+
+- `StreamingAgentTool` runs its agent with SSE streaming whenever someone is
+  listening to the session, and publishes every partial chunk to the
+  process-wide `hub` as it arrives. The tool still returns the complete
+  output, so the orchestrator and session state see exactly what they saw
+  before;
+- `SubAgentStreamMiddleware` listens on behalf of every streaming `/run_sse`
+  request (`"streaming": true`) and writes the published chunks into that
+  same response, as partial events authored by the sub-agent, between the
+  orchestrator's own events. The chunks are produced and sent in the process
+  that serves the request, so no sticky routing is needed with several
+  workers.
+
+The time to the first visible token of a solution drops from the full
+generation time to that of the sub-agent's first streamed chunk. Requests that
+do not stream (`/run`, Agent Engine, the evaluations) run the agent as a plain
+`AgentTool` and get its output through the orchestrator as before.
+AGORA_STREAM_SUBAGENTS=0 turns sub-agent streaming off.
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Callable, Dict, Optional, Set
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.adk.memory import InMemoryMemoryService
+from google.adk.tools.agent_tool import (
+    AgentTool,
+    ForwardingArtifactService,
+    _get_input_schema,
+    _get_output_schema,
+    _part_to_text,
+)
+from google.adk.tools.tool_context import ToolContext
+from google.adk.utils._schema_utils import validate_schema
+from google.adk.utils.context_utils import Aclosing
+from google.genai import types
+
+from .agent_runner import copy_state
+from .logging_config import logger
+from .metrics import registry
+
+# Partial events a slow client has not read yet are dropped beyond this many
+MAX_QUEUED_EVENTS = 1000
+
+stream_first_chunk_seconds = registry.histogram(
+    "agora_stream_first_chunk_seconds", "Time from a streamed sub-agent call to its first partial chunk, by agent."
+)
+stream_chunks_total = registry.counter("agora_stream_chunks_total", "Partial sub-agent chunks published, by agent.")
+stream_dropped_total = registry.counter(
+    "agora_stream_dropped_total", "Partial sub-agent chunks dropped because the client fell behind."
+)
+
+
+def enabled() -> bool:
+    return os.getenv("AGORA_STREAM_SUBAGENTS", "1") != "0"
+
+
+class StreamHub:
+    """Fans out partial events to the listeners of a session, within one process and event loop."""
+
+    def __init__(self):
+        self._listeners: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUED_EVENTS)
+        self._listeners.setdefault(session_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        listeners = self._listeners.get(session_id)
+        if listeners is None:
+            return
+        listeners.discard(queue)
+        if not listeners:
+            del self._listeners[session_id]
+
+    def has_listeners(self, session_id: str) -> bool:
+        return bool(self._listeners.get(session_id))
+
+    def publish(self, session_id: str, event: Event) -> None:
+        for queue in self._listeners.get(session_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                stream_dropped_total.inc(agent=event.author)
+
+
+# The process-wide hub shared by the tools and the middleware
+hub = StreamHub()
+
+
+class StreamingAgentTool(AgentTool):
+    """
+    An `AgentTool` whose agent streams its output to the session's listeners.
+
+    Without listeners (or with AGORA_STREAM_SUBAGENTS=0) it behaves exactly
+    like `AgentTool`. The returned value is the agent's complete output either way.
+
+    With `skip_summarization_when_streamed`, a streamed output ends the
+    caller's turn as it is, since the user has already seen it; an output that
+    was not streamed is still handed back to the caller to present.
+    """
+
+    def __init__(
+        self, agent: BaseAgent, skip_summarization: bool = False, *, skip_summarization_when_streamed: bool = False, **kwargs
+    ):
+        super().__init__(agent, skip_summarization, **kwargs)
+        self.skip_summarization_when_streamed = skip_summarization_when_streamed
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        session_id = tool_context.session.id
+        if not enabled() or not hub.has_listeners(session_id):
+            return await super().run_async(args=args, tool_context=tool_context)
+        if self.skip_summarization or self.skip_summarization_when_streamed:
+            tool_context.actions.skip_summarization = True
+
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        chunks = 0
+
+        def forward(event: Event) -> None:
+            nonlocal chunks
+            if not (event.content and event.content.parts and any(part.text for part in event.content.parts)):
+                return
+            if chunks == 0:
+                stream_first_chunk_seconds.observe(loop.time() - started_at, agent=self.agent.name)
+            chunks += 1
+            stream_chunks_total.inc(agent=self.agent.name)
+            # Attributed to the caller's invocation so clients can group it with the turn
+            hub.publish(session_id, event.model_copy(update={"invocation_id": tool_context.invocation_id}))
+
+        return await self._run_streamed(args, tool_context, forward)
+
+    async def _run_streamed(
+        self, args: dict[str, Any], tool_context: ToolContext, on_partial: Callable[[Event], None]
+    ) -> Any:
+        """
+        `AgentTool.run_async` with SSE streaming: the same child runner, built
+        from the caller's invocation (app name, plugins, credentials, run
+        settings, abort signal), with each partial event handed to `on_partial`.
+        """
+        # Imported on first use, as AgentTool does, to keep them off the startup path
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+
+        input_schema = _get_input_schema(self.agent)
+        if input_schema:
+            request = input_schema.model_validate(args).model_dump_json(exclude_none=True)
+        else:
+            request = args["request"] if "request" in args else json.dumps(args, ensure_ascii=False, sort_keys=True)
+        message = types.Content(role="user", parts=[types.Part.from_text(text=request)])
+
+        invocation_context = tool_context._invocation_context
+        app_name = invocation_context.app_name or self.agent.name
+        runner = Runner(
+            app_name=app_name,
+            agent=self.agent,
+            artifact_service=ForwardingArtifactService(tool_context),
+            session_service=InMemorySessionService(),
+            memory_service=InMemoryMemoryService(),
+            credential_service=invocation_context.credential_service,
+            plugins=invocation_context.plugin_manager.plugins if self.include_plugins else None,
+        )
+        if self.include_plugins:
+            # The parent runner still owns the plugins it shares
+            runner.plugin_manager.set_skip_closing_plugins(True)
+        session = await runner.session_service.create_session(
+            app_name=app_name, user_id=invocation_context.user_id, state=copy_state(tool_context.state)
+        )
+
+        # The caller's run settings (max_llm_calls among them), streamed; CFC only applies to the caller's own model
+        run_config = (invocation_context.run_config or RunConfig()).model_copy(
+            update={"streaming_mode": StreamingMode.SSE, "support_cfc": False}
+        )
+        # Aborting the caller aborts the agent too, unless the tool runs on another event loop
+        abort_signal = invocation_context._abort_signal
+        caller_loop = getattr(getattr(invocation_context, "_abort_state", None), "loop", None)
+        if not isinstance(abort_signal, asyncio.Event) or (
+            isinstance(caller_loop, asyncio.AbstractEventLoop) and caller_loop is not asyncio.get_running_loop()
+        ):
+            abort_signal = None
+
+        last_content, last_error, last_grounding_metadata = None, None, None
+        try:
+            async with Aclosing(
+                runner.run_async(
+                    user_id=session.user_id,
+                    session_id=session.id,
+                    new_message=message,
+                    run_config=run_config,
+                    abort_signal=abort_signal,
+                )
+            ) as events:
+                async for event in events:
+                    if event.partial:
+                        on_partial(event)
+                        continue
+                    if event.actions.state_delta:
+                        tool_context.state.update(event.actions.state_delta)
+                    if event.error_message:
+                        last_error = event.error_message
+                    if event.content:
+                        last_content = event.content
+                        last_grounding_metadata = event.grounding_metadata
+        finally:
+            await runner.close()
+
+        if last_content is None or last_content.parts is None:
+            return last_error or ""
+        text = "\n".join(text for text in (_part_to_text(part) for part in last_content.parts if not part.thought) if text)
+        if not text and last_error:
+            return last_error
+        output_schema = _get_output_schema(self.agent)
+        result = validate_schema(output_schema, text) if output_schema else text
+        if self.propagate_grounding_metadata and last_grounding_metadata:
+            tool_context.state["temp:_adk_grounding_metadata"] = last_grounding_metadata
+        return result
+
+
+def _sse(event: Event) -> bytes:
+    payload = event.model_dump_json(exclude_none=True, by_alias=True)
+    return f"data: {payload}\n\n".encode("utf-8")
+
+
+def _streaming_session(body: bytes) -> Optional[str]:
+    """The session id of a `/run_sse` request body that asks for streaming, else None."""
+    try:
+        request = json.loads(body or b"{}")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(request, dict) or not request.get("streaming"):
+        return None
+    return request.get("sessionId") or request.get("session_id")
+
+
+class SubAgentStreamMiddleware:
+    """ASGI middleware that interleaves published sub-agent chunks into streaming `/run_sse` responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].endswith("/run_sse") or not enabled():
+            await self.app(scope, receive, send)
+            return
+
+        # Read the body to find the session, then replay it to the app
+        body, more_body = b"", True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        session_id = _streaming_session(body)
+        if session_id is None:
+            await self.app(scope, replay, send)
+            return
+
+        queue = hub.subscribe(session_id)
+        send_lock = asyncio.Lock()
+        started = asyncio.Event()
+        finished = False
+
+        async def forward_chunks():
+            await started.wait()
+            while True:
+                event = await queue.get()
+                async with send_lock:
+                    if finished:
+                        return
+                    await send({"type": "http.response.body", "body": _sse(event), "more_body": True})
+
+        async def send_through(message):
+            nonlocal finished
+            async with send_lock:
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    # Nothing may follow the last body message
+                    finished = True
+                await send(message)
+            if message["type"] == "http.response.start":
+                started.set()
+
+        forwarder = asyncio.create_task(forward_chunks())
+        try:
+            await self.app(scope, replay, send_through)
+        finally:
+            forwarder.cancel()
+            hub.unsubscribe(session_id, queue)
+            logger.debug(f"Sub-agent stream for session {session_id} closed.")
@@ -3,12 +3,23 @@
 """Defines the Code Generator Agent, responsible for creating code."""
 
 from google.adk.agents import LlmAgent
-from .prompts import CODE_GENERATOR_PROMPT
+from ...callbacks import agent_callbacks
+from ...model_router import router
+from .prompts import CODE_GENERATOR_PROMPT, FILE_GENERATOR_PROMPT
 
 # The agent instantiation using the imported prompt
 code_generator_agent = LlmAgent(
     name="code_generator_agent",
-    model="gemini-2.5-pro",
+    model=router.model_for("code_generator_agent"),
     # Pass the pre-formatted, static string to the agent constructor.
     instruction=CODE_GENERATOR_PROMPT,
+    **agent_callbacks(),
+)
+
+# Writes a single file of an approved plan; several run at once (see project_agora/parallel_codegen.py)
+file_generator_agent = LlmAgent(
+    name="file_generator_agent",
+    model=router.model_for("file_generator_agent"),
+    instruction=FILE_GENERATOR_PROMPT,
+    **agent_callbacks(),
 )
@@ -1,5 +1,7 @@
 import os
 
+from ...logging_config import logger
+
 # Helper function to load the style guide from the local file
 def _load_style_guide():
     """Loads the ADK style guide from a local markdown file."""
@@ -8,7 +10,7 @@ def _load_style_guide():
         with open(style_guide_path, "r", encoding="utf-8") as f:
             return f.read()
     except FileNotFoundError:
-        print("ERROR: project_agora/sub_agents/code_generator/style_guide.md not found.")
+        logger.error("project_agora/sub_agents/code_generator/style_guide.md not found.")
         return "Error: Style guide not found."
 
 # Load the style guide once when the module is imported
@@ -48,6 +50,7 @@ The JSON must have this exact structure:
 
 ```json
 {
+  "project_name": "weather_agent",
   "plan_description": "A single, clear paragraph describing the high-level architecture and how it solves the user's problem.",
   "components": [
     {
@@ -150,4 +153,25 @@ After all file blocks, you MUST include the "Next Steps" and "Disclaimer" sectio
 
 # Construct the final prompt by combining the parts.
 # Now, f-string formatting is only applied where needed.
-CODE_GENERATOR_PROMPT = f"{PROMPT_HEADER}{ADK_STYLE_GUIDE}{PROMPT_FOOTER}" 
\ No newline at end of file
+CODE_GENERATOR_PROMPT = f"{PROMPT_HEADER}{ADK_STYLE_GUIDE}{PROMPT_FOOTER}"
+
+# Used by the per-file generator, which writes one file of an approved plan at a time
+FILE_GENERATOR_HEADER = """
+You are an elite ADK Lead Engineer on a team that builds an approved ADK project one file at a time. Other engineers are writing the other files of the project at the same moment, so you cannot see their code.
+
+**CRITICAL: You MUST strictly follow the ADK Style Guide provided below.**
+---
+"""
+
+FILE_GENERATOR_FOOTER = """
+---
+
+**Your task:**
+You receive the approved plan, the list of project files with the purpose of each, the shared interfaces, and the one file you must write.
+
+1.  Write ONLY the requested file, complete and production-ready.
+2.  Use exactly the names in the shared interfaces: define the ones your file provides, and import the ones it uses from the files that provide them. Do not invent other cross-file names.
+3.  Output only the raw file content. Do NOT add a `==== FILE:` header, Markdown code fences, explanations, a "Next Steps" section or a disclaimer.
+"""
+
+FILE_GENERATOR_PROMPT = f"{FILE_GENERATOR_HEADER}{ADK_STYLE_GUIDE}{FILE_GENERATOR_FOOTER}" 
\ No newline at end of file
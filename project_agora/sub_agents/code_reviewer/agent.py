@@ -1,11 +1,14 @@
 # FILE: project_agora/sub_agents/code_reviewer/agent.py
 
 from google.adk.agents import LlmAgent
+from ...callbacks import agent_callbacks
+from ...model_router import router
 from .prompts import CODE_REVIEWER_PROMPT
 
 code_reviewer_agent = LlmAgent(
     name="code_reviewer_agent",
-    model="gemini-2.5-pro",
+    model=router.model_for("code_reviewer_agent"),
     # Pass the pre-formatted string directly.
     instruction=CODE_REVIEWER_PROMPT,
-)
\ No newline at end of file
+    **agent_callbacks(),
+)
@@ -1,5 +1,7 @@
 import os
 
+from ...logging_config import logger
+
 # Helper function to load the style guide from the local file
 def _load_style_guide():
     """Loads the ADK style guide from a local markdown file."""
@@ -10,7 +12,7 @@ def _load_style_guide():
         with open(style_guide_path, "r", encoding="utf-8") as f:
             return f.read()
     except FileNotFoundError:
-        print("ERROR: project_agora/sub_agents/code_generator/style_guide.md not found.")
+        logger.error("project_agora/sub_agents/code_generator/style_guide.md not found.")
         return "Error: Style guide not found."
 
 # Load the style guide once when the module is imported
@@ -5,16 +5,19 @@
 from google.adk.agents import Agent
 
 from ...tools import search_resolved_tickets_db
+from ...callbacks import agent_callbacks
+from ...model_router import router
 from .prompts import DB_RETRIEVAL_PROMPT
 
 # This agent's only job is to execute the database search tool.
 db_retrieval_agent = Agent(
     name="db_retrieval_agent",
-    model="gemini-2.5-pro",
+    model=router.model_for("db_retrieval_agent"),
     instruction=DB_RETRIEVAL_PROMPT,
     tools=[
         search_resolved_tickets_db,
     ],
     # The output of the tool will be automatically saved to this state key.
     output_key="db_retrieval_results",
+    **agent_callbacks(),
 )
@@ -3,10 +3,15 @@
 """Defines the Problem Solver Agent, which synthesizes context to provide solutions."""
 
 from google.adk.agents import LlmAgent
+from ...callbacks import agent_callbacks
+from ...model_router import router
 from .prompts import PROBLEM_SOLVER_PROMPT
 
 problem_solver_agent = LlmAgent(
     name="problem_solver_agent",
-    model="gemini-2.5-pro",
+    model=router.model_for("problem_solver_agent"),
     instruction=PROBLEM_SOLVER_PROMPT,
+    # The solution is shown to the user as-is, so it is also kept in state for later turns
+    output_key="solution",
+    **agent_callbacks(),
 )
@@ -4,12 +4,15 @@
 
 from google.adk.agents import Agent
 from ...tools.file_reader_tool import read_user_file
+from ...callbacks import agent_callbacks
+from ...model_router import router
 from .prompts import TICKET_ANALYSIS_PROMPT
 
 # This is a specialized agent that uses a targeted prompt
 ticket_analysis_agent = Agent(
     name="ticket_analysis_agent",
-    model="gemini-2.5-flash",
+    model=router.model_for("ticket_analysis_agent"),
     instruction=TICKET_ANALYSIS_PROMPT,
     tools=[read_user_file],
+    **agent_callbacks(),
 )
@@ -0,0 +1,18 @@
+"""Offline test support: a scripted model, local backends and the evaluation harness."""
+
+from .harness import CaseResult, EvalReport, load_cases, run_eval
+from .local_backends import local_backends
+from .scripted_llm import CaseScript, ScriptedLlm, ScriptedStep, scripted_models, use_script
+
+__all__ = [
+    "CaseResult",
+    "CaseScript",
+    "EvalReport",
+    "ScriptedLlm",
+    "ScriptedStep",
+    "load_cases",
+    "local_backends",
+    "run_eval",
+    "scripted_models",
+    "use_script",
+]
@@ -0,0 +1,223 @@
+"""
+Concurrent, in-process evaluation of the agent on the `eval/data/*.test.json` cases.
+
+Offline (the default), every agent runs on a `ScriptedLlm` that follows the
+case's `expected_tool_use`, and the BigQuery, GCS and RAG tools are replaced
+by their local versions, so the whole suite finishes in seconds without
+credentials. With `live=True`, the same cases run against the real models and
+backends.
+
+Usage:
+    python -m project_agora.testing.harness [--live] [--concurrency N] [--report report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from .local_backends import local_backends
+from .scripted_llm import CaseScript, ScriptedStep, scripted_models, use_script
+
+EVAL_DATA_DIR = Path(__file__).resolve().parents[2] / "eval" / "data"
+APP_NAME = "project_agora_eval"
+
+
+class CaseResult(BaseModel):
+    """Outcome of one evaluation case."""
+
+    query: str
+    expected_tools: List[str]
+    actual_tools: List[str] = Field(default_factory=list)
+    expected_statuses: List[str] = Field(default_factory=list)
+    statuses: List[str] = Field(default_factory=list, description="The ticket statuses the conversation went through, in order.")
+    final_state: Dict[str, object] = Field(default_factory=dict, description="The session state at the end of the case.")
+    final_response: str = ""
+    latency_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def trajectory_match(self) -> bool:
+        return self.error is None and self.actual_tools == self.expected_tools
+
+    @property
+    def status_match(self) -> bool:
+        return self.error is None and self.statuses == self.expected_statuses
+
+    @property
+    def ticket(self) -> Optional[dict]:
+        """The ticket in the final session state, if one was created."""
+        return json.loads(self.final_state["ticket"]) if "ticket" in self.final_state else None
+
+
+class EvalReport(BaseModel):
+    """Per-case results plus aggregate trajectory accuracy and latency."""
+
+    live: bool
+    wall_seconds: float
+    results: List[CaseResult]
+
+    @property
+    def trajectory_accuracy(self) -> float:
+        if not self.results:
+            return 0.0
+        return sum(result.trajectory_match for result in self.results) / len(self.results)
+
+    @property
+    def status_accuracy(self) -> float:
+        if not self.results:
+            return 0.0
+        return sum(result.status_match for result in self.results) / len(self.results)
+
+    def latency_percentile(self, percentile: float) -> float:
+        latencies = sorted(result.latency_seconds for result in self.results)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))]
+
+    def summary(self) -> str:
+        lines = [f"{'match':<6} {'latency':>8}  query"]
+        for result in self.results:
+            status = "ok" if result.trajectory_match and result.status_match else "FAIL"
+            lines.append(f"{status:<6} {result.latency_seconds:>7.3f}s  {result.query[:70]}")
+            if not result.trajectory_match:
+                lines.append(f"{'':<16}expected {result.expected_tools}, got {result.actual_tools}")
+            if not result.status_match:
+                lines.append(f"{'':<16}expected statuses {result.expected_statuses}, got {result.statuses}")
+            if result.error:
+                lines.append(f"{'':<16}error: {result.error}")
+        latencies = [result.latency_seconds for result in self.results] or [0.0]
+        lines.append(
+            f"{len(self.results)} cases in {self.wall_seconds:.2f}s ({'live' if self.live else 'offline'}): "
+            f"trajectory accuracy {self.trajectory_accuracy:.0%}, status accuracy {self.status_accuracy:.0%}, latency mean {statistics.mean(latencies):.3f}s, "
+            f"p50 {self.latency_percentile(50):.3f}s, p95 {self.latency_percentile(95):.3f}s"
+        )
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        data = self.model_dump()
+        data["trajectory_accuracy"] = self.trajectory_accuracy
+        data["status_accuracy"] = self.status_accuracy
+        for result, result_data in zip(self.results, data["results"]):
+            result_data["trajectory_match"] = result.trajectory_match
+            result_data["status_match"] = result.status_match
+        return json.dumps(data, indent=2)
+
+
+def load_cases(paths: Optional[List[Path]] = None) -> List[dict]:
+    """Loads and concatenates the cases from the given files (default: every eval/data/*.test.json)."""
+    paths = paths or sorted(EVAL_DATA_DIR.glob("*.test.json"))
+    cases = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            cases.extend(json.load(f))
+    return cases
+
+
+def script_for_case(case: dict, root_agent_name: str) -> CaseScript:
+    """
+    The orchestrator follows the expected trajectory, passing on the results
+    named in each step's `args_from`, and then answers with the reference
+    text. Sub-agents answer with the case's `scripted_responses`, if any.
+    """
+    return CaseScript(
+        steps={
+            root_agent_name: [
+                ScriptedStep(tool_name=tool["tool_name"], tool_input=tool.get("tool_input") or {}, args_from=tool.get("args_from") or {})
+                for tool in case.get("expected_tool_use", [])
+            ]
+        },
+        responses={**case.get("scripted_responses", {}), root_agent_name: case.get("reference", "")},
+    )
+
+
+def _ticket_status(state_delta: dict) -> Optional[str]:
+    try:
+        return json.loads(state_delta["ticket"]).get("status")
+    except (KeyError, json.JSONDecodeError, TypeError):
+        return None
+
+
+async def _run_case(runner: InMemoryRunner, agent: BaseAgent, case: dict, live: bool) -> CaseResult:
+    result = CaseResult(
+        query=case["query"],
+        expected_tools=[tool["tool_name"] for tool in case.get("expected_tool_use", [])],
+        expected_statuses=case.get("expected_statuses", []),
+    )
+    started_at = time.perf_counter()
+    try:
+        session = await runner.session_service.create_session(app_name=APP_NAME, user_id="eval")
+        message = types.Content(role="user", parts=[types.Part(text=case["query"])])
+        with ExitStack() as stack:
+            if not live:
+                stack.enter_context(use_script(script_for_case(case, agent.name)))
+            async for event in runner.run_async(user_id="eval", session_id=session.id, new_message=message):
+                status = _ticket_status(event.actions.state_delta)
+                if status and status != (result.statuses[-1] if result.statuses else None):
+                    result.statuses.append(status)
+                if event.author != agent.name or not event.content:
+                    continue
+                for part in event.content.parts or []:
+                    if part.function_call:
+                        result.actual_tools.append(part.function_call.name)
+                    elif part.text and not part.thought:
+                        result.final_response = part.text
+        session = await runner.session_service.get_session(app_name=APP_NAME, user_id="eval", session_id=session.id)
+        result.final_state = dict(session.state)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.latency_seconds = time.perf_counter() - started_at
+    return result
+
+
+async def run_eval(
+    cases: List[dict],
+    live: bool = False,
+    concurrency: int = 8,
+    agent: Optional[BaseAgent] = None,
+) -> EvalReport:
+    """Runs every case concurrently (at most `concurrency` at a time) and returns the report."""
+    if agent is None:
+        from ..agent import root_agent as agent
+
+    semaphore = asyncio.Semaphore(concurrency)
+    runner = InMemoryRunner(agent=agent, app_name=APP_NAME)
+
+    async def run_one(case: dict) -> CaseResult:
+        async with semaphore:
+            return await _run_case(runner, agent, case, live)
+
+    started_at = time.perf_counter()
+    with ExitStack() as stack:
+        if not live:
+            stack.enter_context(scripted_models(agent))
+            stack.enter_context(local_backends(agent))
+        results = await asyncio.gather(*(run_one(case) for case in cases))
+    return EvalReport(live=live, wall_seconds=time.perf_counter() - started_at, results=list(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Project Agora evaluation cases concurrently.")
+    parser.add_argument("--live", action="store_true", help="Use the real models and cloud backends.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum number of cases run at once.")
+    parser.add_argument("--cases", type=Path, nargs="*", help="Case files (default: eval/data/*.test.json).")
+    parser.add_argument("--report", type=Path, help="Write the full report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_eval(load_cases(args.cases), live=args.live, concurrency=args.concurrency))
+    print(report.summary())
+    if args.report:
+        args.report.write_text(report.to_json(), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Local stand-ins for the BigQuery, GCS and Vertex AI RAG backends.
+
+The tools defined here have the same names and signatures as the production
+tools, but search the files under `data/` and read and write a local
+directory instead of calling Google Cloud. `local_backends()` swaps them into
+an agent tree for the duration of an offline run.
+"""
+
+import csv
+import math
+import os
+import re
+import sys
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from google.adk.agents import BaseAgent
+
+from .. import speculation
+from ..agent_tree import walk_agents
+from ..tools._log_preprocessor import looks_like_log, preprocess_log
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+# Root of the local "buckets": gs://<bucket>/<path> maps to <root>/<bucket>/<path>
+DEFAULT_LOCAL_GCS_DIR = os.path.join(tempfile.gettempdir(), "project_agora", "gcs")
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+# Size of the knowledge-base chunks, in characters
+_CHUNK_CHARS = 1500
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class TfidfIndex:
+    """A small TF-IDF index with cosine similarity, enough to rank a few thousand documents."""
+
+    def __init__(self, documents: List[str]):
+        term_counts = [Counter(tokenize(document)) for document in documents]
+        document_frequency = Counter(term for counts in term_counts for term in counts)
+        self._idf = {
+            term: math.log((1 + len(documents)) / (1 + frequency)) + 1.0
+            for term, frequency in document_frequency.items()
+        }
+        self._vectors = [self._normalized(counts) for counts in term_counts]
+
+    def _normalized(self, counts: Counter) -> Dict[str, float]:
+        weights = {term: count * self._idf.get(term, 0.0) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Returns up to `k` `(document index, cosine similarity)` pairs, best first."""
+        query_vector = self._normalized(Counter(tokenize(query)))
+        scores = [
+            (index, sum(weight * vector.get(term, 0.0) for term, weight in query_vector.items()))
+            for index, vector in enumerate(self._vectors)
+        ]
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:k]
+
+
+class LocalTicketStore:
+    """The resolved-tickets table, loaded from `data/resolved_tickets.csv`."""
+
+    def __init__(self, csv_path: Path = DATA_DIR / "resolved_tickets.csv"):
+        csv.field_size_limit(sys.maxsize)
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            # The embedding column is not needed for lexical search
+            self.rows = [
+                {key: row[key] for key in ("ticket_id", "request", "category", "suggested_solution")}
+                for row in csv.DictReader(f)
+            ]
+        self.index = TfidfIndex([f"{row['request']} {row['category']}" for row in self.rows])
+
+    def search(self, query: str, k: int = 3) -> List[dict]:
+        return [
+            {**self.rows[index], "distance": round(1.0 - similarity, 4)}
+            for index, similarity in self.index.search(query, k)
+        ]
+
+
+class LocalKnowledgeBase:
+    """The RAG corpus, loaded from `data/knowledge_base/` and split into heading-sized chunks."""
+
+    def __init__(self, directory: Path = DATA_DIR / "knowledge_base"):
+        self.chunks: List[dict] = []
+        for path in sorted(directory.glob("*")):
+            if path.suffix not in (".md", ".txt"):
+                continue
+            text = path.read_text(encoding="utf-8", errors="replace")
+            for section in re.split(r"\n(?=#{1,3} )", text):
+                for start in range(0, len(section), _CHUNK_CHARS):
+                    chunk = section[start:start + _CHUNK_CHARS].strip()
+                    if chunk:
+                        self.chunks.append({"source": path.name, "text": chunk})
+        self.index = TfidfIndex([chunk["text"] for chunk in self.chunks])
+
+    def search(self, query: str, k: int = 5) -> List[dict]:
+        return [
+            {**self.chunks[index], "distance": round(1.0 - similarity, 4)}
+            for index, similarity in self.index.search(query, k)
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_ticket_store() -> LocalTicketStore:
+    return LocalTicketStore()
+
+
+@lru_cache(maxsize=1)
+def get_knowledge_base() -> LocalKnowledgeBase:
+    return LocalKnowledgeBase()
+
+
+def _local_path(file_uri: str) -> Path:
+    bucket_name, blob_name = file_uri[5:].split("/", 1)
+    return Path(os.getenv("AGORA_LOCAL_GCS_DIR", DEFAULT_LOCAL_GCS_DIR)) / bucket_name / blob_name
+
+
+# --- Drop-in tools (same names and signatures as the production tools) ---
+
+def search_resolved_tickets_db(query: str) -> str:
+    """Performs a semantic vector search on the BigQuery database of resolved tickets."""
+    return str(get_ticket_store().search(query))
+
+
+def search_knowledge_base(query: str) -> str:
+    """Searches the ADK knowledge base for a given developer query."""
+    results = get_knowledge_base().search(query)
+    return "\n\n".join(f"[{result['source']}]\n{result['text']}" for result in results)
+
+
+def read_user_file(file_uri: str) -> str:
+    """
+    Reads the content of a user-uploaded file from Google Cloud Storage.
+
+    Args:
+        file_uri: The GCS URI of the file (e.g., 'gs://bucket-name/path/to/file.log').
+
+    Returns:
+        The content of the file as a string, or an error message.
+    """
+    if not file_uri.startswith("gs://"):
+        return "Error: Invalid GCS URI provided. Must start with 'gs://'."
+    try:
+        text = _local_path(file_uri).read_text(encoding="utf-8", errors="replace")
+        return preprocess_log(text) if looks_like_log(file_uri, text) else text
+    except Exception as e:
+        return f"Error: Could not read file from GCS URI '{file_uri}'. Details: {e}"
+
+
+async def generate_diagram_from_mermaid(mermaid_code: str, file_name: str) -> str:
+    """
+    Renders Mermaid diagram syntax into a PNG image, uploads it to Google Cloud
+    Storage, and returns its public URL. This is an async function.
+
+    Args:
+        mermaid_code: The Mermaid syntax string to be rendered.
+        file_name: The desired base name for the output file (e.g., 'architecture_plan').
+
+    Returns:
+        The public URL of the generated diagram image in GCS, or an error string.
+    """
+    # Rendering needs Chromium; offline runs keep the Mermaid source instead
+    base_name, _ = os.path.splitext(file_name)
+    path = _local_path(f"gs://{os.getenv('GOOGLE_CLOUD_STORAGE_BUCKET', 'local-bucket')}/diagrams/{base_name}.mmd")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(mermaid_code.replace('\\n', '\n').replace('\\"', '"'), encoding="utf-8")
+    return path.as_uri()
+
+
+LOCAL_TOOLS = {
+    tool.__name__: tool
+    for tool in (search_resolved_tickets_db, search_knowledge_base, read_user_file, generate_diagram_from_mermaid)
+}
+
+
+def _tool_name(tool) -> str:
+    return getattr(tool, "name", None) or getattr(tool, "__name__", "")
+
+
+@contextmanager
+def local_backends(root: BaseAgent):
+    """Replaces the cloud-backed tools of every agent in the tree with their local versions."""
+    replaced = []
+    for agent in walk_agents(root):
+        tools = getattr(agent, "tools", None)
+        if not tools:
+            continue
+        for position, tool in enumerate(tools):
+            local_tool = LOCAL_TOOLS.get(_tool_name(tool))
+            if local_tool is not None:
+                replaced.append((tools, position, tool))
+                tools[position] = local_tool
+    # The embedding model is not available offline; speculation compares words instead
+    previous_method, speculation.method_override = speculation.method_override, "lexical"
+    try:
+        yield root
+    finally:
+        speculation.method_override = previous_method
+        for tools, position, tool in replaced:
+            tools[position] = tool
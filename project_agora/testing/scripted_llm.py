@@ -0,0 +1,188 @@
+"""A scripted stand-in for Gemini, used to run the agent tree offline."""
+
+import asyncio
+import contextvars
+import json
+from contextlib import contextmanager
+from typing import AsyncGenerator, Callable, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from ..agent_tree import walk_agents
+
+
+class ScriptedStep(BaseModel):
+    """
+    One model turn: a tool call (unset arguments are filled from the request
+    text) or, if `text` is set, a text reply that ends the agent's turn.
+    """
+
+    tool_name: Optional[str] = None
+    tool_input: Dict[str, object] = Field(default_factory=dict)
+    args_from: Dict[str, str] = Field(
+        default_factory=dict, description="Arguments filled with the latest result of the named tool in the conversation."
+    )
+    text: Optional[str] = None
+
+
+class CaseScript(BaseModel):
+    """
+    What every agent does during one scripted conversation.
+
+    `steps` lists the model turns per agent name, one step per model call, so
+    a multi-turn conversation continues where the previous user turn stopped.
+    Agents without an entry call each of their own tools once. After its last
+    step, an agent answers with its entry in `responses`, or with a short
+    summary of the last tool result.
+    """
+
+    steps: Dict[str, List[ScriptedStep]] = Field(default_factory=dict)
+    responses: Dict[str, str] = Field(default_factory=dict)
+    latency_seconds: float = Field(default=0.0, description="Simulated model latency per call.")
+    latency_sampler: Optional[Callable[[str], float]] = Field(
+        default=None, exclude=True, description="Returns a simulated latency for a call by the given agent."
+    )
+
+
+# The script of the conversation running in the current task
+_current_script: contextvars.ContextVar[Optional[CaseScript]] = contextvars.ContextVar("agora_case_script", default=None)
+
+
+@contextmanager
+def use_script(script: CaseScript):
+    """Makes `script` drive every scripted model call made in the current task."""
+    token = _current_script.set(script)
+    try:
+        yield script
+    finally:
+        _current_script.reset(token)
+
+
+def _first_user_text(llm_request: LlmRequest) -> str:
+    for content in llm_request.contents:
+        if content.role == "user":
+            for part in content.parts or []:
+                if part.text:
+                    return part.text
+    return ""
+
+
+def _declarations(llm_request: LlmRequest) -> Dict[str, types.FunctionDeclaration]:
+    tools = (llm_request.config.tools if llm_request.config else None) or []
+    return {
+        declaration.name: declaration
+        for tool in tools
+        for declaration in (getattr(tool, "function_declarations", None) or [])
+    }
+
+
+def _required_parameters(declaration: types.FunctionDeclaration) -> Dict[str, str]:
+    """Maps each required parameter to its JSON type, for either schema style ADK emits."""
+    if declaration.parameters_json_schema:
+        schema = declaration.parameters_json_schema
+        properties = schema.get("properties", {})
+        return {name: properties.get(name, {}).get("type", "string") for name in schema.get("required", [])}
+    if declaration.parameters:
+        properties = declaration.parameters.properties or {}
+        return {
+            name: (properties[name].type.value.lower() if name in properties and properties[name].type else "string")
+            for name in declaration.parameters.required or []
+        }
+    return {}
+
+
+def _latest_results(llm_request: LlmRequest) -> Dict[str, str]:
+    """The text of the most recent result of each tool called so far in the conversation."""
+    results = {}
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.function_response:
+                response = part.function_response.response or {}
+                result = response.get("result") if set(response) == {"result"} else response
+                results[part.function_response.name] = result if isinstance(result, str) else json.dumps(result)
+    return results
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ScriptedLlm(BaseLlm):
+    """Replays the current `CaseScript` for one agent; never touches the network."""
+
+    agent_name: str
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        script = _current_script.get()
+        if script is None:
+            raise RuntimeError("ScriptedLlm was called outside of use_script().")
+        latency = script.latency_sampler(self.agent_name) if script.latency_sampler else script.latency_seconds
+        if latency:
+            await asyncio.sleep(latency)
+
+        declarations = _declarations(llm_request)
+        steps = script.steps.get(self.agent_name)
+        if steps is None:
+            steps = [ScriptedStep(tool_name=name) for name in declarations]
+        # Every earlier model response in the history consumed one step
+        steps_taken = sum(1 for content in llm_request.contents if content.role == "model")
+        query = _first_user_text(llm_request)
+        prompt_tokens = _estimate_tokens(query) + sum(_estimate_tokens(str(content)) for content in llm_request.contents[1:])
+
+        step = steps[steps_taken] if steps_taken < len(steps) else None
+        if step is not None and step.text is not None:
+            part = types.Part(text=step.text)
+            completion_text = step.text
+        elif step is not None:
+            args = dict(step.tool_input)
+            if step.args_from:
+                results = _latest_results(llm_request)
+                args.update({name: results.get(tool_name, "") for name, tool_name in step.args_from.items()})
+            if step.tool_name in declarations:
+                for name, kind in _required_parameters(declarations[step.tool_name]).items():
+                    args.setdefault(name, query if kind == "string" else None)
+            part = types.Part(function_call=types.FunctionCall(name=step.tool_name, args=args))
+            completion_text = str(args)
+        else:
+            text = script.responses.get(self.agent_name) or self._summarize(llm_request, query)
+            part = types.Part(text=text)
+            completion_text = text
+
+        completion_tokens = _estimate_tokens(completion_text)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=completion_tokens,
+                total_token_count=prompt_tokens + completion_tokens,
+            ),
+        )
+
+    def _summarize(self, llm_request: LlmRequest, query: str) -> str:
+        last_parts = llm_request.contents[-1].parts if llm_request.contents else []
+        results = [str(part.function_response.response)[:500] for part in last_parts or [] if part.function_response]
+        if results:
+            return f"[{self.agent_name}] Results for '{query[:100]}': " + " | ".join(results)
+        return f"[{self.agent_name}] Scripted response for '{query[:100]}'."
+
+
+@contextmanager
+def scripted_models(root: BaseAgent):
+    """Swaps the model of every agent in the tree for a `ScriptedLlm`, restoring them on exit."""
+    originals = []
+    for agent in walk_agents(root):
+        if hasattr(agent, "model"):
+            originals.append((agent, agent.model))
+            agent.model = ScriptedLlm(model="scripted", agent_name=agent.name)
+    try:
+        yield root
+    finally:
+        for agent, model in originals:
+            agent.model = model
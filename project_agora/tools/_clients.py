@@ -0,0 +1,66 @@
+"""Lazily imported, shared Google Cloud clients for the tools.
+
+`google.cloud.bigquery`, `google.cloud.storage` and `vertexai` together take
+seconds to import. They are imported here on first use instead of when the
+package loads, so sessions that never touch a backend do not pay for it on
+cold start. Each client is created once per process and then reused.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Optional
+
+# lru_cache alone does not stop two threads from building the same client at once
+_lock = threading.Lock()
+
+
+def bigquery_module():
+    """Returns the `google.cloud.bigquery` module, importing it on first use."""
+    from google.cloud import bigquery
+
+    return bigquery
+
+
+@lru_cache(maxsize=None)
+def _bigquery_client(project: Optional[str]):
+    return bigquery_module().Client(project=project)
+
+
+def bigquery_client(project: Optional[str] = None):
+    """Returns the shared BigQuery client for `project`."""
+    with _lock:
+        return _bigquery_client(project)
+
+
+@lru_cache(maxsize=None)
+def _storage_client():
+    from google.cloud import storage
+
+    return storage.Client()
+
+
+def storage_client():
+    """Returns the shared Cloud Storage client (Application Default Credentials)."""
+    with _lock:
+        return _storage_client()
+
+
+@lru_cache(maxsize=None)
+def _embedding_model(model_name: str):
+    from vertexai.language_models import TextEmbeddingModel
+
+    return TextEmbeddingModel.from_pretrained(model_name)
+
+
+def embedding_model(model_name: str):
+    """Returns the shared Vertex AI text embedding model `model_name`."""
+    with _lock:
+        return _embedding_model(model_name)
+
+
+def reset_clients():
+    """Drops the cached clients, e.g. after credentials or the environment changed."""
+    with _lock:
+        _bigquery_client.cache_clear()
+        _storage_client.cache_clear()
+        _embedding_model.cache_clear()
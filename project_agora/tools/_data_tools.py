@@ -2,9 +2,8 @@
 
 import os
 
-from google.cloud import bigquery
-from vertexai.language_models import TextEmbeddingModel
-
+from ..logging_config import logger
+from ._clients import bigquery_client, bigquery_module, embedding_model
 from .exceptions import ConfigurationError, BigQueryError, EmbeddingError
 
 
@@ -13,17 +12,17 @@ def _get_embedding_for_query(
 ) -> list[float]:
     """Helper function to generate an embedding for the user's query."""
     try:
-        model = TextEmbeddingModel.from_pretrained(model_name)
+        model = embedding_model(model_name)
         embeddings = model.get_embeddings([text])
         return embeddings[0].values
     except Exception as e:
-        print(f"ERROR: Could not get embedding for query: {e}")
+        logger.error(f"Could not get embedding for query: {e}")
         raise EmbeddingError(f"Could not get embedding for query: {e}")
 
 
 def search_resolved_tickets_db(query: str) -> str:
     """Performs a semantic vector search on the BigQuery database of resolved tickets."""
-    print(f"INFO: Starting semantic search for query: '{query}'")
+    logger.info(f"Starting semantic search for query: '{query}'")
 
     bq_project_id = os.getenv("BQ_PROJECT_ID")
     bq_dataset_id = os.getenv("BQ_DATASET_ID")
@@ -36,7 +35,8 @@ def search_resolved_tickets_db(query: str) -> str:
     except EmbeddingError:
         raise
 
-    client = bigquery.Client(project=bq_project_id)
+    client = bigquery_client(bq_project_id)
+    bigquery = bigquery_module()
     table_id = f"{bq_project_id}.{bq_dataset_id}.resolved_tickets"
 
     sql_query = f"""
@@ -62,7 +62,7 @@ def search_resolved_tickets_db(query: str) -> str:
     )
 
     try:
-        print(f"INFO: Executing BigQuery vector search...")
+        logger.info("Executing BigQuery vector search...")
         query_job = client.query(sql_query, job_config=job_config)
         results = [dict(row) for row in query_job.result()]
 
@@ -72,5 +72,5 @@ def search_resolved_tickets_db(query: str) -> str:
         return str(results)
 
     except Exception as e:
-        print(f"ERROR: BigQuery vector search failed: {e}")
+        logger.error(f"BigQuery vector search failed: {e}")
         raise BigQueryError(f"Failed to execute database vector search. Details: {e}") 
\ No newline at end of file
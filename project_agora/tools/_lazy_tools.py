@@ -0,0 +1,41 @@
+"""Tools whose implementation is built on first use.
+
+Some tools pull in heavy client libraries as soon as they are constructed.
+`LazyTool` stands in for such a tool under the same name. It imports and
+builds the real tool the first time a model request or a call needs it, so
+importing the agents stays cheap.
+"""
+
+import threading
+from typing import Any, Callable, Optional
+
+from google.adk.tools import BaseTool, ToolContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+
+class LazyTool(BaseTool):
+    """Delegates to the tool returned by `factory`, which is called once, on first use."""
+
+    def __init__(self, *, name: str, description: str, factory: Callable[[], BaseTool]):
+        super().__init__(name=name, description=description)
+        self._factory = factory
+        self._tool: Optional[BaseTool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tool(self) -> BaseTool:
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    self._tool = self._factory()
+        return self._tool
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return self.tool._get_declaration()
+
+    async def process_llm_request(self, *, tool_context: ToolContext, llm_request: LlmRequest) -> None:
+        await self.tool.process_llm_request(tool_context=tool_context, llm_request=llm_request)
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        return await self.tool.run_async(args=args, tool_context=tool_context)
@@ -0,0 +1,197 @@
+"""Log pre-processing helpers for user-supplied files.
+
+Large log files are mostly noise for the LLM: the same line repeated thousands
+of times, deep stack traces and timestamps that differ on every line. These
+helpers shrink such text before it is handed to `ticket_analysis_agent`, while
+keeping a summary of the distinct error signatures that were seen. Only text
+that `looks_like_log()` is compacted; code, CSV and other data files are
+returned as they are.
+"""
+
+import re
+from collections import Counter
+from typing import List, Tuple
+
+# Collapse a stack trace when it has more frames than this
+MAX_STACK_FRAMES = 6
+# Number of frames kept at each end of a collapsed stack trace
+KEPT_STACK_FRAMES = 3
+# Number of distinct error signatures listed in the summary header
+MAX_ERROR_SIGNATURES = 10
+# Files with these extensions are always treated as logs
+LOG_EXTENSIONS = (".log", ".out", ".err", ".trace")
+# Other text is a log when at least this fraction of its first non-blank lines look like log records
+MIN_LOG_LINE_RATIO = 0.5
+LOG_SAMPLE_LINES = 200
+
+_TIMESTAMP_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"
+    r"|\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b"
+)
+_HEX_RE = re.compile(r"\b0x[0-9a-fA-F]+\b|\b[0-9a-fA-F]{8,}\b")
+_NUMBER_RE = re.compile(r"\d+")
+_QUOTED_RE = re.compile(r"'[^']*'|\"[^\"]*\"")
+
+# Python ("  File ...", followed by its source line) and JVM/Node ("at ...") frames
+_PY_FRAME_RE = re.compile(r'^\s+File ".*", line \d+')
+_AT_FRAME_RE = re.compile(r"^\s+at\s+\S")
+
+# A timestamp or a level near the start of a line marks a log record
+_LOG_RECORD_RE = re.compile(
+    _TIMESTAMP_RE.pattern + r"|\b(?:TRACE|DEBUG|INFO|NOTICE|WARN|WARNING|ERROR|FATAL|CRITICAL|SEVERE)\b"
+)
+_LOG_RECORD_PREFIX_CHARS = 40
+
+_ERROR_LINE_RE = re.compile(
+    r"(\b(?:ERROR|FATAL|CRITICAL|SEVERE|PANIC)\b|\b\w+(?:Error|Exception)\b:?|Traceback \(most recent call last\))"
+)
+
+
+def normalize_line(line: str) -> str:
+    """Strips volatile tokens (timestamps, ids, numbers) so similar lines compare equal."""
+    line = _TIMESTAMP_RE.sub("<ts>", line)
+    line = _HEX_RE.sub("<hex>", line)
+    line = _NUMBER_RE.sub("<n>", line)
+    return line.strip()
+
+
+def without_timestamps(line: str) -> str:
+    """The line with its timestamps masked, so lines that differ only in when they were logged compare equal."""
+    return _TIMESTAMP_RE.sub("<ts>", line).rstrip()
+
+
+def looks_like_log(name: str, text: str) -> bool:
+    """
+    Whether `text`, read from a file called `name`, is a log: it has a log
+    file extension, or most of its first lines start with a timestamp or a
+    log level (stack frames count as log lines).
+    """
+    if name.lower().endswith(LOG_EXTENSIONS):
+        return True
+    sample = []
+    for line in text.splitlines():
+        if line.strip():
+            sample.append(line)
+            if len(sample) == LOG_SAMPLE_LINES:
+                break
+    if not sample:
+        return False
+    records = sum(
+        1 for line in sample
+        if _LOG_RECORD_RE.search(line[:_LOG_RECORD_PREFIX_CHARS]) or _is_stack_frame(line) or line.startswith("Traceback")
+    )
+    return records / len(sample) >= MIN_LOG_LINE_RATIO
+
+
+def error_signature(line: str) -> str:
+    """Reduces an error line to a stable signature for grouping."""
+    signature = _QUOTED_RE.sub("'…'", normalize_line(line))
+    return signature[:200]
+
+
+def _is_stack_frame(line: str) -> bool:
+    return bool(_PY_FRAME_RE.match(line) or _AT_FRAME_RE.match(line))
+
+
+def collapse_stack_frames(lines: List[str]) -> Tuple[List[str], int]:
+    """
+    Shortens long runs of stack frames, keeping the outermost and innermost ones.
+
+    Returns the new lines and the number of frames that were omitted.
+    """
+    output: List[str] = []
+    omitted_total = 0
+    i = 0
+    while i < len(lines):
+        if not _is_stack_frame(lines[i]):
+            output.append(lines[i])
+            i += 1
+            continue
+
+        # Group each frame with its indented continuation lines (e.g. Python source lines)
+        frames: List[List[str]] = []
+        while i < len(lines) and _is_stack_frame(lines[i]):
+            frame = [lines[i]]
+            i += 1
+            while (
+                i < len(lines)
+                and lines[i].startswith((" ", "\t"))
+                and not _is_stack_frame(lines[i])
+                and _PY_FRAME_RE.match(frame[0])
+            ):
+                frame.append(lines[i])
+                i += 1
+            frames.append(frame)
+
+        if len(frames) > MAX_STACK_FRAMES:
+            omitted = len(frames) - 2 * KEPT_STACK_FRAMES
+            omitted_total += omitted
+            kept = frames[:KEPT_STACK_FRAMES] + [[f"    ... [{omitted} stack frames omitted] ..."]] + frames[-KEPT_STACK_FRAMES:]
+        else:
+            kept = frames
+        for frame in kept:
+            output.extend(frame)
+    return output, omitted_total
+
+
+def collapse_repeated_lines(lines: List[str]) -> Tuple[List[str], int]:
+    """
+    Merges consecutive lines that are identical, or differ only in their timestamps.
+
+    Returns the new lines and the number of lines that were removed.
+    """
+    output: List[str] = []
+    removed = 0
+    previous_key = None
+    repeat_count = 0
+    for line in lines:
+        key = without_timestamps(line)
+        if key.strip() and key == previous_key:
+            repeat_count += 1
+            continue
+        if repeat_count:
+            output.append(f"    ... [previous line repeated {repeat_count} more times] ...")
+            removed += repeat_count
+        output.append(line)
+        previous_key = key
+        repeat_count = 0
+    if repeat_count:
+        output.append(f"    ... [previous line repeated {repeat_count} more times] ...")
+        removed += repeat_count
+    return output, removed
+
+
+def extract_error_signatures(lines: List[str]) -> List[Tuple[str, int]]:
+    """Returns the most common error signatures and how often each occurred."""
+    signatures = Counter(
+        error_signature(line) for line in lines if _ERROR_LINE_RE.search(line)
+    )
+    return signatures.most_common(MAX_ERROR_SIGNATURES)
+
+
+def preprocess_log(text: str) -> str:
+    """
+    Compacts log-like text for the LLM.
+
+    Repeated lines and deep stack traces are collapsed, and when anything was
+    found a short header listing the distinct error signatures is prepended.
+    Text that has nothing to collapse and no errors is returned unchanged.
+    """
+    lines = text.splitlines()
+    signatures = extract_error_signatures(lines)
+    compacted, omitted_frames = collapse_stack_frames(lines)
+    compacted, removed_lines = collapse_repeated_lines(compacted)
+
+    if not signatures and not omitted_frames and not removed_lines:
+        return text
+
+    header = [
+        f"[Log summary: {len(lines)} lines reduced to {len(compacted)}; "
+        f"{removed_lines} repeated lines and {omitted_frames} stack frames collapsed; "
+        f"{len(signatures)} distinct error signatures]"
+    ]
+    if signatures:
+        header.append("Error signatures (occurrences x signature):")
+        header.extend(f"  - {count}x {signature}" for signature, count in signatures)
+    header.append("--- Processed log ---")
+    return "\n".join(header + compacted)
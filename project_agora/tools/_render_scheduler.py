@@ -0,0 +1,271 @@
+"""Bounded render scheduler for Mermaid diagram generation.
+
+All diagram renders share one headless Chromium instance and are executed by a
+fixed number of worker tasks that pull from a bounded queue. When the queue is
+full, new requests are rejected immediately instead of piling up, and every
+request carries a deadline after which it is abandoned.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from ..logging_config import logger
+from ..metrics import registry
+from .exceptions import DiagramGenerationError, RenderQueueFullError, RenderTimeoutError
+
+DEFAULT_RENDER_WORKERS = 2
+DEFAULT_RENDER_QUEUE_SIZE = 8
+DEFAULT_RENDER_TIMEOUT_SECONDS = 30.0
+
+render_queue_depth = registry.gauge(
+    "agora_render_queue_depth", "Diagram render requests waiting for a worker."
+)
+render_wait_seconds = registry.histogram(
+    "agora_render_wait_seconds", "Time a render request spent queued before a worker picked it up."
+)
+render_duration_seconds = registry.histogram(
+    "agora_render_duration_seconds", "Time spent rendering a diagram in Chromium."
+)
+render_rejected_total = registry.counter(
+    "agora_render_rejected_total", "Render requests rejected because the queue was full."
+)
+render_timeouts_total = registry.counter(
+    "agora_render_timeouts_total", "Render requests that missed their deadline."
+)
+
+
+@dataclass
+class _RenderJob:
+    html: str
+    deadline: float
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class PlaywrightRenderer:
+    """Renders HTML to PNG using a single, lazily launched Chromium browser."""
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+
+    async def _get_browser(self):
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                # Imported lazily so the package does not pay for Playwright at import time
+                from playwright.async_api import async_playwright
+
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch()
+            return self._browser
+
+    async def warm_up(self):
+        """Launches the browser ahead of the first render."""
+        await self._get_browser()
+
+    async def render(self, html: str) -> str:
+        """Renders the `.mermaid` element of `html` and returns the PNG file path."""
+        browser = await self._get_browser()
+        page = await browser.new_page()
+        try:
+            await page.set_content(html)
+            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_file:
+                tmp_file_path = tmp_file.name
+            await page.locator(".mermaid").screenshot(path=tmp_file_path)
+            return tmp_file_path
+        finally:
+            await page.close()
+
+    async def close(self):
+        async with self._lock:
+            if self._browser is not None:
+                await self._browser.close()
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+class RenderScheduler:
+    """
+    A bounded async queue served by a fixed pool of render workers.
+
+    Args:
+        workers: Number of concurrent renders (Chromium pages) allowed.
+        queue_size: Maximum number of requests waiting for a worker.
+        timeout: Default per-request deadline in seconds, measured from submission.
+        renderer: Object exposing `async render(html) -> path` and `async close()`.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_RENDER_WORKERS,
+        queue_size: int = DEFAULT_RENDER_QUEUE_SIZE,
+        timeout: float = DEFAULT_RENDER_TIMEOUT_SECONDS,
+        renderer=None,
+    ):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.timeout = timeout
+        self.renderer = renderer or PlaywrightRenderer()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._running_workers = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """Starts the worker tasks on the running event loop (idempotent)."""
+        if self._worker_tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._running_workers = self.workers
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"render-worker-{i}") for i in range(self.workers)
+        ]
+
+    async def warm_up(self):
+        """Starts the workers and, if the renderer supports it, launches its browser."""
+        self.start()
+        if hasattr(self.renderer, "warm_up"):
+            await self.renderer.warm_up()
+
+    async def shutdown(self):
+        """Stops the workers, fails any queued requests and closes the browser."""
+        # The last worker closes the browser as it stops
+        closed_by_workers = bool(self._worker_tasks)
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                job = self._queue.get_nowait()
+                if not job.future.done():
+                    job.future.set_exception(DiagramGenerationError("Render scheduler shut down."))
+            render_queue_depth.set(0)
+        if not closed_by_workers:
+            await self.renderer.close()
+
+    async def render(self, html: str, timeout: Optional[float] = None) -> str:
+        """
+        Queues `html` for rendering and waits for the resulting PNG path.
+
+        Raises:
+            RenderQueueFullError: If the queue is full (the system is busy).
+            RenderTimeoutError: If the render does not complete before the deadline.
+            DiagramGenerationError: If the browser fails to render the diagram.
+        """
+        self.start()
+        timeout = self.timeout if timeout is None else timeout
+        job = _RenderJob(
+            html=html,
+            deadline=time.monotonic() + timeout,
+            future=self._loop.create_future(),
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            render_rejected_total.inc()
+            raise RenderQueueFullError(
+                f"Diagram renderer is busy ({self.queue_size} requests queued). Please retry shortly."
+            )
+        render_queue_depth.set(self._queue.qsize())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), timeout=timeout)
+        except asyncio.TimeoutError:
+            render_timeouts_total.inc()
+            job.future.cancel()
+            raise RenderTimeoutError(f"Diagram rendering did not finish within {timeout:g} seconds.")
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+
+    async def _worker(self):
+        try:
+            await self._serve()
+        finally:
+            # The last worker to stop closes the browser. asyncio.run() cancels (and awaits) leftover
+            # tasks before closing its loop, so the browser is not leaked when nobody calls shutdown()
+            self._running_workers -= 1
+            if self._running_workers == 0:
+                try:
+                    await self.renderer.close()
+                except Exception as e:
+                    logger.warning(f"Could not close the diagram renderer: {e}")
+
+    async def _serve(self):
+        while True:
+            job = await self._queue.get()
+            render_queue_depth.set(self._queue.qsize())
+            try:
+                started_at = time.monotonic()
+                render_wait_seconds.observe(started_at - job.enqueued_at)
+                remaining = job.deadline - started_at
+                # The caller has already given up on this request, so skip the render
+                if job.future.done() or remaining <= 0:
+                    continue
+                try:
+                    path = await asyncio.wait_for(self.renderer.render(job.html), timeout=remaining)
+                except asyncio.TimeoutError:
+                    if not job.future.done():
+                        job.future.set_exception(RenderTimeoutError("Diagram rendering exceeded its deadline."))
+                    continue
+                except Exception as e:
+                    if not job.future.done():
+                        job.future.set_exception(DiagramGenerationError(f"Error during Playwright rendering: {e}"))
+                    continue
+                finally:
+                    render_duration_seconds.observe(time.monotonic() - started_at)
+
+                if job.future.done():
+                    # The caller timed out while we were rendering; don't leak the file
+                    os.remove(path)
+                else:
+                    job.future.set_result(path)
+            finally:
+                self._queue.task_done()
+
+
+_scheduler: Optional[RenderScheduler] = None
+
+
+def get_render_scheduler() -> RenderScheduler:
+    """
+    Returns the process-wide render scheduler, configured from the environment.
+
+    A new scheduler is created if the previous one was bound to a different
+    (e.g. closed) event loop. The previous one is shut down on its own loop if
+    that loop is still running; on a loop that was closed by asyncio.run(),
+    its workers already closed the browser.
+    """
+    global _scheduler
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or (_scheduler.loop is not None and _scheduler.loop is not loop):
+        previous = _scheduler
+        _scheduler = RenderScheduler(
+            workers=int(os.getenv("RENDER_WORKERS", DEFAULT_RENDER_WORKERS)),
+            queue_size=int(os.getenv("RENDER_QUEUE_SIZE", DEFAULT_RENDER_QUEUE_SIZE)),
+            timeout=float(os.getenv("RENDER_TIMEOUT_SECONDS", DEFAULT_RENDER_TIMEOUT_SECONDS)),
+        )
+        if previous is not None and previous.loop.is_running():
+            # Playwright objects belong to the loop they were created on
+            asyncio.run_coroutine_threadsafe(previous.shutdown(), previous.loop)
+        elif previous is not None and not previous.loop.is_closed():
+            logger.warning("The previous render scheduler's event loop is idle; its browser closes when that loop is shut down.")
+    return _scheduler
@@ -2,12 +2,11 @@
 
 import json
 import os
-import tempfile
 
-from google.cloud import storage
-from playwright.async_api import async_playwright
-
-from .exceptions import ConfigurationError, GCSInteractionError, DiagramGenerationError
+from ..logging_config import logger
+from ._clients import storage_client
+from ._render_scheduler import get_render_scheduler
+from .exceptions import ConfigurationError, GCSInteractionError
 
 
 async def generate_diagram_from_mermaid(mermaid_code: str, file_name: str) -> str:
@@ -21,6 +20,10 @@ async def generate_diagram_from_mermaid(mermaid_code: str, file_name: str) -> st
 
     Returns:
         The public URL of the generated diagram image in GCS, or an error string.
+
+    Raises:
+        RenderQueueFullError: If too many diagrams are already waiting to be rendered.
+        RenderTimeoutError: If rendering does not finish within RENDER_TIMEOUT_SECONDS.
     """
     bucket_name = os.getenv("GOOGLE_CLOUD_STORAGE_BUCKET")
     if not bucket_name:
@@ -42,24 +45,12 @@ async def generate_diagram_from_mermaid(mermaid_code: str, file_name: str) -> st
     </html>
     """
 
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
-            await page.set_content(html_template)
-
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_file:
-                diagram_element = page.locator(".mermaid")
-                await diagram_element.screenshot(path=tmp_file.name)
-                tmp_file_path = tmp_file.name
-
-            await browser.close()
-    except Exception as e:
-        raise DiagramGenerationError(f"Error during Playwright rendering: {e}")
+    # Renders are funnelled through a bounded, shared scheduler so that concurrent
+    # sessions cannot each launch their own Chromium instance.
+    tmp_file_path = await get_render_scheduler().render(html_template)
 
     try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(bucket_name)
+        bucket = storage_client().bucket(bucket_name)
 
         # Get the base name of the file, stripping any extension
         base_name, _ = os.path.splitext(file_name)
@@ -70,7 +61,7 @@ async def generate_diagram_from_mermaid(mermaid_code: str, file_name: str) -> st
         blob.upload_from_filename(tmp_file_path)
         os.remove(tmp_file_path)
 
-        print(f"INFO: Diagram uploaded to gs://{bucket_name}/{destination_blob_name}")
+        logger.info(f"Diagram uploaded to gs://{bucket_name}/{destination_blob_name}")
         # Make the blob public to get a URL.
         # Note: In production, you would use signed URLs for security.
         blob.make_public()
@@ -6,6 +6,7 @@ import uuid
 from google.adk.tools import ToolContext
 
 from ..entities.ticket import SupportTicket, TicketAnalysis
+from ..logging_config import logger
 from .exceptions import StateError
 
 
@@ -20,7 +21,7 @@ def create_ticket(request: str, tool_context: ToolContext) -> str:
         )
         ticket_json = ticket.to_json()
         tool_context.state["ticket"] = ticket_json
-        print("INFO: New developer request created via tool and state initialized.")
+        logger.info("New developer request created via tool and state initialized.")
         return ticket_json
     except Exception as e:
         raise StateError(f"Failed to create ticket: {e}")
@@ -55,7 +56,7 @@ def update_ticket_after_analysis(analysis_json: str, tool_context: ToolContext)
                 "sentiment": "Neutral",
                 "summary": "Analysis parsing failed - using defaults"
             }
-            print(f"WARNING: Could not parse analysis JSON: {cleaned_json[:200]}")
+            logger.warning(f"Could not parse analysis JSON: {cleaned_json[:200]}")
 
         # Update ticket
         ticket_dict["analysis"] = TicketAnalysis(**analysis_data).model_dump()
@@ -66,12 +67,12 @@ def update_ticket_after_analysis(analysis_json: str, tool_context: ToolContext)
         updated_ticket_json = json.dumps(ticket_dict, indent=2)
         tool_context.state["ticket"] = updated_ticket_json
 
-        print(f"INFO: Ticket status updated to 'Analyzing'. Category: {analysis_data.get('category')}")
+        logger.info(f"Ticket status updated to 'Analyzing'. Category: {analysis_data.get('category')}")
         return f"Ticket updated successfully. Status: Analyzing. Category: {analysis_data.get('category')}"
 
     except Exception as e:
         error_msg = f"Error processing analysis: {e}"
-        print(f"ERROR: {error_msg}")
+        logger.error(f"{error_msg}")
         raise StateError(error_msg)
 
 
@@ -94,10 +95,10 @@ def update_ticket_after_retrieval(
         updated_ticket_json = json.dumps(ticket_dict, indent=2)
         tool_context.state["ticket"] = updated_ticket_json
 
-        print("INFO: Ticket status updated to 'AwaitingContextConfirmation'.")
+        logger.info("Ticket status updated to 'AwaitingContextConfirmation'.")
         return "Ticket updated successfully. Status: AwaitingContextConfirmation. Ready for user confirmation."
 
     except Exception as e:
         error_msg = f"Error updating ticket after retrieval: {e}"
-        print(f"ERROR: {error_msg}")
+        logger.error(f"{error_msg}")
         raise StateError(error_msg) 
\ No newline at end of file
@@ -33,4 +33,14 @@ class EmbeddingError(ToolError):
 
 class DiagramGenerationError(ToolError):
     """Raised for errors during diagram generation."""
-    pass 
\ No newline at end of file
+    pass
+
+
+class RenderQueueFullError(DiagramGenerationError):
+    """Raised when the diagram render queue is full and the request is rejected."""
+    pass
+
+
+class RenderTimeoutError(DiagramGenerationError):
+    """Raised when a diagram render does not finish before its deadline."""
+    pass
@@ -1,10 +1,120 @@
 # FILE: project_agora/tools/file_reader_tool.py
-from google.cloud import storage
+import codecs
+import os
+import tempfile
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from ..disk_cache import DiskLRUCache
+from ..logging_config import logger
+from ..metrics import registry
+from ._clients import storage_client
+from ._log_preprocessor import looks_like_log, preprocess_log
+
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+# Files up to HEAD + TAIL bytes are read completely; larger files are read as a
+# head window and a tail window so memory and LLM context stay bounded.
+DEFAULT_HEAD_BYTES = 256 * 1024
+DEFAULT_TAIL_BYTES = 256 * 1024
+# Size of each ranged GCS request
+DEFAULT_CHUNK_BYTES = 64 * 1024
+# Local cache of file windows, keyed by URI plus the object's generation and etag
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "project_agora", "user_files")
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+user_file_cache_total = registry.counter(
+    "agora_user_file_cache_total", "User file reads served from the local cache (hit) or GCS (miss)."
+)
+
+_cache: Optional[DiskLRUCache] = None
+
+
+def _get_cache() -> Optional[DiskLRUCache]:
+    """Returns the shared user-file cache, or None if caching is disabled."""
+    global _cache
+    if os.getenv("USER_FILE_CACHE", "1") == "0":
+        return None
+    if _cache is None:
+        _cache = DiskLRUCache(
+            os.getenv("USER_FILE_CACHE_DIR", DEFAULT_CACHE_DIR),
+            int(os.getenv("USER_FILE_CACHE_MAX_BYTES", DEFAULT_CACHE_MAX_BYTES)),
+        )
+    return _cache
+
+
+def _iter_blob_range(blob: "storage.Blob", start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+    """Yields the bytes in [start, end) of a blob using ranged requests of `chunk_size` bytes."""
+    for offset in range(start, end, chunk_size):
+        # GCS range ends are inclusive. Pinning the generation guarantees the head
+        # and tail windows come from the same version of the object.
+        yield blob.download_as_bytes(
+            start=offset,
+            end=min(offset + chunk_size, end) - 1,
+            if_generation_match=blob.generation,
+            checksum=None,
+        )
+
+
+def _decode_chunks(chunks: Iterator[bytes]) -> str:
+    """Decodes a stream of byte chunks as UTF-8 without splitting multi-byte characters."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts = [decoder.decode(chunk) for chunk in chunks]
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def _read_blob_windows(blob: "storage.Blob", head_bytes: int, tail_bytes: int, chunk_size: int) -> str:
+    """Reads a whole blob if it is small, otherwise only its head and tail windows."""
+    size = blob.size or 0
+    if size <= head_bytes + tail_bytes:
+        return _decode_chunks(_iter_blob_range(blob, 0, size, chunk_size))
+
+    head = _decode_chunks(_iter_blob_range(blob, 0, head_bytes, chunk_size))
+    tail = _decode_chunks(_iter_blob_range(blob, size - tail_bytes, size, chunk_size))
+    # Drop the partial lines cut by the window boundaries
+    head = head.rsplit("\n", 1)[0]
+    tail = tail.split("\n", 1)[-1]
+    omitted = size - head_bytes - tail_bytes
+    return f"{head}\n\n... [{omitted} bytes omitted from the middle of this {size}-byte file] ...\n\n{tail}"
+
+
+def _read_blob_windows_cached(blob: "storage.Blob", file_uri: str, head_bytes: int, tail_bytes: int, chunk_size: int) -> str:
+    """
+    Returns the head/tail windows of a blob, reusing a local copy when the object is unchanged.
+
+    The cache key includes the object's generation and etag (already known from
+    the metadata call), so any re-upload of the file produces a cache miss.
+    """
+    cache = _get_cache()
+    if cache is None:
+        return _read_blob_windows(blob, head_bytes, tail_bytes, chunk_size)
+
+    cache_key = f"{file_uri}#generation={blob.generation}#etag={blob.etag}#head={head_bytes}#tail={tail_bytes}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        user_file_cache_total.inc(result="hit")
+        return cached.decode("utf-8")
+
+    user_file_cache_total.inc(result="miss")
+    content = _read_blob_windows(blob, head_bytes, tail_bytes, chunk_size)
+    cache.put(cache_key, content.encode("utf-8"))
+    return content
+
 
 def read_user_file(file_uri: str) -> str:
     """
     Reads the content of a user-uploaded file from Google Cloud Storage.
 
+    Large files are not downloaded in full: only a head and a tail window are
+    streamed with ranged reads (sizes set by USER_FILE_HEAD_BYTES and
+    USER_FILE_TAIL_BYTES). Logs (by file extension, or lines that mostly start
+    with a timestamp or log level) are then compacted by collapsing repeated
+    lines and long stack traces, and a summary of the distinct error
+    signatures is prepended; other files are returned as they are. Windows
+    are cached on local disk keyed by the object's generation, so re-reading
+    an unchanged file costs a single metadata request.
+
     Args:
         file_uri: The GCS URI of the file (e.g., 'gs://bucket-name/path/to/file.log').
 
@@ -14,18 +124,28 @@ def read_user_file(file_uri: str) -> str:
     if not file_uri.startswith("gs://"):
         return "Error: Invalid GCS URI provided. Must start with 'gs://'."
 
+    head_bytes = int(os.getenv("USER_FILE_HEAD_BYTES", DEFAULT_HEAD_BYTES))
+    tail_bytes = int(os.getenv("USER_FILE_TAIL_BYTES", DEFAULT_TAIL_BYTES))
+    chunk_size = int(os.getenv("USER_FILE_CHUNK_BYTES", DEFAULT_CHUNK_BYTES))
+    preprocess = os.getenv("USER_FILE_PREPROCESS", "1") != "0"
+
     try:
         # Assumes the client is authenticated via Application Default Credentials
-        client = storage.Client()
+        client = storage_client()
         # The URI is in the format gs://<bucket>/<object_path>
         bucket_name, blob_name = file_uri[5:].split("/", 1)
         bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
-        
-        file_content = blob.download_as_text()
-        print(f"INFO: Successfully read content from {file_uri}")
+        # get_blob() fetches the object's metadata (size, generation) in one cheap call
+        blob = bucket.get_blob(blob_name)
+        if blob is None:
+            raise FileNotFoundError(f"Object '{blob_name}' does not exist in bucket '{bucket_name}'.")
+
+        file_content = _read_blob_windows_cached(blob, file_uri, head_bytes, tail_bytes, chunk_size)
+        if preprocess and looks_like_log(blob_name, file_content):
+            file_content = preprocess_log(file_content)
+        logger.info(f"Successfully read content from {file_uri} ({blob.size} bytes, {len(file_content)} chars returned)")
         return file_content
     except Exception as e:
         error_msg = f"Error: Could not read file from GCS URI '{file_uri}'. Details: {e}"
-        print(f"ERROR: {error_msg}")
-        return error_msg
\ No newline at end of file
+        logger.error(f"{error_msg}")
+        return error_msg
@@ -1,22 +1,169 @@
 # FILE: scripts/create_mock_db.py
 
 import csv
+import hashlib
+import json
 import os
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from dotenv import load_dotenv
+from google.api_core import exceptions as api_exceptions
 from vertexai.language_models import TextEmbeddingModel
 
+# Loaded before the settings below so they can also be set in .env
+load_dotenv()
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-004")
+# text-embedding-004 accepts at most 250 texts and 20,000 tokens per request
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "250"))
+EMBEDDING_BATCH_MAX_TOKENS = 20000
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+EMBEDDING_REQUESTS_PER_MINUTE = float(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "60"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "6"))
+CHECKPOINT_PATH = os.path.join("data", ".embedding_checkpoint.jsonl")
+
+# Errors worth retrying: quota, overload and timeouts. Anything else fails immediately.
+RETRYABLE_ERRORS = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.DeadlineExceeded,
+)
+
+
+class EmbeddingGenerationError(RuntimeError):
+    """Raised when a ticket ends up without a valid embedding."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: allows `rate_per_minute` acquisitions per minute with bursts up to `capacity`."""
+
+    def __init__(self, rate_per_minute: float, capacity: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def _text_key(text: str) -> str:
+    """Checkpoint key: an embedding is reused only for the same model and the same text."""
+    return hashlib.sha256(f"{EMBEDDING_MODEL}\n{text}".encode("utf-8")).hexdigest()
+
+
+def load_checkpoint(path: str = CHECKPOINT_PATH) -> dict[str, list[float]]:
+    """Loads the embeddings saved by earlier (possibly interrupted) runs."""
+    embeddings = {}
+    if not os.path.exists(path):
+        return embeddings
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves a truncated last line
+                continue
+            embeddings[record["key"]] = record["embedding"]
+    return embeddings
+
+
+def make_batches(texts: list[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> list[list[str]]:
+    """Groups texts into requests within the API's per-request text and (estimated) token limits."""
+    batches, current, current_tokens = [], [], 0
+    for text in texts:
+        tokens = len(text) // 4 + 1
+        if current and (len(current) >= batch_size or current_tokens + tokens > EMBEDDING_BATCH_MAX_TOKENS):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def embed_batch(model: TextEmbeddingModel, texts: list[str], rate_limiter: TokenBucket) -> list[list[float]]:
+    """Embeds one batch, retrying transient errors with exponential backoff and jitter."""
+    for attempt in range(EMBEDDING_MAX_RETRIES + 1):
+        rate_limiter.acquire()
+        try:
+            return [embedding.values for embedding in model.get_embeddings(texts)]
+        except RETRYABLE_ERRORS as e:
+            if attempt == EMBEDDING_MAX_RETRIES:
+                raise
+            delay = min(60.0, 2**attempt) * random.uniform(0.5, 1.5)
+            print(f"  WARN: Embedding batch of {len(texts)} failed ({e}); retrying in {delay:.1f}s...")
+            time.sleep(delay)
 
-def get_embedding(text: str, model_name: str = "text-embedding-004") -> list[float]:
-    """Generates an embedding for a given text."""
-    model = TextEmbeddingModel.from_pretrained(model_name)
-    try:
-        embeddings = model.get_embeddings([text])
-        return embeddings[0].values
-    except Exception as e:
-        print(f"  ERROR: Could not get embedding for '{text[:30]}...': {e}")
-        # Return a zero vector on failure so the process doesn't stop
-        return [0.0] * 768  # The dimension of text-embedding-004 is 768
+
+def generate_embeddings(texts: list[str], checkpoint_path: str = CHECKPOINT_PATH) -> list[list[float]]:
+    """
+    Embeds every text, in batches sent concurrently under a rate limit.
+
+    Finished batches are appended to a checkpoint file, so an interrupted run
+    resumes where it stopped. Raises EmbeddingGenerationError if any text is
+    left without a valid vector.
+    """
+    done = load_checkpoint(checkpoint_path)
+    pending = list(dict.fromkeys(text for text in texts if _text_key(text) not in done))
+    print(f"INFO: {len(texts) - len(pending)} of {len(texts)} embeddings restored from the checkpoint.")
+
+    if pending:
+        model = TextEmbeddingModel.from_pretrained(EMBEDDING_MODEL)
+        rate_limiter = TokenBucket(EMBEDDING_REQUESTS_PER_MINUTE, capacity=EMBEDDING_MAX_CONCURRENCY)
+        write_lock = threading.Lock()
+        batches = make_batches(pending)
+        print(f"INFO: Embedding {len(pending)} texts in {len(batches)} batches ({EMBEDDING_MAX_CONCURRENCY} at a time)...")
+
+        with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, ThreadPoolExecutor(EMBEDDING_MAX_CONCURRENCY) as pool:
+            futures = {pool.submit(embed_batch, model, batch, rate_limiter): batch for batch in batches}
+            for completed, future in enumerate(as_completed(futures), start=1):
+                batch = futures[future]
+                vectors = future.result()
+                if len(vectors) != len(batch):
+                    raise EmbeddingGenerationError(f"Requested {len(batch)} embeddings but received {len(vectors)}.")
+                with write_lock:
+                    for text, vector in zip(batch, vectors):
+                        if not vector or not any(vector):
+                            # Left out of the checkpoint so the next run retries it
+                            continue
+                        done[_text_key(text)] = vector
+                        checkpoint.write(json.dumps({"key": _text_key(text), "embedding": vector}) + "\n")
+                    checkpoint.flush()
+                print(f"  Batch {completed}/{len(batches)} done ({len(batch)} embeddings).")
+
+    embeddings = [done.get(_text_key(text)) for text in texts]
+    validate_embeddings(texts, embeddings)
+    return embeddings
+
+
+def validate_embeddings(texts: list[str], embeddings: list):
+    """Rejects missing, empty, all-zero or inconsistently sized vectors instead of writing them."""
+    dimensions = {len(vector) for vector in embeddings if vector}
+    if len(dimensions) > 1:
+        raise EmbeddingGenerationError(f"Embeddings have inconsistent dimensions: {sorted(dimensions)}.")
+    invalid = [text for text, vector in zip(texts, embeddings) if not vector or not any(vector)]
+    if invalid:
+        raise EmbeddingGenerationError(
+            f"{len(invalid)} texts have no valid embedding, e.g. '{invalid[0][:50]}...'. "
+            "Re-run the script to retry them; finished embeddings are kept in the checkpoint."
+        )
 
 
 def generate_mock_data_with_embeddings():
@@ -445,29 +592,20 @@ def generate_mock_data_with_embeddings():
     # This list will hold all rows for the final CSV
     output_data = [header]
 
-    # Process each ticket
-    for i, row in enumerate(ticket_data):
-        request_text = row[2]
-        print(
-            f"  Generating embedding for ticket {row[0]} ({i+1}/{len(ticket_data)})..."
-        )
-        embedding = get_embedding(request_text)
-
-        # Append the embedding to the row
-        new_row = row + [embedding]
-        output_data.append(new_row)
-
-        # Adding a small delay to avoid hitting API rate limits
-        time.sleep(1)
-
     output_dir = "data"
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    embeddings = generate_embeddings([row[2] for row in ticket_data])
+    for row, embedding in zip(ticket_data, embeddings):
+        output_data.append(row + [embedding])
+
+    # Write to a temporary file first so an existing CSV is never left half-written
     filepath = os.path.join(output_dir, "resolved_tickets.csv")
-    with open(filepath, "w", newline="") as f:
+    with open(filepath + ".tmp", "w", newline="") as f:
         writer = csv.writer(f)
         writer.writerows(output_data)
+    os.replace(filepath + ".tmp", filepath)
 
     print(
         f"✅ Mock database with embeddings created at '{filepath}' with {len(output_data)-1} tickets."
@@ -475,13 +613,17 @@ def generate_mock_data_with_embeddings():
 
 
 if __name__ == "__main__":
+    import sys
+
     import vertexai
-    from dotenv import load_dotenv
 
-    load_dotenv()
     # Initialize Vertex AI
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
     location = os.getenv("GOOGLE_CLOUD_LOCATION")
     vertexai.init(project=project_id, location=location)
 
-    generate_mock_data_with_embeddings()
+    try:
+        generate_mock_data_with_embeddings()
+    except EmbeddingGenerationError as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
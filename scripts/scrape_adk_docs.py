@@ -1,19 +1,39 @@
 # FILE: scripts/scrape_adk_docs.py
 
+import argparse
+import asyncio
+import hashlib
+import json
 import os
 import re
+import time
+from collections import deque
+from dataclasses import dataclass
 from urllib.parse import urljoin, urlparse
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
 from markdownify import markdownify as md
 
 # The starting point for our scrape
 BASE_URL = "https://google.github.io/adk-docs/"
 OUTPUT_DIR = "data/knowledge_base/"
+# Per-URL validators (ETag/Last-Modified), content hashes and links from the last run.
+# The leading dot keeps it out of the RAG upload.
+MANIFEST_NAME = ".scrape_manifest.json"
+DEFAULT_CONCURRENCY = 8
 
-# Keep track of visited URLs to avoid infinite loops and redundant scrapes
-visited_urls = set()
+
+@dataclass
+class CrawlStats:
+    """What a crawl did with each page."""
+
+    fetched: int = 0  # 200 responses
+    not_modified: int = 0  # 304 responses to conditional requests
+    written: int = 0  # pages whose Markdown changed and was saved
+    unchanged: int = 0  # 200 responses whose Markdown matched the saved file
+    errors: int = 0
+    seconds: float = 0.0
 
 
 def clean_url(url):
@@ -22,105 +42,198 @@ def clean_url(url):
     return f"{parsed.scheme}://{parsed.netloc}{parsed.path}".strip("/")
 
 
-def scrape_page(url):
-    """
-    Scrapes a single page, converts its main content to Markdown, and finds new links.
-
-    It normalizes and tracks visited URLs to prevent redundant scraping and
-    infinite loops.
-    """
-    # Normalize the URL to avoid scraping the same page with different fragments
-    normalized_url = clean_url(url)
-    if normalized_url in visited_urls:
-        return []
-
-    print(f"Scraping: {url}")
-    visited_urls.add(normalized_url)
-
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        print(f"  ERROR: Could not fetch {url}: {e}")
-        return []
+def page_filename(url):
+    """Generates a clean filename from the URL path."""
+    path = urlparse(url).path
+    return (path.strip("/").replace("/", "_").replace(".html", "") or "index") + ".md"
 
-    soup = BeautifulSoup(response.content, "html.parser")
 
+def page_to_markdown(url, soup):
+    """Converts the main content of a docs page to Markdown, or returns None if it has none."""
     # This selector is specific to the ADK docs site structure.
     # It targets the main content area of the page.
     content_area = soup.select_one(".md-content .md-content__inner")
-
-    if content_area:
-        # Get the page title for context
-        title_tag = soup.find("title")
-        page_title = (
-            title_tag.get_text().replace(" - ADK", "").strip()
-            if title_tag
-            else "ADK Document"
-        )
-
-        # Convert the HTML content directly to Markdown
-        # This preserves headings, lists, code blocks, etc.
-        markdown_content = md(str(content_area), heading_style="ATX")
-
-        # --- Post-processing the Markdown for cleaner output ---
-        # Remove extra blank lines
-        markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
-        # Add a title and source URL to the top of the file for context
-        final_content = (
-            f"# {page_title}\n\n**Source URL:** {url}\n\n---\n\n{markdown_content}"
-        )
-
-        # Generate a clean filename from the URL path
-        path = urlparse(url).path
-        filename = path.strip("/").replace("/", "_").replace(".html", "") or "index"
-        filename = os.path.join(OUTPUT_DIR, f"{filename}.md")
-
-        # Save the content
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(final_content)
-        print(f"  -> Saved to {filename}")
-
-    # Find all links on the page that point to other docs pages
-    new_links = []
+    if not content_area:
+        return None
+
+    # Get the page title for context
+    title_tag = soup.find("title")
+    page_title = (
+        title_tag.get_text().replace(" - ADK", "").strip()
+        if title_tag
+        else "ADK Document"
+    )
+
+    # Convert the HTML content directly to Markdown
+    # This preserves headings, lists, code blocks, etc.
+    markdown_content = md(str(content_area), heading_style="ATX")
+
+    # --- Post-processing the Markdown for cleaner output ---
+    # Remove extra blank lines
+    markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
+    # Add a title and source URL to the top of the file for context
+    return f"# {page_title}\n\n**Source URL:** {url}\n\n---\n\n{markdown_content}"
+
+
+def extract_links(url, soup, base_url):
+    """Finds all links on the page that point to other pages of the same docs site."""
+    links = set()
     # Target links within the main navigation and content area
     for link in soup.select(".md-nav__link, .md-content a"):
         if "href" not in link.attrs:
             continue
-
-        href = link["href"]
         # Construct absolute URL for relative links
-        absolute_url = urljoin(BASE_URL, href)
-
+        absolute_url = urljoin(url, link["href"])
         # Follow links only if they are within the same documentation site
-        if absolute_url.startswith(BASE_URL):
-            normalized_new_link = clean_url(absolute_url)
-            if normalized_new_link not in visited_urls:
-                new_links.append(absolute_url)
+        if absolute_url.startswith(base_url):
+            links.add(absolute_url)
+    return sorted(links)
 
-    return new_links
 
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-def run_scraper():
-    """Main function to run the web scraper."""
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
 
-    # Start with the base URL and expand from there
-    urls_to_scrape = [BASE_URL]
+def write_if_changed(filepath, content):
+    """Writes the file only if its content differs from what is on disk. Returns True if written."""
+    if os.path.exists(filepath):
+        with open(filepath, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    # Write to a temporary file first so readers never see a half-written page
+    with open(filepath + ".tmp", "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(filepath + ".tmp", filepath)
+    return True
+
 
-    while urls_to_scrape:
-        current_url = urls_to_scrape.pop(0)
-        # Use a list and set to get unique new links
-        new_links = list(set(scrape_page(current_url)))
+class DocsCrawler:
+    """
+    Crawls a docs site with a bounded pool of workers sharing one pooled HTTP client.
+
+    URLs wait in a deque-based frontier. Each page is requested with the
+    ETag/Last-Modified validators from the previous run, so unchanged pages
+    come back as empty 304 responses and their saved links are reused. Only
+    pages whose Markdown actually changed are written.
+    """
 
-        for link in new_links:
-            if clean_url(link) not in visited_urls:
-                urls_to_scrape.append(link)
+    def __init__(self, base_url=BASE_URL, output_dir=OUTPUT_DIR, concurrency=DEFAULT_CONCURRENCY, full_refresh=False):
+        self.base_url = base_url
+        self.output_dir = output_dir
+        self.concurrency = concurrency
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.manifest = {} if full_refresh else load_manifest(self.manifest_path)
+        self.stats = CrawlStats()
+        self.frontier = deque([base_url])
+        self.seen = {clean_url(base_url)}
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+
+    async def run(self) -> CrawlStats:
+        os.makedirs(self.output_dir, exist_ok=True)
+        started_at = time.perf_counter()
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=10, follow_redirects=True) as client:
+            await asyncio.gather(*(self._worker(client) for _ in range(self.concurrency)))
+        with open(self.manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+        self.stats.seconds = time.perf_counter() - started_at
+        return self.stats
+
+    async def _worker(self, client):
+        while True:
+            async with self.condition:
+                # Idle workers wait for in-flight pages, which may still add links
+                while not self.frontier and self.in_flight:
+                    await self.condition.wait()
+                if not self.frontier:
+                    return
+                url = self.frontier.popleft()
+                self.in_flight += 1
+
+            links = []
+            try:
+                links = await self._fetch(client, url)
+            finally:
+                async with self.condition:
+                    for link in links:
+                        normalized_link = clean_url(link)
+                        if normalized_link not in self.seen:
+                            self.seen.add(normalized_link)
+                            self.frontier.append(link)
+                    self.in_flight -= 1
+                    self.condition.notify_all()
+
+    async def _fetch(self, client, url):
+        """Fetches one page and returns its links (from the manifest when the page is unchanged)."""
+        key = clean_url(url)
+        entry = self.manifest.get(key, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = await client.get(url, headers=headers)
+            if response.status_code == 304:
+                self.stats.not_modified += 1
+                return entry.get("links", [])
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            print(f"  ERROR: Could not fetch {url}: {e}")
+            self.stats.errors += 1
+            return entry.get("links", [])
+
+        self.stats.fetched += 1
+        # Parsing and Markdown conversion are CPU-bound; keep them off the event loop
+        links, markdown_content = await asyncio.to_thread(self._parse, url, response.content)
+        entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "links": links,
+        }
+        if markdown_content is not None:
+            content_hash = hashlib.sha256(markdown_content.encode("utf-8")).hexdigest()
+            filepath = os.path.join(self.output_dir, page_filename(url))
+            if content_hash == self.manifest.get(key, {}).get("content_hash") and os.path.exists(filepath):
+                self.stats.unchanged += 1
+            elif await asyncio.to_thread(write_if_changed, filepath, markdown_content):
+                self.stats.written += 1
+                print(f"  -> Saved {url} to {filepath}")
+            else:
+                self.stats.unchanged += 1
+            entry["content_hash"] = content_hash
+        self.manifest[key] = entry
+        return links
+
+    def _parse(self, url, html):
+        soup = BeautifulSoup(html, "html.parser")
+        return extract_links(url, soup, self.base_url), page_to_markdown(url, soup)
+
+
+def run_scraper(base_url=BASE_URL, output_dir=OUTPUT_DIR, concurrency=DEFAULT_CONCURRENCY, full_refresh=False):
+    """Main function to run the web scraper."""
+    stats = asyncio.run(DocsCrawler(base_url, output_dir, concurrency, full_refresh).run())
 
     print("\n✅ Scraping complete.")
-    print(f"Total unique pages scraped: {len(visited_urls)}")
+    print(
+        f"Pages: {stats.fetched} fetched, {stats.not_modified} not modified, "
+        f"{stats.written} written, {stats.unchanged} unchanged, {stats.errors} errors "
+        f"in {stats.seconds:.1f}s."
+    )
+    return stats
 
 
 if __name__ == "__main__":
-    run_scraper()
+    parser = argparse.ArgumentParser(description="Scrape the ADK documentation into Markdown files.")
+    parser.add_argument("--base-url", default=BASE_URL, help="Root URL of the docs site.")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Directory for the Markdown files.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Pages fetched at once.")
+    parser.add_argument("--full-refresh", action="store_true", help="Ignore the saved ETags and refetch every page.")
+    args = parser.parse_args()
+    run_scraper(args.base_url, args.output_dir, args.concurrency, args.full_refresh)
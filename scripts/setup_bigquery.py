@@ -1,11 +1,18 @@
 # FILE: scripts/setup_bigquery.py
 
+import csv
+import importlib.util
 import json
 import os
+import sys
+import tempfile
+from typing import Optional
 
 from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
 
+STRING_COLUMNS = ["ticket_id", "customer_id", "request", "category", "suggested_solution"]
+
 
 def create_dataset_if_not_exists(client: bigquery.Client, dataset_id: str):
     """Creates a BigQuery dataset if it does not already exist."""
@@ -20,72 +27,128 @@ def create_dataset_if_not_exists(client: bigquery.Client, dataset_id: str):
         print(f"INFO: Created dataset '{dataset.project}.{dataset.dataset_id}'.")
 
 
+# Number of rows converted at a time; bounds memory when writing Parquet
+ROW_BATCH_SIZE = 1000
+
+
+def iter_ticket_rows(csv_filepath: str):
+    """Yields the CSV rows one at a time as dicts, with the embedding parsed into a list of floats."""
+    csv.field_size_limit(sys.maxsize)
+    with open(csv_filepath, "r", encoding="utf-8", newline="") as source_file:
+        for row_dict in csv.DictReader(source_file):
+            try:
+                # Convert the string representation of a list into an actual list of floats
+                row_dict["request_embedding"] = [
+                    float(value) for value in json.loads(row_dict["request_embedding"])
+                ]
+            except (json.JSONDecodeError, TypeError, ValueError) as e:
+                print(
+                    f"WARN: Could not parse embedding for ticket {row_dict.get('ticket_id')}. Skipping. Error: {e}"
+                )
+                continue
+            yield row_dict
+
+
+def write_ndjson(rows, target) -> int:
+    """Writes rows as newline-delimited JSON to a binary file object and returns the row count."""
+    count = 0
+    for row in rows:
+        target.write(json.dumps(row).encode("utf-8") + b"\n")
+        count += 1
+    return count
+
+
+def write_parquet(rows, target) -> int:
+    """
+    Writes rows as Parquet to a binary file object, storing the embedding as a
+    native list of doubles. Returns the row count.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_schema = pa.schema(
+        [(name, pa.string()) for name in STRING_COLUMNS]
+        + [("request_embedding", pa.list_(pa.float64()))]
+    )
+    count = 0
+    with pq.ParquetWriter(target, arrow_schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= ROW_BATCH_SIZE:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=arrow_schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=arrow_schema))
+            count += len(batch)
+    return count
+
+
+def default_load_format() -> str:
+    """Parquet when pyarrow is installed, newline-delimited JSON otherwise (override with BQ_LOAD_FORMAT)."""
+    configured = os.getenv("BQ_LOAD_FORMAT", "").lower()
+    if configured:
+        return configured
+    return "parquet" if importlib.util.find_spec("pyarrow") is not None else "json"
+
+
 def load_csv_to_bigquery(
-    client: bigquery.Client, dataset_name: str, table_name: str, csv_filepath: str
+    client: bigquery.Client,
+    dataset_name: str,
+    table_name: str,
+    csv_filepath: str,
+    load_format: Optional[str] = None,
 ):
-    """Loads a CSV file with an embedding column into a BigQuery table, overwriting if it exists."""
+    """
+    Loads a CSV file with an embedding column into a BigQuery table, overwriting if it exists.
+
+    Rows are streamed from the CSV into a temporary Parquet (or JSON) file on
+    disk, which the client then uploads in chunks, so memory stays bounded
+    regardless of the corpus size.
+    """
     dataset_ref = client.dataset(dataset_name)
     table_ref = dataset_ref.table(table_name)
+    load_format = load_format or default_load_format()
+    if load_format not in ("parquet", "json"):
+        raise ValueError(f"Unsupported BQ_LOAD_FORMAT '{load_format}'; use 'parquet' or 'json'.")
 
     # Explicitly define the schema to handle the vector embedding
-    schema = [
-        bigquery.SchemaField("ticket_id", "STRING"),
-        bigquery.SchemaField("customer_id", "STRING"),
-        bigquery.SchemaField("request", "STRING"),
-        bigquery.SchemaField("category", "STRING"),
-        bigquery.SchemaField("suggested_solution", "STRING"),
+    schema = [bigquery.SchemaField(name, "STRING") for name in STRING_COLUMNS] + [
         bigquery.SchemaField(
             "request_embedding", "FLOAT64", mode="REPEATED"
         ),  # Important: this defines the vector
     ]
 
-    json_job_config = bigquery.LoadJobConfig(
+    job_config = bigquery.LoadJobConfig(
         schema=schema,
         write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,  # Overwrite the table
-        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,  # Specify the source format
     )
-
-    print(f"INFO: Preparing to load data into '{dataset_name}.{table_name}'...")
-
-    # We will convert the CSV to a newline-delimited JSON file in memory
-    rows_to_load_as_json_strings = []
-    with open(csv_filepath, "r", encoding="utf-8") as source_file:
-        import csv
-
-        reader = csv.reader(source_file)
-        header = next(reader)  # skip header
-
-        for row in reader:
-            row_dict = dict(zip(header, row))
-            try:
-                # Convert the string representation of a list into an actual list of floats
-                row_dict["request_embedding"] = json.loads(
-                    row_dict["request_embedding"]
-                )
-                # Convert the entire dictionary to a JSON string for this row
-                rows_to_load_as_json_strings.append(json.dumps(row_dict))
-            except (json.JSONDecodeError, TypeError) as e:
-                print(
-                    f"WARN: Could not parse embedding for ticket {row_dict.get('ticket_id')}. Skipping. Error: {e}"
-                )
-
-    if not rows_to_load_as_json_strings:
-        print(
-            "ERROR: No rows were prepared for loading. Check the CSV format and content."
+    if load_format == "parquet":
+        job_config.source_format = bigquery.SourceFormat.PARQUET
+        # Map Parquet lists to REPEATED columns instead of nested `list.element` records
+        parquet_options = bigquery.ParquetOptions()
+        parquet_options.enable_list_inference = True
+        job_config.parquet_options = parquet_options
+    else:
+        job_config.source_format = bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+
+    print(f"INFO: Preparing to load data into '{dataset_name}.{table_name}' as {load_format}...")
+
+    with tempfile.TemporaryFile() as staging_file:
+        writer = write_parquet if load_format == "parquet" else write_ndjson
+        row_count = writer(iter_ticket_rows(csv_filepath), staging_file)
+        if not row_count:
+            print(
+                "ERROR: No rows were prepared for loading. Check the CSV format and content."
+            )
+            return
+
+        staging_file.seek(0)
+        job = client.load_table_from_file(
+            staging_file, table_ref, job_config=job_config, rewind=True
         )
-        return
-
-    # Join the JSON strings with newlines to create the in-memory file content
-    in_memory_json_file = "\n".join(rows_to_load_as_json_strings).encode("utf-8")
-
-    from io import BytesIO
-
-    # Load the table from the in-memory BytesIO object
-    job = client.load_table_from_file(
-        BytesIO(in_memory_json_file), table_ref, job_config=json_job_config
-    )
-
-    job.result()  # Wait for the job to complete
+        job.result()  # Wait for the job to complete
     print(f"INFO: Loaded {job.output_rows} rows into '{dataset_name}.{table_name}'.")
 
 
@@ -1,7 +1,12 @@
 # FILE: scripts/setup_rag.py
 
+import asyncio
+import base64
+import hashlib
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import vertexai
@@ -26,8 +31,51 @@ PARSER_MODEL_NAME = "gemini-2.0-flash-001"
 # --------------------------------
 
 
-def upload_folder_to_gcs(bucket_name, source_folder, destination_prefix=""):
-    """Uploads files from a local folder to a GCS bucket, skipping existing files."""
+# Parallel uploads/deletes when syncing the knowledge base to GCS
+SYNC_MAX_WORKERS = int(os.getenv("RAG_SYNC_MAX_WORKERS", "16"))
+# Above this many changed files, the whole prefix is imported instead of a URI list
+# (files the corpus already has unchanged are skipped by the service)
+MAX_IMPORT_URIS = 25
+IMPORT_POLL_SECONDS = 5
+IMPORT_TIMEOUT_SECONDS = int(os.getenv("RAG_IMPORT_TIMEOUT_SECONDS", "1800"))
+
+
+@dataclass
+class SyncResult:
+    """GCS URIs that were uploaded (new or changed), deleted, or left unchanged by a sync."""
+
+    uploaded: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+
+
+def file_md5(filepath: Path) -> str:
+    """Base64 MD5 of a file's content, in the same format as GCS's `md5_hash`."""
+    digest = hashlib.md5()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return base64.b64encode(digest.digest()).decode("ascii")
+
+
+def local_manifest(source_folder: str, destination_prefix: str) -> dict[str, Path]:
+    """Maps each blob name the local knowledge base should have to its local file."""
+    source_path = Path(source_folder)
+    return {
+        f"{destination_prefix}/{p.relative_to(source_path).as_posix()}" if destination_prefix else p.relative_to(source_path).as_posix(): p
+        for p in sorted(source_path.rglob("*"))
+        if p.is_file() and not p.name.startswith(".")
+    }
+
+
+def sync_folder_to_gcs(bucket_name, source_folder, destination_prefix="") -> SyncResult:
+    """
+    Makes `gs://bucket/prefix` match the local folder, comparing content hashes.
+
+    A single listing of the prefix gives the remote MD5 of every blob. Only new
+    or changed files are uploaded, in parallel, and blobs whose local file was
+    removed are deleted.
+    """
     storage_client = storage.Client()
     try:
         bucket = storage_client.get_bucket(bucket_name)
@@ -35,23 +83,36 @@ def upload_folder_to_gcs(bucket_name, source_folder, destination_prefix=""):
         print(f"ERROR: Could not get GCS bucket '{bucket_name}'. Please ensure it exists and you have permissions. Details: {e}")
         raise
 
-    source_path = Path(source_folder)
-    filepaths = [p for p in source_path.rglob("*") if p.is_file() and not p.name.startswith(".")]
+    local_files = local_manifest(source_folder, destination_prefix)
+    list_prefix = f"{destination_prefix}/" if destination_prefix else None
+    remote_hashes = {blob.name: blob.md5_hash for blob in storage_client.list_blobs(bucket, prefix=list_prefix)}
+    print(f"INFO: Comparing {len(local_files)} local files with {len(remote_hashes)} objects in gs://{bucket_name}/{destination_prefix}...")
+
+    with ThreadPoolExecutor(SYNC_MAX_WORKERS) as pool:
+        local_hashes = dict(zip(local_files, pool.map(file_md5, local_files.values())))
+
+    to_upload = [name for name, md5 in local_hashes.items() if remote_hashes.get(name) != md5]
+    to_delete = [name for name in remote_hashes if name not in local_files]
+    result = SyncResult(unchanged=[f"gs://{bucket_name}/{name}" for name in local_files if name not in to_upload])
+
+    def upload(name: str):
+        bucket.blob(name).upload_from_filename(str(local_files[name]))
 
-    print(f"INFO: Checking {len(filepaths)} files for upload from '{source_folder}'...")
+    def delete(name: str):
+        bucket.blob(name).delete()
 
-    upload_count = 0
-    for filepath in filepaths:
-        destination_blob_name = os.path.join(destination_prefix, filepath.relative_to(source_path))
-        blob = bucket.blob(destination_blob_name)
-        if not blob.exists():
-            blob.upload_from_filename(str(filepath))
-            upload_count += 1
+    with ThreadPoolExecutor(SYNC_MAX_WORKERS) as pool:
+        # list() re-raises the first failed upload or delete
+        list(pool.map(upload, to_upload))
+        list(pool.map(delete, to_delete))
+    result.uploaded = [f"gs://{bucket_name}/{name}" for name in to_upload]
+    result.deleted = [f"gs://{bucket_name}/{name}" for name in to_delete]
 
-    if upload_count > 0:
-        print(f"INFO: Successfully uploaded {upload_count} new files to gs://{bucket_name}/{destination_prefix}")
+    if to_upload or to_delete:
+        print(f"INFO: Uploaded {len(to_upload)} new or changed files and deleted {len(to_delete)} removed files in gs://{bucket_name}/{destination_prefix}")
     else:
         print("INFO: All files already up-to-date in Google Cloud Storage.")
+    return result
 
 
 def create_gcs_bucket_if_not_exists(bucket_name, project_id, location):
@@ -89,6 +150,77 @@ def get_or_create_rag_corpus(display_name: str) -> rag.RagCorpus:
     return new_corpus
 
 
+def corpus_files_by_uri(corpus_name: str) -> dict[str, str]:
+    """Maps the GCS URI of each file in the corpus to its RagFile resource name."""
+    files = {}
+    for rag_file in rag.list_files(corpus_name):
+        for uri in rag_file.gcs_source.uris:
+            files[uri] = rag_file.name
+    return files
+
+
+async def _import_and_wait(corpus_name: str, paths: list[str], **import_options):
+    """Starts the import and polls the long-running operation until it finishes."""
+    operation = await rag.import_files_async(corpus_name, paths, **import_options)
+    started_at = time.monotonic()
+    while not await operation.done():
+        elapsed = time.monotonic() - started_at
+        if elapsed > IMPORT_TIMEOUT_SECONDS:
+            raise TimeoutError(f"RAG import did not finish within {IMPORT_TIMEOUT_SECONDS}s.")
+        print(f"INFO: Import in progress ({elapsed:.0f}s elapsed)...")
+        await asyncio.sleep(IMPORT_POLL_SECONDS)
+    return await operation.result()
+
+
+def sync_corpus(corpus_name: str, sync_result: SyncResult, gcs_prefix_uri: str):
+    """
+    Brings the corpus in line with the bucket: removes files that were deleted
+    or changed, then imports the changed files plus any the corpus is missing.
+    """
+    corpus_files = corpus_files_by_uri(corpus_name)
+    stale = [uri for uri in sync_result.deleted + sync_result.uploaded if uri in corpus_files]
+    for uri in stale:
+        rag.delete_file(corpus_files[uri])
+    if stale:
+        print(f"INFO: Removed {len(stale)} deleted or outdated files from the corpus.")
+
+    to_import = sync_result.uploaded + [uri for uri in sync_result.unchanged if uri not in corpus_files]
+    if not to_import:
+        print("INFO: RAG Corpus already up-to-date; nothing to import.")
+        return
+
+    paths = to_import if len(to_import) <= MAX_IMPORT_URIS else [gcs_prefix_uri]
+    print(f"INFO: Importing {len(to_import)} files into the corpus with the LLM parser...")
+
+    # Define the configuration objects separately. This is the correct pattern for this SDK version.
+    transformation_config = rag.TransformationConfig(
+        chunking_config=rag.ChunkingConfig(
+            chunk_size=1024,
+            chunk_overlap=200,
+        ),
+    )
+
+    llm_parser_config = rag.LlmParserConfig(
+        model_name=PARSER_MODEL_NAME,
+        custom_parsing_prompt=CUSTOM_PARSING_PROMPT,
+    )
+
+    response = asyncio.run(
+        _import_and_wait(
+            corpus_name,
+            paths,
+            transformation_config=transformation_config,
+            llm_parser=llm_parser_config,
+        )
+    )
+    print(
+        f"INFO: Import finished: {response.imported_rag_files_count} imported, "
+        f"{response.skipped_rag_files_count} skipped, {response.failed_rag_files_count} failed."
+    )
+    if response.failed_rag_files_count:
+        raise RuntimeError(f"{response.failed_rag_files_count} files failed to import into the RAG corpus.")
+
+
 def setup():
     """Main function to set up the RAG corpus."""
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
@@ -100,11 +232,11 @@ def setup():
 
     vertexai.init(project=project_id, location=location)
 
-    print("\n--- Step 1: Setting up Google Cloud Storage ---")
+    print("\n--- Step 1: Syncing the knowledge base to Google Cloud Storage ---")
     create_gcs_bucket_if_not_exists(bucket_name, project_id, location)
     kb_source_folder = "data/knowledge_base"
     gcs_destination_prefix = "rag_knowledge_base"
-    upload_folder_to_gcs(bucket_name, kb_source_folder, gcs_destination_prefix)
+    sync_result = sync_folder_to_gcs(bucket_name, kb_source_folder, gcs_destination_prefix)
     gcs_uri = f"gs://{bucket_name}/{gcs_destination_prefix}"
 
     print("\n--- Step 2: Setting up Vertex AI RAG Corpus ---")
@@ -114,38 +246,10 @@ def setup():
     print("\n--- Step 3: Updating Environment File ---")
     write_to_env("RAG_CORPUS_NAME", corpus.name)
 
-    print(f"\n--- Step 4: Importing files with LLM Parser ---")
-
+    print("\n--- Step 4: Syncing files into the RAG Corpus ---")
     try:
-        # Define the configuration objects separately. This is the correct pattern for this SDK version.
-        transformation_config = rag.TransformationConfig(
-            chunking_config=rag.ChunkingConfig(
-                chunk_size=1024,
-                chunk_overlap=200,
-            ),
-        )
-
-        llm_parser_config = rag.LlmParserConfig(
-            model_name=PARSER_MODEL_NAME,
-            custom_parsing_prompt=CUSTOM_PARSING_PROMPT,
-        )
-
-        # Call the import files function. We will not wait for the result.
-        rag.import_files(
-            corpus.name,
-            [gcs_uri],
-            transformation_config=transformation_config,
-            llm_parser=llm_parser_config,
-        )
-
-        print(f"INFO: File import process started in the background.")
-        print("INFO: Pausing for 60 seconds to allow ingestion to begin...")
-        
-        # Add a static delay. This is a pragmatic workaround for CI.
-        time.sleep(60)
-
+        sync_corpus(corpus.name, sync_result, gcs_uri)
         print("\n✅✅✅ RAG Corpus setup complete! ✅✅✅")
-
     except Exception as e:
         print(f"❌ An unexpected error occurred during RAG file import: {e}")
         raise
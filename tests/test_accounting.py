@@ -0,0 +1,86 @@
+"""Unit tests for the per-ticket usage ledger and budgets of project_agora/accounting.py."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+
+from project_agora import accounting, callbacks
+from project_agora.accounting import BudgetState, UsageLedger, budget_state
+from project_agora.entities.ticket import TicketUsage
+
+
+@pytest.fixture
+def budgets(monkeypatch):
+    monkeypatch.setenv("TICKET_TOKEN_BUDGET", "1000")
+    monkeypatch.setenv("TICKET_MAX_LLM_CALLS", "10")
+    monkeypatch.setenv("TICKET_BUDGET_DEGRADE_RATIO", "0.8")
+    monkeypatch.setenv("BUDGET_FALLBACK_MODEL", "fallback-model")
+
+
+def test_budget_state_goes_from_ok_to_degraded_to_exhausted(budgets):
+    assert budget_state(TicketUsage(total_tokens=799, llm_calls=1)) == BudgetState.OK
+    assert budget_state(TicketUsage(total_tokens=800, llm_calls=1)) == BudgetState.DEGRADED
+    assert budget_state(TicketUsage(total_tokens=10, llm_calls=8)) == BudgetState.DEGRADED
+    assert budget_state(TicketUsage(total_tokens=1000, llm_calls=1)) == BudgetState.EXHAUSTED
+    assert budget_state(TicketUsage(total_tokens=10, llm_calls=10)) == BudgetState.EXHAUSTED
+
+
+def test_zero_disables_a_budget(monkeypatch):
+    monkeypatch.setenv("TICKET_TOKEN_BUDGET", "0")
+    monkeypatch.setenv("TICKET_MAX_LLM_CALLS", "0")
+
+    assert budget_state(TicketUsage(total_tokens=10**9, llm_calls=10**6)) == BudgetState.OK
+
+
+def test_seed_keeps_the_totals_furthest_ahead():
+    ledger = UsageLedger()
+    ledger.record("T-1", "agent", 10, 5, 15, 0.1)
+
+    ledger.seed("T-1", TicketUsage(llm_calls=3, total_tokens=300).model_dump())
+    assert ledger.get("T-1").total_tokens == 300
+    ledger.seed("T-1", TicketUsage(llm_calls=1, total_tokens=999).model_dump())
+    assert ledger.get("T-1").total_tokens == 300
+
+
+def test_idle_tickets_are_evicted(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(accounting, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setenv("TICKET_USAGE_TTL_SECONDS", "100")
+    ledger = UsageLedger()
+    ledger.record("idle", "agent", 1, 1, 2, 0.1)
+
+    clock.now += accounting.EVICTION_INTERVAL_SECONDS + 100
+    ledger.record("busy", "agent", 1, 1, 2, 0.1)
+
+    assert ledger.tracked("idle") is None
+    assert len(ledger) == 1
+
+
+def _model_call(monkeypatch, usage: TicketUsage):
+    monkeypatch.setattr(callbacks, "ledger", UsageLedger())
+    ticket = {"ticket_id": "T-1", "status": "Analyzing", "usage": usage.model_dump()}
+    context = SimpleNamespace(invocation_id="inv-1", agent_name="problem_solver_agent", state={"ticket": json.dumps(ticket)})
+    request = LlmRequest()
+    return callbacks.before_model_call(context, request), request
+
+
+def test_model_call_is_routed_as_usual_within_budget(budgets, monkeypatch):
+    response, request = _model_call(monkeypatch, TicketUsage(llm_calls=1, total_tokens=100))
+
+    assert response is None
+    assert request.model == callbacks.router.model_for("problem_solver_agent")
+
+
+def test_model_call_falls_back_near_the_budget(budgets, monkeypatch):
+    response, request = _model_call(monkeypatch, TicketUsage(llm_calls=1, total_tokens=850))
+
+    assert response is None
+    assert request.model == "fallback-model"
+
+
+def test_model_call_is_refused_once_the_budget_is_exhausted(budgets, monkeypatch):
+    response, _ = _model_call(monkeypatch, TicketUsage(llm_calls=10, total_tokens=100))
+
+    assert "Processing of ticket T-1 has stopped because it exhausted its LLM budget" in response.content.parts[0].text
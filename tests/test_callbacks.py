@@ -0,0 +1,37 @@
+"""Unit tests for the agent callbacks of project_agora/callbacks.py, on stand-in contexts."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from project_agora import callbacks
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _context(invocation_id="inv-1", agent_name="orchestrator_agent", function_call_id=None, state=None):
+    return SimpleNamespace(
+        invocation_id=invocation_id,
+        agent_name=agent_name,
+        function_call_id=function_call_id,
+        state=state if state is not None else {},
+        session=SimpleNamespace(id="session-1"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_cancelled_tool_calls_are_dropped_at_the_end_of_the_turn(monkeypatch):
+    monkeypatch.setattr(callbacks, "_tool_start_times", {})
+    tool = SimpleNamespace(name="create_ticket")
+    other_agent = _context(agent_name="problem_solver_agent", function_call_id="call-3")
+
+    await callbacks.before_tool_call(tool, {}, _context(function_call_id="call-1"))
+    await callbacks.before_tool_call(tool, {}, _context(function_call_id="call-2"))
+    await callbacks.before_tool_call(tool, {}, other_agent)
+    # call-1 finishes; call-2 is cancelled, so after_tool_call never runs for it
+    callbacks.after_tool_call(tool, {}, _context(function_call_id="call-1"), "ok")
+    assert len(callbacks._tool_start_times) == 2
+
+    callbacks.after_agent_call(_context())
+
+    assert list(callbacks._tool_start_times) == [callbacks._tool_key(tool, other_agent)]
@@ -0,0 +1,157 @@
+"""Unit tests for the speculative code generation of project_agora/code_speculation.py, with stand-in agents."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from project_agora import code_speculation, parallel_codegen
+from project_agora.code_speculation import CONFIRMATION_MARKER, GENERATOR_AGENT, REVIEWER_AGENT, generation_request
+
+pytest_plugins = ("pytest_asyncio",)
+
+PLAN = json.dumps({"project_name": "weather_agent", "components": [{"name": "WeatherAgent", "type": "LlmAgent"}]})
+OTHER_PLAN = json.dumps({"project_name": "weather_agent", "components": [{"name": "PostgresTool", "type": "Tool"}]})
+
+
+@pytest.fixture
+def generated(monkeypatch) -> list:
+    """Speculation with stand-in generation and review; records the plans code was generated for."""
+    plans = []
+
+    async def generate_code(plan_text, state, generator):
+        plans.append(plan_text)
+        await asyncio.sleep(0)
+        return f"==== FILE: agent.py ====\n# code for {len(plans)}"
+
+    async def run_agent(agent, request, state):
+        return f"review of {request.splitlines()[0]}"
+
+    monkeypatch.setenv("AGORA_SPECULATIVE_CODEGEN", "1")
+    monkeypatch.setenv("AGORA_SPECULATIVE_CODE_REVIEW", "0")
+    monkeypatch.setattr(parallel_codegen, "generate_code", generate_code)
+    monkeypatch.setattr(code_speculation, "run_agent", run_agent)
+    monkeypatch.setattr(code_speculation, "_speculations", {})
+    monkeypatch.setattr(code_speculation, "_outcomes", code_speculation.deque(maxlen=code_speculation.WASTE_WINDOW))
+    monkeypatch.setattr(
+        code_speculation, "_agents", {name: SimpleNamespace(name=name) for name in (GENERATOR_AGENT, REVIEWER_AGENT)}
+    )
+    return plans
+
+
+def _start(plan: str = PLAN, invocation_id: str = "inv-1") -> None:
+    code_speculation.start("T-1", plan, {}, "orchestrator_agent", invocation_id)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "approval",
+    [
+        generation_request(PLAN),
+        f"{CONFIRMATION_MARKER}: ship it",
+        f"{CONFIRMATION_MARKER}: oui, vas-y, génère le code",
+    ],
+)
+async def test_approval_of_the_speculated_plan_gets_its_code(generated, approval):
+    _start()
+
+    code = await code_speculation.claim_code("T-1", approval, PLAN)
+
+    assert code == "==== FILE: agent.py ====\n# code for 1"
+    assert generated == [PLAN]
+
+
+@pytest.mark.asyncio
+async def test_changed_plan_in_state_cancels_the_speculation(generated):
+    _start()
+    task = code_speculation._speculations["T-1"].code_task
+
+    assert await code_speculation.claim_code("T-1", f"{CONFIRMATION_MARKER}: yes", OTHER_PLAN) is None
+    assert code_speculation._speculations == {}
+    await asyncio.sleep(0)
+    assert task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_request_quoting_another_plan_cancels_the_speculation(generated):
+    _start()
+
+    assert await code_speculation.claim_code("T-1", generation_request(OTHER_PLAN), PLAN) is None
+    assert code_speculation._speculations == {}
+
+
+@pytest.mark.asyncio
+async def test_plan_request_does_not_claim_the_code(generated):
+    _start()
+
+    assert await code_speculation.claim_code("T-1", "Plan a weather agent", PLAN) is None
+    assert "T-1" in code_speculation._speculations
+
+
+@pytest.mark.asyncio
+async def test_review_is_claimed_only_for_the_speculative_code(generated, monkeypatch):
+    monkeypatch.setenv("AGORA_SPECULATIVE_CODE_REVIEW", "1")
+    _start()
+    code = await code_speculation.claim_code("T-1", generation_request(PLAN), PLAN)
+
+    assert await code_speculation.claim_review("T-1", f"Review this:\n{code}") == "review of ==== FILE: agent.py ===="
+    assert code_speculation._speculations == {}
+
+    _start()
+    await code_speculation.claim_code("T-1", generation_request(PLAN), PLAN)
+    assert await code_speculation.claim_review("T-1", "Review this:\n==== FILE: other.py ====") is None
+    assert code_speculation._speculations == {}
+
+
+@pytest.mark.asyncio
+async def test_later_turn_without_the_code_rejects_it(generated):
+    _start(invocation_id="inv-1")
+    task = code_speculation._speculations["T-1"].code_task
+
+    # The turn that produced the plan ends: the user has not answered yet
+    code_speculation.end_of_turn("T-1", "orchestrator_agent", "inv-1")
+    assert "T-1" in code_speculation._speculations
+    code_speculation.end_of_turn("T-1", "code_generator_agent", "inv-2")
+    assert "T-1" in code_speculation._speculations
+
+    code_speculation.end_of_turn("T-1", "orchestrator_agent", "inv-2")
+    assert code_speculation._speculations == {}
+    await asyncio.sleep(0)
+    assert task.cancelled()
+    assert code_speculation.waste_ratio() == 1.0
+
+
+@pytest.mark.asyncio
+async def test_new_plan_replaces_the_speculation(generated):
+    _start(PLAN)
+    first = code_speculation._speculations["T-1"].code_task
+
+    _start(OTHER_PLAN)
+
+    await asyncio.sleep(0)
+    assert first.cancelled()
+    assert await code_speculation.claim_code("T-1", generation_request(OTHER_PLAN), OTHER_PLAN) is not None
+    assert generated[-1] == OTHER_PLAN
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_lets_the_generator_run(generated, monkeypatch):
+    async def failing_generate_code(plan_text, state, generator):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(parallel_codegen, "generate_code", failing_generate_code)
+    _start()
+
+    assert await code_speculation.claim_code("T-1", generation_request(PLAN), PLAN) is None
+    assert code_speculation._speculations == {}
+
+
+@pytest.mark.asyncio
+async def test_running_cap_skips_new_speculations(generated, monkeypatch):
+    monkeypatch.setenv("AGORA_SPECULATIVE_CODEGEN_MAX_RUNNING", "1")
+    _start()
+    code_speculation.start("T-2", PLAN, {}, "orchestrator_agent", "inv-9")
+
+    assert list(code_speculation._speculations) == ["T-1"]
+    code_speculation._speculations["T-1"].code_task.cancel()
@@ -0,0 +1,49 @@
+"""Unit tests for project_agora/disk_cache.py, with two caches standing in for two processes."""
+
+import os
+
+from project_agora import disk_cache
+from project_agora.disk_cache import DiskLRUCache
+
+
+def _sizes_on_disk(cache: DiskLRUCache) -> int:
+    return sum(path.stat().st_size for path in cache.directory.glob("*/*"))
+
+
+def test_entry_written_by_another_process_is_counted_once(tmp_path):
+    writer, reader = DiskLRUCache(tmp_path, 1000), DiskLRUCache(tmp_path, 1000)
+    writer.put("first", b"a" * 300)
+    assert reader.total_bytes == 300
+
+    writer.put("second", b"b" * 300)
+    assert reader.get("second") == b"b" * 300
+    assert reader.get("second") == b"b" * 300
+    assert reader.total_bytes == 600
+
+
+def test_eviction_accounts_for_entries_of_other_processes(tmp_path):
+    first, second = DiskLRUCache(tmp_path, 1000), DiskLRUCache(tmp_path, 1000)
+    second.put("seen", b"s" * 300)
+    first.put("unseen-1", b"a" * 300)
+    first.put("unseen-2", b"b" * 300)
+
+    second.put("new", b"n" * 300)
+
+    assert _sizes_on_disk(second) <= 1000
+    assert second.total_bytes == _sizes_on_disk(second)
+    assert second.get("new") == b"n" * 300
+
+
+def test_entry_evicted_by_another_process_is_a_miss(tmp_path, monkeypatch):
+    cache = DiskLRUCache(tmp_path, 1000)
+    cache.put("key", b"k" * 100)
+    other = DiskLRUCache(tmp_path, 1000)
+
+    # Deleted between the read and the touch
+    def evicting_utime(path):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(disk_cache.os, "utime", evicting_utime)
+    assert other.get("key") is None
+    assert other.total_bytes == 0
@@ -0,0 +1,85 @@
+"""Unit tests for the request keys and record/replay modes of project_agora/llm_cache.py."""
+
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from project_agora import llm_cache
+from project_agora.disk_cache import DiskLRUCache
+from project_agora.llm_cache import CachingLlm, LlmCacheMissError, request_cache_key
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _request(ticket_id: str = "TICK-1A2B3C4D", call_id: str = "adk-123", text: str = "Create a ticket") -> LlmRequest:
+    call = types.FunctionCall(id=call_id, name="create_ticket", args={})
+    result = types.FunctionResponse(id=call_id, name="create_ticket", response={"id": ticket_id})
+    return LlmRequest(
+        model="gemini-2.5-flash",
+        contents=[
+            types.Content(role="user", parts=[types.Part(text=text)]),
+            types.Content(role="model", parts=[types.Part(function_call=call)]),
+            types.Content(role="user", parts=[types.Part(function_response=result)]),
+        ],
+        config=types.GenerateContentConfig(system_instruction="You are Agora."),
+    )
+
+
+def test_key_ignores_call_ids_and_generated_ticket_ids():
+    assert request_cache_key(_request(), stream=False) == request_cache_key(
+        _request(ticket_id="TICK-99887766", call_id="adk-456"), stream=False
+    )
+
+
+def test_key_depends_on_the_conversation_and_the_stream_flag():
+    key = request_cache_key(_request(), stream=False)
+
+    assert request_cache_key(_request(text="Create two tickets"), stream=False) != key
+    # A streamed answer is recorded as several partial responses, so it is kept apart
+    assert request_cache_key(_request(), stream=True) != key
+
+
+class CountingLlm(BaseLlm):
+    calls: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        if stream:
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Hel")]), partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Hello")]))
+
+
+async def _texts(model: BaseLlm, stream: bool = False) -> list:
+    return [
+        (response.content.parts[0].text, bool(response.partial))
+        async for response in model.generate_content_async(_request(), stream=stream)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_recorded_responses_replay_without_the_model(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_cache, "_cache", DiskLRUCache(tmp_path, 1024 * 1024))
+    inner = CountingLlm(model="gemini-2.5-flash")
+
+    recorded = await _texts(CachingLlm(model="gemini-2.5-flash", inner=inner, mode="record"), stream=True)
+    replayed = await _texts(CachingLlm(model="gemini-2.5-flash", inner=inner, mode="replay"), stream=True)
+
+    assert replayed == recorded == [("Hel", True), ("Hello", False)]
+    assert inner.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_miss_raises_instead_of_calling_the_model(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_cache, "_cache", DiskLRUCache(tmp_path, 1024 * 1024))
+    inner = CountingLlm(model="gemini-2.5-flash")
+    await _texts(CachingLlm(model="gemini-2.5-flash", inner=inner, mode="record"), stream=True)
+
+    with pytest.raises(LlmCacheMissError):
+        await _texts(CachingLlm(model="gemini-2.5-flash", inner=inner, mode="replay"), stream=False)
+    assert inner.calls == 1
@@ -0,0 +1,62 @@
+"""Unit tests for the per-worker metrics exporters of project_agora/metrics.py."""
+
+import socket
+import urllib.request
+
+import pytest
+
+from project_agora import metrics
+
+
+@pytest.fixture
+def exporters(monkeypatch):
+    monkeypatch.setattr(metrics, "_exporters_started", False)
+    monkeypatch.setattr(metrics, "_metrics_server", None)
+    monkeypatch.setattr(metrics, "_metrics_file", None)
+    monkeypatch.setattr(metrics, "_stop_file_writer", metrics.threading.Event())
+    yield
+    metrics.stop_exporters()
+
+
+def _bound_socket() -> socket.socket:
+    taken = socket.socket()
+    taken.bind(("127.0.0.1", 0))
+    taken.listen()
+    return taken
+
+
+def test_worker_file_is_suffixed_with_its_pid():
+    assert metrics.worker_metrics_path("logs/metrics.prom", pid=42) == "logs/metrics.42.prom"
+
+
+def test_worker_takes_the_next_port_and_its_own_file(exporters, monkeypatch, tmp_path):
+    taken = _bound_socket()
+    port = taken.getsockname()[1]
+    monkeypatch.setenv("AGORA_WORKERS", "2")
+    monkeypatch.setenv("AGORA_METRICS_PORT", str(port))
+    monkeypatch.setenv("AGORA_METRICS_FILE", str(tmp_path / "metrics.prom"))
+    try:
+        metrics.start_exporters_from_env()
+    finally:
+        taken.close()
+
+    assert metrics._metrics_server.server_address[1] == port + 1
+    with urllib.request.urlopen(f"http://127.0.0.1:{port + 1}/metrics", timeout=5) as response:
+        assert response.status == 200
+    assert metrics._metrics_file == metrics.worker_metrics_path(str(tmp_path / "metrics.prom"))
+
+
+def test_single_process_keeps_the_configured_port_and_file(exporters, monkeypatch, tmp_path):
+    taken = _bound_socket()
+    port = taken.getsockname()[1]
+    monkeypatch.delenv("AGORA_WORKERS", raising=False)
+    monkeypatch.setenv("AGORA_METRICS_PORT", str(port))
+    monkeypatch.setenv("AGORA_METRICS_FILE", str(tmp_path / "metrics.prom"))
+    try:
+        metrics.start_exporters_from_env()
+    finally:
+        taken.close()
+
+    # The port is in use and there is no other worker port to fall back to
+    assert metrics._metrics_server is None
+    assert metrics._metrics_file == str(tmp_path / "metrics.prom")
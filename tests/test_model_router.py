@@ -0,0 +1,52 @@
+"""Unit tests for the routing profiles of project_agora/model_router.py."""
+
+import json
+
+import pytest
+
+from project_agora.model_router import BUILTIN_PROFILES, FLASH_MODEL, PRO_MODEL, ModelRouter
+
+# The per-agent models the agents were defined with before routing existed
+ORIGINAL_MODELS = {
+    "orchestrator_agent": PRO_MODEL,
+    "ticket_analysis_agent": FLASH_MODEL,
+    "knowledge_retrieval_agent": PRO_MODEL,
+    "db_retrieval_agent": PRO_MODEL,
+    "problem_solver_agent": PRO_MODEL,
+    "code_generator_agent": PRO_MODEL,
+    "code_reviewer_agent": PRO_MODEL,
+}
+
+
+@pytest.mark.parametrize("ticket", [None, {"status": "Analyzing", "analysis": {"urgency": "Critical"}}])
+def test_default_profile_keeps_the_original_models(ticket):
+    router = ModelRouter(BUILTIN_PROFILES["default"], "default")
+
+    assert {agent: router.route(agent, ticket)[1] for agent in ORIGINAL_MODELS} == ORIGINAL_MODELS
+
+
+def test_first_matching_rule_decides_the_tier():
+    router = ModelRouter(BUILTIN_PROFILES["balanced"], "balanced")
+
+    assert router.route("db_retrieval_agent") == ("flash", FLASH_MODEL)
+    assert router.route("db_retrieval_agent", {"analysis": {"urgency": "High"}}) == ("pro", PRO_MODEL)
+    assert router.route("problem_solver_agent") == ("pro", PRO_MODEL)
+
+
+def test_profile_is_read_from_the_environment(monkeypatch, tmp_path):
+    routing_file = tmp_path / "routing.json"
+    routing_file.write_text(json.dumps({"profiles": {"tiny": {"tiers": {"small": "tiny-model"}, "default_tier": "small"}}}))
+    monkeypatch.setenv("AGORA_MODEL_ROUTING_FILE", str(routing_file))
+    monkeypatch.setenv("AGORA_MODEL_PROFILE", "tiny")
+
+    router = ModelRouter.from_env()
+
+    assert router.profile_name == "tiny"
+    assert router.model_for("orchestrator_agent") == "tiny-model"
+
+
+def test_unknown_profile_falls_back_to_default(monkeypatch):
+    monkeypatch.delenv("AGORA_MODEL_ROUTING_FILE", raising=False)
+    monkeypatch.setenv("AGORA_MODEL_PROFILE", "no-such-profile")
+
+    assert ModelRouter.from_env().profile_name == "default"
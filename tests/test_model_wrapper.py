@@ -0,0 +1,52 @@
+"""Unit tests for the agent-tree walk and the model wrappers built on DelegatingLlm."""
+
+from google.adk.agents import LlmAgent
+from google.adk.tools.agent_tool import AgentTool
+
+from project_agora.agent_tree import walk_agents
+from project_agora.llm_cache import CachingLlm
+from project_agora.model_wrapper import DelegatingLlm
+from project_agora.rate_limiter import RateLimitedLlm
+
+
+def _tree() -> LlmAgent:
+    tool_agent = LlmAgent(name="tool_agent", model="gemini-2.5-flash")
+    sub_agent = LlmAgent(name="sub_agent", model="gemini-2.5-pro")
+    return LlmAgent(name="root", model="gemini-2.5-pro", tools=[AgentTool(agent=tool_agent)], sub_agents=[sub_agent])
+
+
+def test_walk_visits_agent_tools_and_sub_agents():
+    assert [agent.name for agent in walk_agents(_tree())] == ["root", "tool_agent", "sub_agent"]
+
+
+def test_wrapping_covers_the_whole_tree_once():
+    root = _tree()
+
+    RateLimitedLlm.wrap_agent_tree(root)
+    RateLimitedLlm.wrap_agent_tree(root)
+
+    for agent in walk_agents(root):
+        assert isinstance(agent.model, RateLimitedLlm)
+        assert agent.model.inner is None
+    assert root.sub_agents[0].model.model == "gemini-2.5-pro"
+
+
+def test_wrappers_stack_and_keep_the_model_name():
+    root = _tree()
+
+    RateLimitedLlm.wrap_agent_tree(root)
+    CachingLlm.wrap_agent_tree(root, mode="replay")
+
+    tool_agent = root.tools[0].agent
+    assert isinstance(tool_agent.model, CachingLlm)
+    assert tool_agent.model.mode == "replay"
+    assert isinstance(tool_agent.model.inner, RateLimitedLlm)
+    assert tool_agent.model.model == tool_agent.model.inner.model == "gemini-2.5-flash"
+
+
+def test_inner_model_is_used_when_given():
+    inner = CachingLlm(model="gemini-2.5-flash")
+    wrapper = RateLimitedLlm(model="gemini-2.5-flash", inner=inner)
+
+    assert isinstance(wrapper, DelegatingLlm)
+    assert wrapper._inner_for("gemini-2.5-pro") is inner
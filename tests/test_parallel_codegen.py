@@ -0,0 +1,94 @@
+"""Unit tests for the per-file code generation of project_agora/parallel_codegen.py, with stand-in agents."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from project_agora import parallel_codegen
+from project_agora.code_speculation import CONFIRMATION_MARKER
+
+pytest_plugins = ("pytest_asyncio",)
+
+PLAN = json.dumps({
+    "project_name": "WeatherAgent",
+    "components": [
+        {"name": "WeatherAgent", "type": "LlmAgent"},
+        {"name": "GetForecast", "type": "FunctionTool"},
+    ],
+})
+GENERATOR = SimpleNamespace(name="code_generator_agent")
+
+
+@pytest.fixture
+def runs(monkeypatch) -> list:
+    """Parallel mode with stand-in agent runs; records (agent, request) for each."""
+    calls = []
+
+    async def run_agent(agent, request, state):
+        calls.append((agent.name, request))
+        if state.get("fail_file") and agent.name == "file_generator_agent" and state["fail_file"] in request:
+            raise RuntimeError("model unavailable")
+        if agent.name == "file_generator_agent":
+            return "```python\n# one file\n```"
+        return "==== FILE: weather_agent/agent.py ====\n# every file in one call"
+
+    monkeypatch.setenv("AGORA_CODEGEN_MODE", "parallel")
+    monkeypatch.setattr(parallel_codegen, "run_agent", run_agent)
+    return calls
+
+
+def test_manifest_lists_the_layout_and_shared_names():
+    manifest = parallel_codegen.build_manifest(json.loads(PLAN))
+
+    assert manifest.project == "weather_agent"
+    assert [spec.path for spec in manifest.files] == [
+        "pyproject.toml",
+        "README.md",
+        "weather_agent/__init__.py",
+        "weather_agent/agent.py",
+        "weather_agent/config.py",
+        "weather_agent/prompts.py",
+        "weather_agent/tools.py",
+    ]
+    assert "root_agent: Agent" in manifest.interfaces
+    assert "def get_forecast(...)" in manifest.interfaces
+
+
+@pytest.mark.asyncio
+async def test_files_are_generated_separately_and_assembled(runs):
+    code = await parallel_codegen.generate_code(PLAN, {}, GENERATOR)
+
+    # __init__.py is fixed and needs no model call
+    assert [agent for agent, _ in runs] == ["file_generator_agent"] * 6
+    assert code.count("==== FILE: ") == 7
+    assert "==== FILE: weather_agent/__init__.py ====\nfrom .agent import root_agent\n" in code
+    assert "```" not in code.split("## Next Steps")[0]
+    assert "adk run weather_agent" in code
+
+
+@pytest.mark.asyncio
+async def test_failed_file_falls_back_to_a_single_call(runs):
+    code = await parallel_codegen.generate_code(PLAN, {"fail_file": "weather_agent/tools.py"}, GENERATOR)
+
+    assert code == "==== FILE: weather_agent/agent.py ====\n# every file in one call"
+    agent, request = runs[-1]
+    assert agent == "code_generator_agent"
+    assert request.startswith(CONFIRMATION_MARKER)
+
+
+@pytest.mark.asyncio
+async def test_unparsable_plan_falls_back_to_a_single_call(runs):
+    code = await parallel_codegen.generate_code("Here is my plan: build a weather agent.", {}, GENERATOR)
+
+    assert code.endswith("# every file in one call")
+    assert [agent for agent, _ in runs] == ["code_generator_agent"]
+
+
+@pytest.mark.asyncio
+async def test_single_mode_makes_one_call(runs, monkeypatch):
+    monkeypatch.setenv("AGORA_CODEGEN_MODE", "single")
+
+    await parallel_codegen.generate_code(PLAN, {}, GENERATOR)
+
+    assert [agent for agent, _ in runs] == ["code_generator_agent"]
@@ -0,0 +1,126 @@
+"""Unit tests for the token buckets and 429 handling of project_agora/rate_limiter.py."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from project_agora import rate_limiter
+from project_agora.rate_limiter import MIN_RATE_FRACTION, RATE_DECREASE_FACTOR, ModelRateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_bucket_serves_its_burst_then_makes_callers_wait(clock):
+    bucket = TokenBucket(per_minute=60, burst_seconds=2)  # 1 token/s, 2 tokens of burst
+
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    # Reservations queue up behind each other instead of competing for the same token
+    assert bucket.reserve(1) == pytest.approx(2.0)
+
+
+def test_bucket_refills_over_time_up_to_its_capacity(clock):
+    bucket = TokenBucket(per_minute=60, burst_seconds=2)
+    bucket.reserve(2)
+
+    clock.now += 1
+    assert bucket.reserve(1) == 0.0
+    clock.now += 60
+    assert bucket.reserve(2) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_bucket_adjust_returns_and_charges_tokens(clock):
+    bucket = TokenBucket(per_minute=600, burst_seconds=1)  # 10 tokens/s, 10 tokens of burst
+    bucket.reserve(10)
+
+    bucket.adjust(-4)
+    assert bucket.tokens == pytest.approx(4)
+    bucket.adjust(6)
+    assert bucket.reserve(0) == pytest.approx(0.2)
+    bucket.adjust(-100)
+    assert bucket.tokens == pytest.approx(bucket.capacity)
+
+
+def test_bucket_rate_is_scaled_within_bounds_and_recovers(clock):
+    bucket = TokenBucket(per_minute=60)
+
+    bucket.scale_rate(0.5)
+    assert bucket.rate == pytest.approx(0.5)
+    for _ in range(20):
+        bucket.scale_rate(0.5)
+    assert bucket.rate == pytest.approx(bucket.limit * MIN_RATE_FRACTION)
+    for _ in range(100):
+        bucket.recover()
+    assert bucket.rate == pytest.approx(bucket.limit)
+
+
+def test_unlimited_bucket_never_waits(clock):
+    bucket = TokenBucket(per_minute=0)
+
+    assert bucket.unlimited
+    assert bucket.reserve(1_000_000) == 0.0
+
+
+@pytest.fixture
+def limiter(clock, monkeypatch) -> ModelRateLimiter:
+    monkeypatch.setenv("AGORA_LLM_BACKOFF_BASE_SECONDS", "2")
+    monkeypatch.setenv("AGORA_LLM_BACKOFF_MAX_SECONDS", "60")
+    # No jitter: each cooldown is half its ceiling
+    monkeypatch.setattr(rate_limiter, "random", SimpleNamespace(uniform=lambda low, high: low))
+    return ModelRateLimiter("test-model", rpm=60, tpm=0)
+
+
+def test_rejections_escalate_the_cooldown(limiter, clock):
+    assert limiter.record_rejection(Exception("429"), sent_at=clock.now) == pytest.approx(1.0)
+    clock.now += 5
+    assert limiter.record_rejection(Exception("429"), sent_at=clock.now) == pytest.approx(2.0)
+    clock.now += 5
+    assert limiter.record_rejection(Exception("429"), sent_at=clock.now) == pytest.approx(4.0)
+    assert limiter.consecutive_rejections == 3
+    assert limiter.requests.rate == pytest.approx(limiter.requests.limit * RATE_DECREASE_FACTOR ** 3)
+
+
+def test_calls_in_flight_during_a_rejection_do_not_escalate_it(limiter, clock):
+    sent_at = clock.now
+    clock.now += 0.5
+    limiter.record_rejection(Exception("429"), sent_at=sent_at)
+    clock.now += 0.1
+
+    # Sent before the first rejection arrived: part of the same burst
+    remaining = limiter.record_rejection(Exception("429"), sent_at=sent_at)
+
+    assert limiter.consecutive_rejections == 1
+    assert remaining == pytest.approx(0.9)
+    assert limiter.requests.rate == pytest.approx(limiter.requests.limit * RATE_DECREASE_FACTOR)
+
+
+def test_server_retry_delay_is_honoured(limiter, clock):
+    error = Exception("429 RESOURCE_EXHAUSTED {'retryDelay': '17s'}")
+
+    assert limiter.record_rejection(error, sent_at=clock.now) == pytest.approx(17.0)
+
+
+def test_success_resets_the_escalation(limiter, clock):
+    limiter.record_rejection(Exception("429"), sent_at=clock.now)
+    clock.now += 5
+    limiter.record_rejection(Exception("429"), sent_at=clock.now)
+    limiter.record_success(estimated_tokens=10, actual_tokens=None)
+    clock.now += 5
+
+    assert limiter.consecutive_rejections == 0
+    assert limiter.record_rejection(Exception("429"), sent_at=clock.now) == pytest.approx(1.0)
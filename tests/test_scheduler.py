@@ -0,0 +1,124 @@
+"""Unit tests for the priority, aging and shares of project_agora/scheduler.py."""
+
+import asyncio
+
+import pytest
+
+from project_agora.scheduler import PriorityScheduler, lower_priority, ticket_priority
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+async def _settle():
+    """Lets admitted waiters (woken with call_soon_threadsafe) run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _queue(scheduler: PriorityScheduler, priority: str, admitted: list) -> asyncio.Task:
+    async def wait():
+        await scheduler.wait_for_slot(priority)
+        admitted.append(priority)
+
+    return asyncio.create_task(wait())
+
+
+def test_ticket_priority_follows_urgency_and_resolution():
+    assert ticket_priority(None) == "medium"
+    assert ticket_priority({"analysis": {"urgency": "High"}}) == "high"
+    assert ticket_priority({"analysis": {"urgency": "Critical"}}) == "high"
+    assert ticket_priority({"analysis": {"urgency": "Low"}, "status": "Resolved"}) == "low"
+    assert ticket_priority({"analysis": {"urgency": "High"}, "status": "Resolved"}) == "medium"
+    assert lower_priority("low") == "low"
+
+
+def test_shares_cap_each_priority():
+    scheduler = PriorityScheduler(slots=4, shares={"high": 1.0, "medium": 0.75, "low": 0.5})
+
+    assert scheduler.limits == {"high": 4, "medium": 3, "low": 2}
+    # Every priority keeps at least one slot
+    assert PriorityScheduler(slots=1, shares={"low": 0.1}).limits["low"] == 1
+
+
+@pytest.mark.asyncio
+async def test_low_priority_cannot_fill_every_slot():
+    scheduler = PriorityScheduler(slots=4, shares={"high": 1.0, "medium": 0.75, "low": 0.5}, aging_seconds=0)
+    admitted = []
+    tasks = [_queue(scheduler, "low", admitted) for _ in range(3)]
+    await _settle()
+    assert admitted == ["low", "low"]
+
+    # A high call arriving during the burst finds a free slot at once
+    await asyncio.wait_for(scheduler.wait_for_slot("high"), timeout=1)
+    assert scheduler.running == {"high": 1, "medium": 0, "low": 2}
+
+    scheduler.release("low")
+    await _settle()
+    assert admitted == ["low", "low", "low"]
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_freed_slot_goes_to_the_best_priority_first():
+    scheduler = PriorityScheduler(slots=1, aging_seconds=0)
+    await scheduler.wait_for_slot("medium")
+    admitted = []
+    tasks = [_queue(scheduler, priority, admitted) for priority in ("low", "medium", "high")]
+    await _settle()
+    assert admitted == []
+
+    for _ in range(3):
+        scheduler.release(admitted[-1] if admitted else "medium")
+        await _settle()
+    assert admitted == ["high", "medium", "low"]
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_waiting_raises_the_effective_priority():
+    scheduler = PriorityScheduler(slots=1, aging_seconds=0.05)
+    await scheduler.wait_for_slot("medium")
+    admitted = []
+    low = _queue(scheduler, "low", admitted)
+    await asyncio.sleep(0.15)
+    high = _queue(scheduler, "high", admitted)
+    await _settle()
+
+    scheduler.release("medium")
+    await _settle()
+    # The low call has waited three aging periods, so it now ranks above a fresh high call
+    assert admitted == ["low"]
+    scheduler.release("low")
+    await asyncio.gather(low, high)
+    assert admitted == ["low", "high"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = PriorityScheduler(slots=1)
+    await scheduler.wait_for_slot("high")
+    waiter = asyncio.create_task(scheduler.wait_for_slot("low"))
+    await _settle()
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    assert scheduler._waiters == []
+    assert scheduler.running == {"high": 1, "medium": 0, "low": 0}
+
+
+@pytest.mark.asyncio
+async def test_slot_admitted_as_the_wait_is_cancelled_is_handed_back():
+    scheduler = PriorityScheduler(slots=1)
+    await scheduler.wait_for_slot("high")
+    waiter = asyncio.create_task(scheduler.wait_for_slot("low"))
+    await _settle()
+
+    # The release admits the waiter, whose task is cancelled before it resumes
+    scheduler.release("high")
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    assert waiter.cancelled()
+    assert scheduler.running == {"high": 0, "medium": 0, "low": 0}
+    await asyncio.wait_for(scheduler.wait_for_slot("medium"), timeout=1)
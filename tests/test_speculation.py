@@ -0,0 +1,94 @@
+"""Unit tests for the speculative retrieval of project_agora/speculation.py, with stand-in retrieval runs."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from project_agora import speculation
+
+pytest_plugins = ("pytest_asyncio",)
+
+REQUEST = "How do I make my agents call each other in a specific multi-step sequence?"
+
+
+@pytest.fixture
+def runs(monkeypatch) -> list:
+    """Speculation over both retrieval agents, comparing words; records the runs started."""
+    started = []
+
+    async def run_agent(agent, request, state):
+        started.append((agent.name, request))
+        await asyncio.sleep(0)
+        if state.get("fail"):
+            raise RuntimeError("retrieval failed")
+        return f"{agent.name} results for: {request}"
+
+    monkeypatch.setenv("AGORA_SPECULATIVE_RETRIEVAL", "1")
+    monkeypatch.delenv("AGORA_SPECULATION_MIN_SIMILARITY", raising=False)
+    monkeypatch.setattr(speculation, "run_agent", run_agent)
+    monkeypatch.setattr(speculation, "method_override", "lexical")
+    monkeypatch.setattr(speculation, "_speculations", {})
+    monkeypatch.setattr(
+        speculation,
+        "_agents",
+        {name: SimpleNamespace(name=name, output_key=f"{name}_output") for name in speculation.SPECULATIVE_AGENTS},
+    )
+    return started
+
+
+@pytest.mark.asyncio
+async def test_close_query_is_answered_with_the_speculative_result(runs):
+    speculation.start("T-1", REQUEST, {})
+
+    result = await speculation.claim("T-1", "knowledge_retrieval_agent", "Agents calling each other in a multi-step sequence")
+
+    assert result == f"knowledge_retrieval_agent results for: {REQUEST}"
+    assert sorted(runs) == sorted((name, REQUEST) for name in speculation.SPECULATIVE_AGENTS)
+    # Claimed once: a second call for the same agent runs it as usual
+    assert await speculation.claim("T-1", "knowledge_retrieval_agent", REQUEST) is None
+    assert await speculation.claim("T-1", "db_retrieval_agent", REQUEST) is not None
+    assert speculation._speculations == {}
+
+
+@pytest.mark.asyncio
+async def test_unrelated_query_discards_the_speculative_run(runs):
+    speculation.start("T-1", REQUEST, {})
+    task = speculation._speculations["T-1"].tasks["db_retrieval_agent"]
+
+    assert await speculation.claim("T-1", "db_retrieval_agent", "Billing export fails with a quota error") is None
+    await asyncio.sleep(0)
+    assert task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_failed_speculative_run_lets_the_agent_run(runs):
+    speculation.start("T-1", REQUEST, {"fail": True})
+
+    assert await speculation.claim("T-1", "db_retrieval_agent", REQUEST) is None
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_claimed_without_a_speculation(runs, monkeypatch):
+    assert await speculation.claim("T-unknown", "db_retrieval_agent", REQUEST) is None
+    assert await speculation.claim(None, "db_retrieval_agent", REQUEST) is None
+
+    monkeypatch.setenv("AGORA_SPECULATIVE_RETRIEVAL", "0")
+    speculation.start("T-1", REQUEST, {})
+    assert runs == []
+
+
+@pytest.mark.asyncio
+async def test_old_speculations_expire(runs, monkeypatch):
+    monkeypatch.setenv("AGORA_SPECULATION_TTL_SECONDS", "0")
+    speculation.start("T-1", REQUEST, {})
+    speculation._speculations["T-1"].started_at -= 1
+    tasks = list(speculation._speculations["T-1"].tasks.values())
+
+    speculation.start("T-2", REQUEST, {})
+
+    assert list(speculation._speculations) == ["T-2"]
+    await asyncio.sleep(0)
+    assert all(task.cancelled() for task in tasks)
+    for task in speculation._speculations["T-2"].tasks.values():
+        task.cancel()
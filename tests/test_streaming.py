@@ -0,0 +1,123 @@
+"""Unit tests for StreamingAgentTool in project_agora/streaming.py, streamed and not, on fake models."""
+
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from project_agora.streaming import StreamingAgentTool, hub
+
+pytest_plugins = ("pytest_asyncio",)
+
+CHUNKS = ["Step one. ", "Step two. ", "Step three."]
+
+
+class CallerLlm(BaseLlm):
+    """Calls the solver tool, then presents its result."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        responses = [part.function_response for part in llm_request.contents[-1].parts if part.function_response]
+        if responses:
+            part = types.Part(text=f"Solution: {responses[0].response['result']}")
+        else:
+            part = types.Part(function_call=types.FunctionCall(name="solver", args={"request": "help"}))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+class ChunkedLlm(BaseLlm):
+    """Answers with CHUNKS, streamed as partial responses when asked to."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if stream:
+            for chunk in CHUNKS:
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=chunk)]), partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="".join(CHUNKS))]))
+
+
+class ModelCallRecorder(BasePlugin):
+    def __init__(self):
+        super().__init__(name="model_call_recorder")
+        self.agents = []
+        self.run_configs = {}
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        self.agents.append(callback_context.agent_name)
+        self.run_configs[callback_context.agent_name] = callback_context._invocation_context.run_config
+
+
+def _runner(plugin: BasePlugin) -> InMemoryRunner:
+    solver = LlmAgent(name="solver", model=ChunkedLlm(model="chunked"), output_key="solution")
+    root = LlmAgent(
+        name="caller",
+        model=CallerLlm(model="caller"),
+        tools=[StreamingAgentTool(solver, skip_summarization_when_streamed=True)],
+    )
+    return InMemoryRunner(agent=root, app_name="streaming_test", plugins=[plugin])
+
+
+async def _run_turn(listen: bool):
+    plugin = ModelCallRecorder()
+    runner = _runner(plugin)
+    session = await runner.session_service.create_session(app_name="streaming_test", user_id="user")
+    queue = hub.subscribe(session.id) if listen else None
+    try:
+        message = types.Content(role="user", parts=[types.Part(text="I need help")])
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE, max_llm_calls=7, custom_metadata={"ticket": "T-1"})
+        events = [
+            event
+            async for event in runner.run_async(
+                user_id="user", session_id=session.id, new_message=message, run_config=run_config
+            )
+        ]
+    finally:
+        if queue is not None:
+            hub.unsubscribe(session.id, queue)
+    published = []
+    while queue is not None and not queue.empty():
+        published.append(queue.get_nowait())
+    session = await runner.session_service.get_session(app_name="streaming_test", user_id="user", session_id=session.id)
+    await runner.close()
+    return events, published, session, plugin
+
+
+@pytest.mark.asyncio
+async def test_streamed_output_is_published_and_ends_the_turn():
+    events, published, session, plugin = await _run_turn(listen=True)
+
+    assert [event.content.parts[0].text for event in published] == CHUNKS
+    assert all(event.author == "solver" and event.partial for event in published)
+    assert published[0].invocation_id == events[0].invocation_id
+
+    final = [event for event in events if event.is_final_response()]
+    assert len(final) == 1
+    assert final[0].get_function_responses()[0].response == {"result": "".join(CHUNKS)}
+    assert session.state["solution"] == "".join(CHUNKS)
+    # The child runner inherits the caller's plugins and run settings
+    assert plugin.agents == ["caller", "solver"]
+    assert plugin.run_configs["solver"].streaming_mode == StreamingMode.SSE
+    assert plugin.run_configs["solver"].max_llm_calls == 7
+    assert plugin.run_configs["solver"].custom_metadata == {"ticket": "T-1"}
+
+
+@pytest.mark.asyncio
+async def test_output_is_presented_by_the_caller_without_listeners():
+    events, published, session, plugin = await _run_turn(listen=False)
+
+    assert published == []
+    final = [event for event in events if event.is_final_response()]
+    assert len(final) == 1
+    assert final[0].author == "caller"
+    assert final[0].content.parts[0].text == f"Solution: {''.join(CHUNKS)}"
+    assert session.state["solution"] == "".join(CHUNKS)
+    assert plugin.agents == ["caller", "solver", "caller"]